@@ -0,0 +1,380 @@
+"""Faucet ACL-optimizer: shadowed/redundante regels weg, samenvoegen, herordenen.
+
+Leest de acls-sectie van een Faucet-config, en per ACL:
+  - verwijdert shadowed regels (een eerdere regel dekt hun hele matchruimte),
+  - verwijdert redundante regels (een latere regel met dezelfde actie dekt ze
+    zonder tussenliggende conflicterende regel, of deny vlak voor de default),
+  - voegt regels samen die alleen verschillen in aangrenzende prefixen,
+  - zet ARP/ND vooraan waar dat de semantiek niet verandert.
+Equivalentie wordt bewezen met de ACL-evaluatie van verify.py over alle
+equivalentieklassen van pakketten (per veld een vertegenwoordiger per regio).
+ACLs met velden die verify.py niet modelleert worden niet aangeraakt: daar
+zou het bewijs niets zeggen.
+"""
+
+import ipaddress
+import itertools
+
+import yaml
+
+from verify import FIELD_ALIASES, INT_FIELDS, MODELLED_FIELDS, NET_FIELDS, _int, rule_matches
+
+
+ETH_ARP = 0x0806
+ETH_IPV4 = 0x0800
+ETH_IPV6 = 0x86DD
+ND_TYPES = (133, 134, 135, 136, 137)
+
+L4_FIELDS = ('tcp_src', 'tcp_dst', 'udp_src', 'udp_dst')
+FIELDS_BY_ETH = {
+    ETH_IPV4: ('ipv4_src', 'ipv4_dst', 'ip_proto', 'icmpv4_type') + L4_FIELDS,
+    ETH_IPV6: ('ipv6_src', 'ipv6_dst', 'ip_proto', 'icmpv6_type') + L4_FIELDS,
+    ETH_ARP: ('arp_spa', 'arp_tpa'),
+}
+COMMON_FIELDS = ('eth_src', 'eth_dst', 'vlan_vid', 'vlan_pcp')
+MAX_PACKETS = 500000
+
+
+# -------- Regels als matchruimtes --------
+def matches(rule):
+    """Genormaliseerde matchvelden {veld: waarde} (zonder actions)."""
+    result = {}
+    for key, value in rule.items():
+        if key == 'actions':
+            continue
+        field = FIELD_ALIASES.get(key, key)
+        if field in NET_FIELDS:
+            value = ipaddress.ip_network(str(value), strict=False)
+        elif field in INT_FIELDS:
+            value = _int(value)
+        else:
+            value = str(value).lower()
+        result[field] = value
+    return result
+
+
+def unmodelled(rules):
+    """Matchvelden in rules die de ACL-evaluatie niet kent (gesorteerd)."""
+    return sorted({FIELD_ALIASES.get(k, k) for rule in rules for k in rule
+                   if k != 'actions' and FIELD_ALIASES.get(k, k) not in MODELLED_FIELDS})
+
+
+def actions(rule):
+    return rule.get('actions') or {}
+
+
+def _value_covers(a, b):
+    if isinstance(a, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+        return type(a) is type(b) and b.subnet_of(a)
+    return a == b
+
+
+def _value_overlaps(a, b):
+    if isinstance(a, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+        return type(a) is type(b) and a.overlaps(b)
+    return a == b
+
+
+def covers(a, b):
+    """Dekt matchruimte a volledig matchruimte b?"""
+    ma, mb = matches(a), matches(b)
+    return all(f in mb and _value_covers(v, mb[f]) for f, v in ma.items())
+
+
+def overlaps(a, b):
+    ma, mb = matches(a), matches(b)
+    return all(_value_overlaps(v, mb[f]) for f, v in ma.items() if f in mb)
+
+
+def same_action(a, b):
+    return actions(a) == actions(b)
+
+
+def is_deny(rule):
+    acts = actions(rule)
+    return set(acts) <= {'allow'} and not acts.get('allow')
+
+
+def hot_rank(rule):
+    # 0 = ARP, 1 = IPv6 ND, 2 = de rest
+    m = matches(rule)
+    if m.get('eth_type') == ETH_ARP:
+        return 0
+    if m.get('icmpv6_type') in ND_TYPES:
+        return 1
+    return 2
+
+
+# -------- Optimalisaties --------
+def remove_shadowed(rules, log):
+    result = []
+    for rule in rules:
+        by = next((r for r in result if covers(r, rule)), None)
+        if by is not None:
+            kind = 'duplicaat' if same_action(by, rule) else 'shadowed (conflict)'
+            log.append(f'{kind}: {rule_text(rule)}')
+        else:
+            result.append(rule)
+    return result
+
+
+def _redundant(rule, later):
+    for other in later:
+        if covers(other, rule) and same_action(other, rule):
+            return True
+        if overlaps(other, rule) and not same_action(other, rule):
+            return False
+    # Aan het eind valt Faucet terug op drop
+    return is_deny(rule)
+
+
+def remove_redundant(rules, log):
+    # Van achter naar voor: de rest van de lijst is steeds al equivalent
+    result = list(rules)
+    for i in range(len(result) - 1, -1, -1):
+        rule = result[i]
+        # ARP/ND blijven expliciet vooraan staan (veelvoorkomend verkeer)
+        if hot_rank(rule) < 2:
+            continue
+        if _redundant(rule, result[i + 1:]):
+            log.append(f'redundant: {rule_text(rule)}')
+            del result[i]
+    return result
+
+
+def _merge_pair(a, b):
+    ma, mb = matches(a), matches(b)
+    if set(ma) != set(mb) or not same_action(a, b):
+        return None
+    diff = [f for f in ma if ma[f] != mb[f]]
+    if len(diff) != 1 or diff[0] not in NET_FIELDS:
+        return None
+    field = diff[0]
+    merged = list(ipaddress.collapse_addresses([ma[field], mb[field]]))
+    if len(merged) != 1:
+        return None
+    key = next(k for k in a if FIELD_ALIASES.get(k, k) == field)
+    rule = dict(a)
+    rule[key] = str(merged[0])
+    return rule
+
+
+def _int_candidate(a, b):
+    # Zelfde actie, alleen een int-veld anders (bv. icmpv6_type 135/136):
+    # logisch één regel, maar OpenFlow kent geen sets/ranges voor die velden
+    ma, mb = matches(a), matches(b)
+    if set(ma) != set(mb) or not same_action(a, b):
+        return None
+    diff = [f for f in ma if ma[f] != mb[f]]
+    return diff[0] if len(diff) == 1 and diff[0] in INT_FIELDS else None
+
+
+def merge_adjacent(rules, log):
+    result = list(rules)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(result) - 1):
+            merged = _merge_pair(result[i], result[i + 1])
+            if merged is not None:
+                log.append(f'samengevoegd: {rule_text(result[i])} + {rule_text(result[i + 1])}')
+                result[i:i + 2] = [merged]
+                changed = True
+                break
+    # Eén logregel per reeks (bv. ND-types 133..136), niet per paar
+    run = []
+    for a, b in zip(result + [None], result[1:] + [None]):
+        field = _int_candidate(a, b) if b is not None else None
+        if field and (not run or run[0] == field):
+            run = run or [field, a]
+            run.append(b)
+            continue
+        if run:
+            values = ', '.join(str(matches(r)[run[0]]) for r in run[1:])
+            log.append(f'samenvoegbaar maar niet uitdrukbaar ({run[0]} {values}): '
+                       f'{len(run) - 1} regels')
+        run = [field, a, b] if field else []
+    return result
+
+
+def reorder_hot(rules, log):
+    result = list(rules)
+    for i in range(1, len(result)):
+        j = i
+        while j > 0 and hot_rank(result[j]) < hot_rank(result[j - 1]):
+            prev, rule = result[j - 1], result[j]
+            # Wisselen mag alleen als de volgorde niet uitmaakt
+            if not (same_action(prev, rule) or not overlaps(prev, rule)):
+                break
+            result[j - 1], result[j] = rule, prev
+            j -= 1
+        if j != i:
+            log.append(f'naar voren ({i} -> {j}): {rule_text(result[j])}')
+    return result
+
+
+def optimize_acl(rules):
+    """Geeft (geoptimaliseerde regels, log) terug."""
+    log = []
+    out = remove_shadowed(rules, log)
+    out = remove_redundant(out, log)
+    out = merge_adjacent(out, log)
+    out = reorder_hot(out, log)
+    return out, log
+
+
+# -------- Equivalentiebewijs --------
+def _representatives(values):
+    """Per veld een adres/waarde per regio die de regelwaarden vormen."""
+    reps = set()
+    ints = [v for v in values if isinstance(v, int)]
+    nets = [v for v in values if not isinstance(v, int) and not isinstance(v, str)]
+    strs = [v for v in values if isinstance(v, str)]
+    for n in nets:
+        reps.add(n.network_address)
+        if int(n.broadcast_address) < (2 ** n.max_prefixlen - 1):
+            reps.add(n.broadcast_address + 1)
+        if int(n.network_address) > 0:
+            reps.add(n.network_address - 1)
+    reps = {str(a) for a in reps}
+    if nets:
+        reps.add('0.0.0.1' if nets[0].version == 4 else '::1')
+    reps.update(ints)
+    if ints:
+        reps.add(max(ints) + 1)
+    reps.update(strs)
+    if strs:
+        reps.add('other')
+    return sorted(reps, key=str)
+
+
+def packet_space(rule_sets):
+    """Alle vertegenwoordigende pakketten voor de velden in rule_sets."""
+    values = {}
+    for rules in rule_sets:
+        for rule in rules:
+            for field, value in matches(rule).items():
+                values.setdefault(field, set()).add(value)
+    eth_types = set(values.pop('eth_type', set())) | {ETH_IPV4, ETH_IPV6, ETH_ARP, 0x88cc}
+    for eth in sorted(eth_types):
+        fields = [f for f in FIELDS_BY_ETH.get(eth, ()) + COMMON_FIELDS if f in values]
+        choices = [_representatives(values[f]) for f in fields]
+        for combo in itertools.product(*choices):
+            pkt = {'eth_type': eth}
+            pkt.update(zip(fields, combo))
+            yield pkt
+
+
+def first_actions(rules, pkt):
+    for rule in rules:
+        if rule_matches(rule, pkt):
+            return actions(rule)
+    return None
+
+
+def prove_equivalent(before, after):
+    """(True, #pakketten) of (False, tegenvoorbeeld)."""
+    fields = unmodelled(before + after)
+    if fields:
+        raise ValueError(f'velden niet gemodelleerd: {", ".join(fields)}')
+    count = 0
+    for pkt in packet_space([before, after]):
+        count += 1
+        if count > MAX_PACKETS:
+            raise ValueError(f'pakketruimte groter dan {MAX_PACKETS}')
+        if first_actions(before, pkt) != first_actions(after, pkt):
+            return False, pkt
+    return True, count
+
+
+# -------- Flow-entries per DP --------
+def _port_vlans(port):
+    vlans = list(port.get('tagged_vlans') or [])
+    if port.get('native_vlan') is not None:
+        vlans.append(port['native_vlan'])
+    return vlans
+
+
+def _acl_names(entry):
+    names = entry.get('acl_in') or entry.get('acls_in') or []
+    return [names] if isinstance(names, str) else list(names)
+
+
+def flow_estimate(config, acls):
+    """Geschatte ACL-flow-entries per DP: VLAN-ACLs per DP + poort-ACLs per poort."""
+    vlan_cfg = config.get('vlans') or {}
+    vid_names = {v.get('vid'): name for name, v in vlan_cfg.items()}
+    result = {}
+    for dp_name, dp in (config.get('dps') or {}).items():
+        ports = (dp.get('interfaces') or {}).values()
+        carried = {vid_names.get(v, v) for port in ports for v in _port_vlans(port)}
+        total = 0
+        for vlan in carried:
+            for name in _acl_names(vlan_cfg.get(vlan) or {}):
+                total += len(acls.get(name, []))
+        for port in ports:
+            for name in _acl_names(port):
+                total += len(acls.get(name, []))
+        result[dp_name] = total
+    return result
+
+
+def rule_text(rule):
+    fields = ', '.join(f'{k}={v}' for k, v in rule.items() if k != 'actions')
+    return f'[{fields or "*"}] -> {actions(rule)}'
+
+
+def optimize_config(config):
+    """Optimaliseer alle ACLs in config; geeft (nieuwe config, rapport) terug."""
+    before = {name: [r['rule'] for r in entries]
+              for name, entries in (config.get('acls') or {}).items()}
+    after = {}
+    report = {}
+    for name, rules in before.items():
+        fields = unmodelled(rules)
+        if fields:
+            report[name] = {'before': len(rules), 'after': len(rules), 'proof': 'niet geprobeerd',
+                            'log': [f'overgeslagen: velden niet gemodelleerd ({", ".join(fields)})']}
+            after[name] = rules
+            continue
+        optimized, log = optimize_acl(rules)
+        try:
+            ok, detail = prove_equivalent(rules, optimized)
+        except ValueError as e:
+            ok, detail = False, e
+        if not ok:
+            log.append(f'NIET bewezen ({detail}); origineel behouden')
+            optimized = rules
+        report[name] = {'before': len(rules), 'after': len(optimized), 'log': log,
+                        'proof': f'equivalent over {detail} pakketklassen' if ok else 'mislukt'}
+        after[name] = optimized
+    new = dict(config)
+    new['acls'] = {name: [{'rule': r} for r in rules] for name, rules in after.items()}
+    flows = {dp: (n, flow_estimate(config, after)[dp])
+             for dp, n in flow_estimate(config, before).items()}
+    return new, report, flows
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Optimaliseer de ACLs in een Faucet-config')
+    parser.add_argument('config', help='faucet.yaml (of testfaucet.yaml)')
+    parser.add_argument('-o', '--output', help='schrijf de geoptimaliseerde config hierheen')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    new, report, flows = optimize_config(config)
+
+    for name, r in report.items():
+        print(f'*** acl {name}: {r["before"]} -> {r["after"]} regels ({r["proof"]})')
+        for line in r['log']:
+            print(f'      {line}')
+    print('*** geschatte ACL flow-entries per DP (voor -> na)')
+    for dp, (old, opt) in flows.items():
+        print(f'      {dp:<8} {old:>5} -> {opt:>5}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            yaml.safe_dump(new, f, sort_keys=False, default_flow_style=None, width=120)
+        print(f'*** geschreven naar {args.output}')
@@ -0,0 +1,309 @@
+"""Headless data-plane benchmark: iperf3 TCP/UDP, ping-latency/jitter en connecties/s.
+
+Een matrix van scenario's (bron-host, doel-node + adres) x tests wordt
+afgewerkt op een draaiend netwerk; resultaten gaan naar JSON en CSV en kunnen
+met een opgeslagen baseline vergeleken worden (exitcode 1 bij regressie).
+
+De cps-test draait dit bestand zelf in de hosts (`python3 bench.py cps-client`);
+Mininet-hosts delen het bestandssysteem.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import socket
+import sys
+import time
+from collections import namedtuple
+
+
+Scenario = namedtuple('Scenario', 'name src dst addr family')
+
+TESTS = ('tcp', 'udp', 'ping', 'cps')
+IPERF_PORT = 5201
+CPS_PORT = 5202
+HERE = os.path.abspath(__file__)
+
+# +1: hoger is beter, -1: lager is beter
+METRICS = {'bps': 1, 'cps': 1, 'rtt_avg_ms': -1, 'jitter_ms': -1, 'loss_pct': -1}
+# Absolute speling bovenop de relatieve tolerantie (ruis rond nul)
+ABS_SLACK = {'rtt_avg_ms': 0.05, 'jitter_ms': 0.05, 'loss_pct': 0.5}
+
+
+# -------- Scenario's --------
+def scenarios_from_model(model):
+    """Standaardmatrix voor een netmodel.NetModel."""
+    routed = model.routed_vlans
+    by_vlan = {}
+    for h in model.hosts:
+        if model.vlan(h.vlan).routed:
+            by_vlan.setdefault(h.vlan, []).append(h)
+
+    scenarios = []
+    for vlan in routed:
+        hosts = by_vlan.get(vlan.name, [])
+        if not hosts:
+            continue
+        src = hosts[0]
+        same = [h for h in hosts[1:] if h.site == src.site]
+        other = [h for h in hosts[1:] if h.site != src.site]
+        if same:
+            scenarios.append(Scenario(f'{vlan.name}-site', src.name, same[0].name,
+                                      same[0].ip4.split('/')[0], 4))
+        if other:
+            scenarios.append(Scenario(f'{vlan.name}-darkfiber', src.name, other[0].name,
+                                      other[0].ip4.split('/')[0], 4))
+    # WAN per edge-router, vanaf een host van die site (edgeA houdt de oude namen)
+    for edge in model.edges():
+        hosts = [h for h in by_vlan.get(routed[0].name, []) if h.site == edge.site] if routed else []
+        if not hosts:
+            continue
+        suffix = f'-{edge.site}' if edge.index else ''
+        scenarios.append(Scenario(f'wan-nat{suffix}', hosts[0].name, edge.isp, '8.8.8.8', 4))
+        scenarios.append(Scenario(f'wan-v6{suffix}', hosts[0].name, edge.isp, edge.router.gw_v6, 6))
+    return scenarios
+
+
+# -------- Tests --------
+def _ping(src, sc, count):
+    tool = 'ping6' if sc.family == 6 else 'ping'
+    out = src.cmd(f'{tool} -q -c {count} -i 0.2 -W 1 {sc.addr}')
+    result = {}
+    m = re.search(r'([\d.]+)% packet loss', out)
+    if m:
+        result['loss_pct'] = float(m.group(1))
+    m = re.search(r'= ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms', out)
+    if m:
+        result['rtt_avg_ms'] = float(m.group(2))
+        result['jitter_ms'] = float(m.group(4))   # mdev
+    return result
+
+
+def _iperf(src, sc, udp, duration, rate):
+    args = f'-u -b {rate}' if udp else ''
+    family = '-6' if sc.family == 6 else '-4'
+    out = src.cmd(f'iperf3 {family} -c {sc.addr} -p {IPERF_PORT} -t {duration} -J {args}')
+    try:
+        data = json.loads(out[out.index('{'):])
+    except ValueError:
+        return {'error': out.strip()[-200:]}
+    if 'error' in data:
+        return {'error': data['error']}
+    end = data.get('end', {})
+    if udp:
+        s = end.get('sum', {})
+        return {'bps': s.get('bits_per_second'), 'jitter_ms': s.get('jitter_ms'),
+                'loss_pct': s.get('lost_percent')}
+    return {'bps': end.get('sum_received', {}).get('bits_per_second')}
+
+
+def _cps(src, sc, duration):
+    out = src.cmd(f'python3 {HERE} cps-client {sc.addr} {CPS_PORT} {duration}')
+    try:
+        return {'cps': float(out.strip().splitlines()[-1])}
+    except (ValueError, IndexError):
+        return {'error': out.strip()[-200:]}
+
+
+def _start_servers(net, scenarios, tests):
+    pids = []
+    for name in sorted({sc.dst for sc in scenarios}):
+        node = net.get(name)
+        if 'tcp' in tests or 'udp' in tests:
+            pids.append((node, node.cmd(f'iperf3 -s -p {IPERF_PORT} >/dev/null 2>&1 & echo $!')))
+        if 'cps' in tests:
+            pids.append((node, node.cmd(f'python3 {HERE} cps-server {CPS_PORT} >/dev/null 2>&1 & echo $!')))
+    # iperf3/python hebben even nodig om te luisteren
+    time.sleep(0.5)
+    return pids
+
+
+def check_tests(tests):
+    """tests als lijst; ValueError bij een onbekende test (geen stille subset)."""
+    unknown = [t for t in tests if t not in TESTS]
+    if unknown:
+        raise ValueError(f'onbekende test(s) {", ".join(unknown)}; kies uit {", ".join(TESTS)}')
+    return list(tests)
+
+
+def _test_list(text):
+    try:
+        return check_tests(text.split(','))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def run_matrix(net, scenarios, tests=TESTS, duration=5, ping_count=20,
+               udp_rate='100M', meta=None):
+    """Werk de matrix af; geeft {'meta': ..., 'results': [...]} terug."""
+    tests = check_tests(tests)
+    pids = _start_servers(net, scenarios, tests)
+    results = []
+    try:
+        for sc in scenarios:
+            src = net.get(sc.src)
+            for test in tests:
+                if test == 'ping':
+                    metrics = _ping(src, sc, ping_count)
+                elif test == 'tcp':
+                    metrics = _iperf(src, sc, False, duration, udp_rate)
+                elif test == 'udp':
+                    metrics = _iperf(src, sc, True, duration, udp_rate)
+                else:
+                    metrics = _cps(src, sc, duration)
+                row = dict(scenario=sc.name, test=test, src=sc.src, dst=sc.dst,
+                           addr=sc.addr, family=sc.family)
+                row.update(metrics)
+                results.append(row)
+                print(f'*** bench {sc.name:<20} {test:<5} {format_metrics(metrics)}')
+    finally:
+        for node, pid in pids:
+            pid = pid.strip().splitlines()[-1] if pid.strip() else ''
+            if pid.isdigit():
+                node.cmd(f'kill {pid}')
+    return {'meta': dict(meta or {}, timestamp=time.time(), duration=duration,
+                         tests=list(tests)), 'results': results}
+
+
+def format_metrics(metrics):
+    parts = []
+    for key, value in metrics.items():
+        if key == 'bps' and value is not None:
+            parts.append(f'{value / 1e6:.1f} Mbit/s')
+        elif isinstance(value, float):
+            parts.append(f'{key}={value:.3f}')
+        else:
+            parts.append(f'{key}={value}')
+    return ' '.join(parts)
+
+
+# -------- Uitvoer en baseline --------
+def write_results(report, path):
+    """Schrijf <path>.json en <path>.csv (path zonder extensie)."""
+    base = os.path.splitext(path)[0]
+    with open(base + '.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    keys = ['scenario', 'test', 'src', 'dst', 'addr', 'family'] + list(METRICS) + ['error']
+    meta = report.get('meta', {})
+    meta_keys = [k for k in sorted(meta) if not isinstance(meta[k], (dict, list))]
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=keys + meta_keys, extrasaction='ignore')
+        writer.writeheader()
+        for row in report['results']:
+            writer.writerow(dict(row, **{k: meta[k] for k in meta_keys}))
+    return base + '.json', base + '.csv'
+
+
+def compare(report, baseline, tolerance=0.1):
+    """Vergelijk met een baseline; geeft een lijst regressies (tekst) terug."""
+    base = {(r['scenario'], r['test']): r for r in baseline['results']}
+    regressions = []
+    for row in report['results']:
+        ref = base.get((row['scenario'], row['test']))
+        if not ref:
+            continue
+        for metric, direction in METRICS.items():
+            new, old = row.get(metric), ref.get(metric)
+            if new is None or old is None:
+                continue
+            slack = ABS_SLACK.get(metric, 0.0)
+            if direction > 0 and new < old * (1 - tolerance) - slack:
+                worse = True
+            elif direction < 0 and new > old * (1 + tolerance) + slack:
+                worse = True
+            else:
+                worse = False
+            if worse:
+                regressions.append(f'{row["scenario"]}/{row["test"]} {metric}: '
+                                   f'{old:.3f} -> {new:.3f}')
+    return regressions
+
+
+def run_and_report(net, scenarios, output, tests=TESTS, duration=5,
+                   baseline=None, tolerance=0.1, meta=None, collect=None):
+    """Benchmark + rapport + optionele baselinecheck; geeft exitcode terug.
+
+    collect: optionele callable die na de matrix extra meta-velden teruggeeft
+    (bv. belasting per edge-router).
+    """
+    report = run_matrix(net, scenarios, tests=tests, duration=duration, meta=meta)
+    if collect:
+        report['meta'].update(collect())
+    json_path, csv_path = write_results(report, output)
+    print(f'*** benchmark geschreven naar {json_path} en {csv_path}')
+    if not baseline:
+        return 0
+    with open(baseline) as f:
+        regressions = compare(report, json.load(f), tolerance)
+    for line in regressions:
+        print(f'*** REGRESSIE {line}')
+    if regressions:
+        return 1
+    print(f'*** geen regressies t.o.v. {baseline} (tolerantie {tolerance:.0%})')
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--bench', metavar='OUTPUT',
+                        help='headless benchmark i.p.v. de CLI; schrijft OUTPUT.json/.csv')
+    parser.add_argument('--bench-tests', type=_test_list, default=list(TESTS),
+                        help='kommagescheiden subset van: ' + ', '.join(TESTS))
+    parser.add_argument('--bench-duration', type=int, default=5)
+    parser.add_argument('--baseline', help='vergelijk met een eerder benchmark-JSON')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='toegestane relatieve verslechtering (0.1 = 10%%)')
+
+
+def bench_options(args):
+    """Vertaal de argparse-opties naar run_and_report-argumenten (of None)."""
+    if not args.bench:
+        return None
+    return {'output': args.bench, 'options': {
+        'tests': args.bench_tests,
+        'duration': args.bench_duration,
+        'baseline': args.baseline,
+        'tolerance': args.tolerance,
+    }}
+
+
+# -------- Helpers die in de hosts draaien --------
+def cps_server(port):
+    srv = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+    srv.bind(('::', port))
+    srv.listen(1024)
+    while True:
+        conn, _ = srv.accept()
+        conn.close()
+
+
+def cps_client(addr, port, duration):
+    family = socket.AF_INET6 if ':' in addr else socket.AF_INET
+    count = 0
+    deadline = time.time() + duration
+    start = time.time()
+    while time.time() < deadline:
+        s = socket.socket(family, socket.SOCK_STREAM)
+        s.settimeout(1.0)
+        try:
+            s.connect((addr, port))
+            count += 1
+        except OSError:
+            pass
+        finally:
+            s.close()
+    print(count / (time.time() - start))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == 'cps-server':
+        cps_server(int(sys.argv[2]))
+    elif len(sys.argv) >= 5 and sys.argv[1] == 'cps-client':
+        cps_client(sys.argv[2], int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        print('gebruik: bench.py cps-server PORT | cps-client ADDR PORT SECONDS\n'
+              '(benchmarks starten via topo.py/topo_schaalbaar.py --bench OUTPUT)')
+        sys.exit(2)
@@ -0,0 +1,145 @@
+"""Faucet-config laden in een draaiende controller.
+
+Faucet leest zijn config uit $FAUCET_CONFIG (standaard /etc/faucet/faucet.yaml)
+en herlaadt die bij SIGHUP. Alleen gewijzigde datapaths worden daarbij opnieuw
+geprogrammeerd.
+
+FaucetGroup start daarnaast meerdere lokale Faucet-processen, elk met een
+eigen OpenFlow-poort, Prometheus-poort, log en config-deel (multi-controller).
+"""
+
+import os
+import signal
+import subprocess
+import time
+
+
+DEFAULT_CONFIG = '/etc/faucet/faucet.yaml'
+FAUCET_CONFIG = os.environ.get('FAUCET_CONFIG', DEFAULT_CONFIG)
+
+# Multi-controller: naast een eventuele systeem-Faucet op 6653/9302
+MULTI_BASE_PORT = 6654
+PROMETHEUS_BASE_PORT = 9303
+
+
+def faucet_pids():
+    """PIDs van Faucet-processen (faucet-script of ryu-manager met faucet.faucet)."""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                argv = f.read().decode(errors='replace').split('\0')
+        except OSError:
+            continue
+        names = [os.path.basename(a) for a in argv[:2]]
+        if 'faucet' in names or 'faucet.faucet' in argv:
+            pids.append(int(entry))
+    return pids
+
+
+def faucet_config_path(pid):
+    """Het config-bestand dat Faucet-proces pid inleest, of None als onleesbaar."""
+    try:
+        with open(f'/proc/{pid}/environ', 'rb') as f:
+            env = f.read().decode(errors='replace').split('\0')
+    except OSError:
+        return None
+    for entry in env:
+        if entry.startswith('FAUCET_CONFIG='):
+            return entry.split('=', 1)[1]
+    return DEFAULT_CONFIG
+
+
+def _same_file(a, b):
+    return os.path.realpath(a) == os.path.realpath(b)
+
+
+def write_config(text, path=FAUCET_CONFIG):
+    # Atomisch vervangen: Faucet mag nooit een half geschreven bestand lezen
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def reload_faucet(text=None, path=FAUCET_CONFIG):
+    """Schrijf (optioneel) een nieuwe config en stuur SIGHUP; geeft het aantal processen.
+
+    Alleen processen die path inlezen krijgen SIGHUP: een Faucet met een ander
+    $FAUCET_CONFIG zou anders zijn eigen, oude bestand herladen.
+    """
+    if text is not None:
+        write_config(text, path)
+    pids = faucet_pids()
+    signalled = 0
+    for pid in pids:
+        config = faucet_config_path(pid)
+        if config is not None and not _same_file(config, path):
+            print(f'*** Faucet (pid {pid}) leest {config}, niet {path}: niet herladen')
+            continue
+        try:
+            os.kill(pid, signal.SIGHUP)
+            signalled += 1
+        except ProcessLookupError:
+            pass
+    if not pids:
+        print(f'*** geen Faucet-proces gevonden; config staat in {path}')
+    return signalled
+
+
+class FaucetGroup(object):
+    """Lokale Faucet-instanties; instantie i luistert op base_port + i.
+
+    base: padprefix voor de bestanden per instantie (<base>-c<i>.yaml/.log).
+    """
+
+    def __init__(self, texts, base='faucet_multi', base_port=MULTI_BASE_PORT,
+                 prometheus_port=PROMETHEUS_BASE_PORT):
+        self.texts = list(texts)
+        self.base = base
+        self.ports = [base_port + i for i in range(len(self.texts))]
+        self.prometheus_ports = [prometheus_port + i for i in range(len(self.texts))]
+        self.procs = []
+
+    def path(self, index, ext='yaml'):
+        return f'{self.base}-c{index}.{ext}'
+
+    def start(self):
+        for i, text in enumerate(self.texts):
+            write_config(text, self.path(i))
+            env = dict(os.environ,
+                       FAUCET_CONFIG=self.path(i),
+                       FAUCET_LOG=self.path(i, 'log'),
+                       FAUCET_EXCEPTION_LOG=self.path(i, 'exception.log'),
+                       FAUCET_PROMETHEUS_PORT=str(self.prometheus_ports[i]))
+            self.procs.append(subprocess.Popen(
+                ['faucet', f'--ryu-ofp-tcp-listen-port={self.ports[i]}'],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        print(f'*** {len(self.procs)} Faucet-instanties op poort '
+              + ', '.join(str(p) for p in self.ports))
+        return self
+
+    def reload(self, texts):
+        """Schrijf gewijzigde configs en stuur alleen die instanties SIGHUP."""
+        changed = 0
+        for i, (old, new) in enumerate(zip(self.texts, texts)):
+            if old == new:
+                continue
+            write_config(new, self.path(i))
+            self.procs[i].send_signal(signal.SIGHUP)
+            changed += 1
+        self.texts = list(texts)
+        return changed
+
+    def stop(self, timeout=5.0):
+        for proc in self.procs:
+            proc.terminate()
+        deadline = time.time() + timeout
+        for proc in self.procs:
+            try:
+                proc.wait(max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self.procs = []
@@ -0,0 +1,309 @@
+"""Resident netwerk met een lokale API (asyncio, Unix-socket) i.p.v. de CLI.
+
+topo_schaalbaar.py --daemon bouwt het netwerk één keer op en houdt het in
+leven; testsuites sturen daarna zoveel scenario's als ze willen naar hetzelfde
+warme netwerk. Protocol: één JSON-object per regel, in beide richtingen;
+verzoeken op één verbinding lopen gelijktijdig en worden op id gematcht:
+    -> {"id": 1, "op": "cmd", "node": "h1", "cmd": "ping -c1 10.0.10.2"}
+    <- {"id": 1, "ok": true, "result": {"output": "..."}}
+    <- {"id": 2, "ok": false, "error": "onbekende node h99"}
+
+ops:
+  nodes                              hosts en switches
+  cmd {node, cmd, timeout?}          commando in de (hergebruikte) shell van de node
+                                     (timeout standaard CMD_TIMEOUT s, 0 = geen)
+  cmds {commands: [{node, cmd}]}     meerdere tegelijk (verschillende nodes parallel)
+  bench {output?, tests?, duration?, baseline?, tolerance?}
+  verify                             policy-verificatie (verify.py)
+  telemetry {action: snapshot|start|stop, path?, interval?}
+  reconfigure {args}                 zoals `reconfigure` in de CLI (reconfig.py);
+                                     niet bij topo.py (vaste topologie, geen model)
+  shutdown                           netwerk afbreken en de daemon stoppen
+
+Elke node heeft één shell; commando's op dezelfde node lopen dus na elkaar
+(lock per node), op verschillende nodes tegelijk via een threadpool. bench,
+verify en reconfigure nemen alle nodes exclusief; daarom heeft cmd altijd een
+timeout, anders houdt één hangend commando ze voor altijd tegen.
+
+Client (synchroon, voor testsuites) of vanaf de shell:
+    python3 daemon.py cmd '{"node": "h1", "cmd": "ip -br addr"}'
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from bench import TESTS, compare, run_matrix, scenarios_from_model, write_results
+from edgesites import EdgeLoad
+from hosts import WORKERS
+from linkprofiles import profile_meta
+from telemetry import Collector, parse_sample, sample_command
+from verify import endpoints_from_model, load_faucet, verify
+
+
+SOCKET = '/tmp/sdn-net.sock'
+# Readline-grens per verzoek (cmds met veel commando's past ruim)
+LINE_LIMIT = 16 * 1024 * 1024
+CMD_TIMEOUT = 60.0
+
+
+class NetDaemon(object):
+    """Houdt een draaiend Mininet-net vast en bedient de API.
+
+    live: reconfig.LiveNet (huidig model + reconfigure); cli_args:
+    (parser, args, make_model) zoals bij SDNCLI, voor het reconfigure-op.
+    Zonder live (topo.py): bench draait scenarios met meta, verify roept
+    check() aan (geeft een exitcode) en reconfigure is niet beschikbaar.
+    """
+
+    def __init__(self, net, live=None, path=SOCKET, faucet_out='faucet_generated.yaml',
+                 cli_args=None, workers=WORKERS, scenarios=None, meta=None, check=None):
+        self.net = net
+        self.live = live
+        self.scenarios = scenarios
+        self.meta = meta
+        self.check = check
+        self.path = path
+        self.faucet_out = faucet_out
+        self.cli_args = cli_args
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.locks = {}
+        self.collectors = {}
+        self.clients = {}
+        self.stopped = None
+        self.ops = {
+            'nodes': self.op_nodes, 'cmd': self.op_cmd, 'cmds': self.op_cmds,
+            'bench': self.op_bench, 'verify': self.op_verify, 'telemetry': self.op_telemetry,
+            'reconfigure': self.op_reconfigure, 'shutdown': self.op_shutdown,
+        }
+
+    @property
+    def model(self):
+        return self.live.model
+
+    # -------- Gelijktijdigheid --------
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    def _lock(self, name):
+        if name not in self.net:
+            raise KeyError(f'onbekende node {name}')
+        return self.locks.setdefault(name, asyncio.Lock())
+
+    @asynccontextmanager
+    async def _exclusive(self):
+        # Alle nodes in vaste volgorde: geen deadlock met lopende cmd's
+        async with AsyncExitStack() as stack:
+            for node in sorted(n.name for n in self.net.hosts + self.net.switches):
+                await stack.enter_async_context(self._lock(node))
+            yield
+
+    # -------- Ops --------
+    async def op_nodes(self):
+        return {'hosts': [h.name for h in self.net.hosts],
+                'switches': [s.name for s in self.net.switches]}
+
+    async def op_cmd(self, node, cmd, timeout=None):
+        timeout = CMD_TIMEOUT if timeout is None else timeout
+        if timeout:
+            cmd = f'timeout {float(timeout)} sh -c {shlex.quote(cmd)}'
+        async with self._lock(node):
+            output = await self._call(self.net.get(node).cmd, cmd)
+        return {'node': node, 'output': output}
+
+    async def op_cmds(self, commands):
+        async def one(item):
+            try:
+                return await self.op_cmd(**item)
+            except Exception as e:
+                return {'node': item.get('node'), 'error': str(e)}
+        return {'results': await asyncio.gather(*(one(item) for item in commands))}
+
+    def _bench(self, output, tests, duration, baseline, tolerance):
+        if self.live:
+            model = self.model
+            scenarios = scenarios_from_model(model)
+            meta = dict(profile_meta(model.link_profiles), firewall=model.firewall)
+            load = EdgeLoad(self.net, model) if model.edges() else None
+        else:
+            scenarios, meta, load = self.scenarios or [], dict(self.meta or {}), None
+        report = run_matrix(self.net, scenarios, tests=tests, duration=duration, meta=meta)
+        if load:
+            report['meta'].update(load())
+        json_path, csv_path = write_results(report, output)
+        result = {'json': json_path, 'csv': csv_path, 'results': report['results']}
+        if baseline:
+            with open(baseline) as f:
+                result['regressions'] = compare(report, json.load(f), tolerance)
+        return result
+
+    async def op_bench(self, output='bench_daemon', tests=None, duration=5, baseline=None,
+                       tolerance=0.1):
+        async with self._exclusive():
+            return await self._call(self._bench, output, list(tests or TESTS), duration,
+                                    baseline, tolerance)
+
+    def _verify(self):
+        if not self.live:
+            return self.check()
+        model = self.model
+        return verify(self.net, load_faucet(self.faucet_out), endpoints_from_model(model),
+                      model.edge_router(), uplinks=self.live.uplinks())
+
+    async def op_verify(self):
+        if not self.live and not self.check:
+            raise ValueError('verify niet beschikbaar')
+        async with self._exclusive():
+            code = await self._call(self._verify)
+        return {'code': code}
+
+    def _snapshot(self):
+        # Eenmalig: ook dump-flows voor misses en packet-ins
+        out = subprocess.run(['sh', '-c', sample_command(self.net.switches, flows=True)],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                             universal_newlines=True).stdout
+        return parse_sample(out)
+
+    async def op_telemetry(self, action='snapshot', path='telemetry.csv', interval=1.0):
+        if action == 'snapshot':
+            return await self._call(self._snapshot)
+        if action == 'start':
+            if path in self.collectors:
+                raise ValueError(f'telemetry naar {path} loopt al')
+            self.collectors[path] = Collector(self.net.switches, path=path, interval=interval).start()
+            return {'path': path, 'interval': interval}
+        if action == 'stop':
+            collector = self.collectors.pop(path)
+            await self._call(collector.stop)
+            return {'path': path, 'samples': collector.samples}
+        raise ValueError(f'onbekende telemetry-actie {action}')
+
+    def _reconfigure(self, line):
+        parser, args, make_model = self.cli_args
+        args = parser.parse_args(shlex.split(line), namespace=argparse.Namespace(**vars(args)))
+        new = make_model(args)
+        self.cli_args = (parser, args, make_model)
+        self.live.acls_from = args.acls_from
+        return self.live.reconfigure(new)
+
+    async def op_reconfigure(self, args=''):
+        if not self.cli_args:
+            raise ValueError('reconfigure niet beschikbaar')
+        async with self._exclusive():
+            try:
+                return await self._call(self._reconfigure, args)
+            except SystemExit:
+                raise ValueError(f'ongeldige opties: {args}')
+
+    async def op_shutdown(self):
+        self.stopped.set()
+        return {}
+
+    # -------- Server --------
+    async def _handle(self, line, writer, wlock):
+        request = {}
+        try:
+            request = json.loads(line)
+            params = dict(request)
+            params.pop('id', None)
+            op = self.ops.get(params.pop('op', None))
+            if not op:
+                raise ValueError(f'onbekende op {request.get("op")}')
+            response = {'ok': True, 'result': await op(**params)}
+        except Exception as e:
+            response = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+        response['id'] = request.get('id') if isinstance(request, dict) else None
+        async with wlock:
+            writer.write((json.dumps(response) + '\n').encode())
+            await writer.drain()
+
+    async def _client(self, reader, writer):
+        wlock = asyncio.Lock()
+        tasks = []
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while not self.stopped.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                tasks.append(asyncio.ensure_future(self._handle(line, writer, wlock)))
+            await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    async def _serve(self):
+        self.stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopped.set)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._client, path=self.path, limit=LINE_LIMIT)
+        os.chmod(self.path, 0o600)
+        print(f'*** daemon luistert op {self.path} ({len(self.net.hosts)} hosts, '
+              f'{len(self.net.switches)} switches)')
+        async with server:
+            await self.stopped.wait()
+            # Open verbindingen sluiten, anders wacht de server erop
+            clients = list(self.clients.items())
+            for writer, _ in clients:
+                writer.close()
+            await asyncio.gather(*(task for _, task in clients), return_exceptions=True)
+        os.unlink(self.path)
+
+    def serve(self):
+        """Blokkeert tot shutdown/SIGTERM; stopt daarna de eigen telemetry."""
+        try:
+            asyncio.run(self._serve())
+        finally:
+            for collector in self.collectors.values():
+                collector.stop()
+            self.pool.shutdown()
+        print('*** daemon gestopt')
+
+
+class Client(object):
+    """Synchrone client: Client(path).call('cmd', node='h1', cmd='ip a')."""
+
+    def __init__(self, path=SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile('rw')
+        self._id = 0
+
+    def call(self, op, **params):
+        self._id += 1
+        self.file.write(json.dumps(dict(params, id=self._id, op=op)) + '\n')
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verzoek naar een draaiende netwerk-daemon')
+    parser.add_argument('--socket', default=SOCKET)
+    parser.add_argument('op', help='nodes, cmd, cmds, bench, verify, telemetry, reconfigure, shutdown')
+    parser.add_argument('params', nargs='?', default='{}', help='JSON-object met parameters')
+    args = parser.parse_args()
+
+    client = Client(args.socket)
+    try:
+        print(json.dumps(client.call(args.op, **json.loads(args.params)), indent=2))
+    finally:
+        client.close()
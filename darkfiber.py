@@ -0,0 +1,213 @@
+"""Darkfiber-benchmark: schaalt cross-site throughput mee met het aantal links?
+
+Per linkaantal wordt een 2-site topologie opgebouwd (netmodel.NetModel met
+darkfiber_links=N), met een eigen Faucet-instantie (controller.FaucetGroup)
+op de bijbehorende config, en gemeten:
+  - aggregate TCP-throughput van `pairs` gelijktijdige iperf3-stromen
+    site A -> site B (verschillende hosts, dus verschillende MAC-paren);
+  - bij N > 1 de failover: een ping elke 10 ms loopt, de drukste darkfiber-
+    poort gaat down, en de langste onderbreking tussen twee replies is de
+    hersteltijd.
+
+Zonder shaping is een veth geen bottleneck; geef dus een bandbreedte per
+darkfiber-link op (--bw, Mbit/s) om het schaaleffect te zien. Vereist faucet
+in $PATH; de config van een systeem-Faucet wordt niet aangeraakt.
+"""
+
+import csv
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mininet.link import Link, TCLink
+from mininet.net import Mininet
+from mininet.util import quietRun
+
+from bench import IPERF_PORT, Scenario, _iperf
+from controller import FaucetGroup
+from hosts import from_model, provision_hosts
+from netmodel import DARKFIBER_MODES, NetModel
+from ovs import FaucetSwitch
+from ready import IfaceReady, SwitchesConnected, wait_ready
+from telemetry import parse_ports
+from topo_schaalbaar import SDNTopo, add_controllers
+
+
+PING_INTERVAL = 0.01
+REPLY_RE = re.compile(r'^\[([\d.]+)\].*icmp_seq=(\d+)', re.M)
+
+
+def build_model(links, mode='lacp', pairs=4):
+    # Eén access-switch per site; pairs hosts per site in één VLAN
+    return NetModel(sites=2, access_per_site=1, hosts_per_vlan=pairs, vids=(10,),
+                    ctrl=False, edge=False, darkfiber_links=links, darkfiber_mode=mode)
+
+
+def cross_site_pairs(model):
+    a, b = model.sites[:2]
+    src = [h for h in model.hosts if h.site == a]
+    dst = [h for h in model.hosts if h.site == b]
+    return list(zip(src, dst))
+
+
+def darkfiber_ports(model, core):
+    """Interfacenamen van de darkfiber-leden aan de kant van core."""
+    ports = []
+    for link in model.links:
+        if link.kind != 'darkfiber':
+            continue
+        if link.node1 == core:
+            ports.append(f'{core}-eth{link.port1}')
+        elif link.node2 == core:
+            ports.append(f'{core}-eth{link.port2}')
+    return ports
+
+
+def wait_path(src, addr, timeout=30.0):
+    """Seconden tot src addr kan pingen (LACP/stack geconvergeerd), of None."""
+    start = time.time()
+    while time.time() - start < timeout:
+        if ' 0% packet loss' in src.cmd(f'ping -c1 -W1 {addr}'):
+            return time.time() - start
+    return None
+
+
+def throughput(net, pairs, duration):
+    """Gelijktijdige iperf3-stromen; geeft (totaal bps, [bps per stroom])."""
+    servers = [(net.get(d.name), net.get(d.name).cmd(
+        f'iperf3 -s -p {IPERF_PORT} >/dev/null 2>&1 & echo $!')) for _, d in pairs]
+    time.sleep(0.5)
+
+    def one(pair):
+        s, d = pair
+        sc = Scenario(f'{s.name}-{d.name}', s.name, d.name, d.ip4.split('/')[0], 4)
+        return _iperf(net.get(s.name), sc, False, duration, None).get('bps') or 0.0
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(pairs)) as pool:
+            rates = list(pool.map(one, pairs))
+    finally:
+        for node, pid in servers:
+            pid = pid.strip().splitlines()[-1] if pid.strip() else ''
+            if pid.isdigit():
+                node.cmd(f'kill {pid}')
+    return sum(rates), rates
+
+
+def busiest_port(switch, ports, window=0.5):
+    # Het lid dat het meeste verkeer draagt; dat is de interessante failover
+    def tx():
+        counters = parse_ports(quietRun(f'ovs-ofctl -O OpenFlow13 dump-ports {switch}'))
+        return {p: counters.get(f'{p}.tx_bytes', 0) for p in ports}
+    before = tx()
+    time.sleep(window)
+    after = tx()
+    return max(ports, key=lambda p: after[p] - before[p])
+
+
+def failover(net, model, pair, seconds=5.0, fail_after=1.0):
+    """Zet tijdens een ping-stroom het drukste darkfiber-lid down.
+
+    Geeft {'failed_port', 'recovery_ms', 'lost'} terug; recovery_ms is de
+    langste pauze tussen twee replies minus het pinginterval.
+    """
+    src, dst = pair
+    core = model.core(src.site).name
+    count = int(seconds / PING_INTERVAL)
+    proc = net.get(src.name).popen(
+        ['ping', '-D', '-n', '-i', str(PING_INTERVAL), '-W', '1', '-c', str(count),
+         dst.ip4.split('/')[0]], stdout=subprocess.PIPE, universal_newlines=True)
+    time.sleep(fail_after)
+    port = busiest_port(core, darkfiber_ports(model, core))
+    quietRun(f'ip link set dev {port} down')
+    out, _ = proc.communicate()
+    quietRun(f'ip link set dev {port} up')
+
+    replies = [(float(ts), int(seq)) for ts, seq in REPLY_RE.findall(out)]
+    gaps = [b[0] - a[0] for a, b in zip(replies, replies[1:])]
+    recovery = max(gaps) - PING_INTERVAL if gaps else None
+    return {'failed_port': port,
+            'recovery_ms': round(recovery * 1000, 1) if recovery is not None else None,
+            'lost': count - len(replies)}
+
+
+def run_one(links, mode, pairs, duration, bw, base):
+    model = build_model(links, mode, pairs)
+    group = FaucetGroup(model.faucet_yamls(), base=f'{base}-faucet').start()
+
+    link_opts = {'darkfiber': {'bw': bw}} if bw else {}
+    net = Mininet(topo=SDNTopo(model=model, link_opts=link_opts), switch=FaucetSwitch,
+                  link=TCLink if bw else Link, build=False, controller=None)
+    add_controllers(net, group)
+    try:
+        net.build()
+        net.start()
+        provision_hosts(net, from_model(model))
+        conditions = [IfaceReady(net.get(h.name), f'{h.name}-eth0') for h in model.hosts]
+        conditions.append(SwitchesConnected(len(net.switches)))
+        wait_ready(conditions, verbose=False)
+
+        hosts = cross_site_pairs(model)
+        converge = wait_path(net.get(hosts[0][0].name), hosts[0][1].ip4.split('/')[0])
+        # MACs leren voor de meting begint
+        for s, d in hosts:
+            net.get(s.name).cmd(f'ping -c1 -W1 {d.ip4.split("/")[0]}')
+        total, rates = throughput(net, hosts, duration)
+        result = {'links': links, 'mode': mode, 'pairs': len(hosts), 'bw_mbit': bw,
+                  'converge_s': round(converge, 3) if converge is not None else None,
+                  'bps': total, 'min_stream_bps': min(rates), 'max_stream_bps': max(rates)}
+        if links > 1:
+            result.update(failover(net, model, hosts[0]))
+        return result
+    finally:
+        net.stop()
+        group.stop()
+
+
+def bench(link_counts=(1, 2, 4), mode='lacp', pairs=4, duration=5, bw=100,
+          output='bench_darkfiber'):
+    print('%-6s %-6s %12s %10s %12s %6s' % ('links', 'mode', 'Mbit/s', 'scaling', 'recovery_ms', 'lost'))
+    base = os.path.splitext(output)[0]
+    results = []
+    for n in link_counts:
+        r = run_one(n, mode, pairs, duration, bw, base)
+        # Throughput t.o.v. het eerste linkaantal (ideaal: n / eerste n)
+        first = results[0]['bps'] if results else r['bps']
+        r['scaling'] = round(r['bps'] / first, 2) if first else None
+        results.append(r)
+        print('%-6d %-6s %12.1f %10s %12s %6s' % (
+            n, mode, r['bps'] / 1e6, r['scaling'], r.get('recovery_ms', '-'), r.get('lost', '-')))
+
+    with open(base + '.json', 'w') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'duration': duration},
+                   'results': results}, f, indent=2)
+    keys = sorted({k for r in results for k in r})
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=keys)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f'*** darkfiber-benchmark geschreven naar {base}.json en {base}.csv')
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from mininet.log import setLogLevel
+
+    parser = argparse.ArgumentParser(description='Darkfiber-throughput en failover per linkaantal')
+    parser.add_argument('--links', default='1,2,4', help='kommagescheiden linkaantallen')
+    parser.add_argument('--mode', choices=DARKFIBER_MODES, default='lacp')
+    parser.add_argument('--pairs', type=int, default=4, help='gelijktijdige iperf3-stromen')
+    parser.add_argument('--duration', type=int, default=5)
+    parser.add_argument('--bw', type=float, default=100,
+                        help='Mbit/s per darkfiber-link (0 = geen shaping)')
+    parser.add_argument('-o', '--output', default='bench_darkfiber')
+    args = parser.parse_args()
+
+    setLogLevel('warning')
+    bench([int(n) for n in args.links.split(',')], args.mode, args.pairs, args.duration,
+          args.bw or None, args.output)
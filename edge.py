@@ -0,0 +1,591 @@
+"""Edge-router model: adressen, VLAN-subinterfaces, routes, sysctls en firewall.
+
+De volledige toestand van de edge-router wordt eerst als model opgebouwd en
+daarna in een paar bulk-transacties toegepast (ip -batch, sysctl -p,
+iptables-restore / ip6tables-restore) in plaats van honderd losse node.cmd's.
+
+Firewall-backends: 'iptables' (lineaire FORWARD-chains per familie) of 'nft'
+(één inet-tabel voor v4+v6; interfaceparen als verdict map, atomisch geladen
+met nft -f).
+"""
+
+import difflib
+import ipaddress
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+
+# vid, gateway-adres v4 (cidr), gateway-adres v6 (cidr)
+EdgeVlan = namedtuple('EdgeVlan', 'vid gw4 gw6')
+
+# Standaard VLANs op de trunk van edgeA (zie faucet.yaml)
+DEFAULT_VLANS = [
+    EdgeVlan(10, '10.0.10.254/24', '2001:db8:10::1/64'),
+    EdgeVlan(20, '10.0.20.254/24', '2001:db8:20::1/64'),
+    EdgeVlan(30, '10.0.30.254/24', '2001:db8:30::1/64'),
+]
+
+FIREWALLS = ('iptables', 'nft')
+
+# "Internet"-adressen op elke ISP-node (bereikbaar via elke edge-router)
+INTERNET_V4 = '8.8.8.8'
+INTERNET_V6 = '2001:4860:4860::8888'
+NFT_TABLE = 'inet edge'
+
+POLICIES = {
+    'filter': [('INPUT', 'DROP'), ('FORWARD', 'DROP'), ('OUTPUT', 'ACCEPT')],
+    'nat': [('PREROUTING', 'ACCEPT'), ('INPUT', 'ACCEPT'),
+            ('OUTPUT', 'ACCEPT'), ('POSTROUTING', 'ACCEPT')],
+}
+
+
+class EdgeRouter(object):
+    """Gewenste toestand van een edge-router (LAN-trunk + WAN-uplink)."""
+
+    def __init__(self, name='edgeA', vlans=None,
+                 wan_v4='203.0.113.2/28', wan_v6='2001:db8:ffff::2/64',
+                 gw_v4='203.0.113.1', gw_v6='2001:db8:ffff::1',
+                 mgmt_port=0, wan_port=1, trunk_port=2, firewall='iptables'):
+        if firewall not in FIREWALLS:
+            raise ValueError(f'firewall moet een van {FIREWALLS} zijn')
+        self.name = name
+        self.vlans = list(vlans if vlans is not None else DEFAULT_VLANS)
+        self.wan_v4 = wan_v4
+        self.wan_v6 = wan_v6
+        self.gw_v4 = gw_v4
+        self.gw_v6 = gw_v6
+        # mgmt_port=None: geen losse mgmt-interface (gegenereerde topologieën)
+        self.mgmt_port = mgmt_port
+        self.wan_port = wan_port
+        self.trunk_port = trunk_port
+        self.firewall = firewall
+
+    # -------- Interfaces --------
+    @property
+    def mgmt_if(self):
+        if self.mgmt_port is None:
+            return None
+        return f'{self.name}-eth{self.mgmt_port}'
+
+    @property
+    def wan_if(self):
+        return f'{self.name}-eth{self.wan_port}'
+
+    @property
+    def trunk_if(self):
+        return f'{self.name}-eth{self.trunk_port}'
+
+    def vlan_if(self, vid):
+        return f'{self.trunk_if}.{vid}'
+
+    def lan_ifs(self):
+        return [self.vlan_if(v.vid) for v in self.vlans]
+
+    # -------- ip -batch --------
+    def ip_batch(self):
+        lines = []
+        if self.mgmt_if:
+            # oude mgmt-interface uit (voorkomt rp_filter/routingconflict)
+            lines += [
+                f'addr flush dev {self.mgmt_if}',
+                f'link set {self.mgmt_if} down',
+            ]
+        lines += [
+            # WAN
+            f'addr flush dev {self.wan_if}',
+            f'addr add {self.wan_v4} dev {self.wan_if}',
+            f'addr add {self.wan_v6} dev {self.wan_if}',
+            f'link set {self.wan_if} up',
+            f'link set {self.trunk_if} up',
+        ]
+        for v in self.vlans:
+            lines += self._vlan_lines(v)
+        # '::/0' i.p.v. 'default' zodat de adresfamilie in batch-modus vastligt
+        lines += [
+            f'route replace default via {self.gw_v4} dev {self.wan_if}',
+            f'route replace ::/0 via {self.gw_v6} dev {self.wan_if}',
+        ]
+        return lines
+
+    def _vlan_lines(self, v):
+        ifname = self.vlan_if(v.vid)
+        return [
+            f'link add link {self.trunk_if} name {ifname} type vlan id {v.vid}',
+            f'addr add {v.gw4} dev {ifname}',
+            f'addr add {v.gw6} dev {ifname}',
+            f'link set {ifname} up',
+        ]
+
+    def isp_batch(self, isp_if, extra_addrs=(f'{INTERNET_V4}/32', f'{INTERNET_V6}/128')):
+        """ip -batch voor de ISP-kant van de WAN-link (incl. v6-retourroutes)."""
+        prefix4 = ipaddress.ip_interface(self.wan_v4).network.prefixlen
+        prefix6 = ipaddress.ip_interface(self.wan_v6).network.prefixlen
+        wan6 = ipaddress.ip_interface(self.wan_v6).ip
+        lines = [
+            f'addr flush dev {isp_if}',
+            f'addr add {self.gw_v4}/{prefix4} dev {isp_if}',
+            f'addr add {self.gw_v6}/{prefix6} dev {isp_if}',
+            f'link set {isp_if} up',
+        ]
+        for v in self.vlans:
+            net6 = ipaddress.ip_interface(v.gw6).network
+            lines.append(f'route replace {net6} via {wan6} dev {isp_if}')
+        # "Internet"-adressen (bv. 8.8.8.8) op de ISP simuleren
+        for addr in extra_addrs:
+            lines.append(f'addr add {addr} dev {isp_if}')
+        return lines
+
+    # -------- sysctl --------
+    def sysctls(self):
+        # Slash-notatie: VLAN-interfaces bevatten zelf een punt (edgeA-eth2.10)
+        ctl = [
+            ('net/ipv4/ip_forward', 1),
+            ('net/ipv4/conf/all/rp_filter', 0),
+            (f'net/ipv4/conf/{self.wan_if}/rp_filter', 0),
+            ('net/ipv6/conf/all/forwarding', 1),
+            (f'net/ipv6/conf/{self.wan_if}/forwarding', 1),
+            (f'net/ipv6/conf/{self.trunk_if}/forwarding', 1),
+        ]
+        for ifname in self.lan_ifs():
+            ctl.append((f'net/ipv4/conf/{ifname}/rp_filter', 0))
+            ctl.append((f'net/ipv6/conf/{ifname}/forwarding', 1))
+        return ctl
+
+    # -------- Firewall --------
+    def rules(self, family):
+        """Regels per tabel als (chain, match-spec) voor family 4 of 6."""
+        icmp = 'icmp' if family == 4 else 'ipv6-icmp'
+        est = '-m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT'
+        lan = self.lan_ifs()
+
+        filt = [
+            ('INPUT', est),
+            ('INPUT', '-i lo -j ACCEPT'),
+            ('INPUT', f'-p {icmp} -j ACCEPT'),
+        ]
+        if family == 6:
+            # ICMPv6 altijd doorlaten in FORWARD (NDP/PMTU)
+            filt.append(('FORWARD', f'-p {icmp} -j ACCEPT'))
+        # LAN -> WAN
+        for ifname in lan:
+            filt.append(('FORWARD', f'-i {ifname} -o {self.wan_if} -j ACCEPT'))
+        # Retourverkeer
+        filt.append(('FORWARD', est))
+        # Inter-VLAN blokkeren
+        for src in lan:
+            for dst in lan:
+                if src != dst:
+                    filt.append(('FORWARD', f'-i {src} -o {dst} -j DROP'))
+
+        tables = {'filter': filt}
+        if family == 4:
+            tables['nat'] = [('POSTROUTING', f'-o {self.wan_if} -j MASQUERADE')]
+        return tables
+
+    def forwards(self, family, in_if, out_if, proto=None, state='NEW'):
+        """Evalueer de FORWARD-chain voor één pakket (first match, dan policy)."""
+        for chain, spec in self.rules(family)['filter']:
+            if chain != 'FORWARD':
+                continue
+            verdict = _match_rule(spec.split(), in_if, out_if, proto, state)
+            if verdict is not None:
+                return verdict == 'ACCEPT'
+        return dict(POLICIES['filter'])['FORWARD'] == 'ACCEPT'
+
+    def restore_payload(self, family):
+        out = []
+        for table, rules in self.rules(family).items():
+            out.append(f'*{table}')
+            for chain, policy in POLICIES[table]:
+                out.append(f':{chain} {policy} [0:0]')
+            for chain, spec in rules:
+                out.append(f'-A {chain} {spec}')
+            out.append('COMMIT')
+        return '\n'.join(out) + '\n'
+
+    # -------- nftables --------
+    def nft_commands(self):
+        """Hetzelfde beleid als rules() als nft-commando's in één inet-tabel.
+
+        LAN -> WAN staat als elementen in de verdict map forward_policy (één
+        lookup per pakket); inter-VLAN verkeer valt op de drop-policy, dus de
+        O(VLANs^2) DROP-regels van iptables zijn niet nodig.
+        """
+        t = NFT_TABLE
+        cmds = [
+            f'add table {t}',
+            f'add map {t} forward_policy {{ type ifname . ifname : verdict ; }}',
+            f'add chain {t} input {{ type filter hook input priority 0 ; policy drop ; }}',
+            f'add rule {t} input ct state established,related accept',
+            f'add rule {t} input iifname "lo" accept',
+            f'add rule {t} input meta l4proto {{ icmp, ipv6-icmp }} accept',
+            f'add chain {t} forward {{ type filter hook forward priority 0 ; policy drop ; }}',
+            # ICMPv6 altijd doorlaten in FORWARD (NDP/PMTU), zoals bij ip6tables
+            f'add rule {t} forward meta l4proto ipv6-icmp accept',
+            f'add rule {t} forward ct state established,related accept',
+            f'add rule {t} forward iifname . oifname vmap @forward_policy',
+            f'add chain {t} postrouting {{ type nat hook postrouting priority 100 ; }}',
+            f'add rule {t} postrouting meta nfproto ipv4 oifname "{self.wan_if}" masquerade',
+        ]
+        return cmds + self.nft_elements()
+
+    def nft_elements(self):
+        return [f'add element {NFT_TABLE} forward_policy {{ "{ifname}" . "{self.wan_if}" : accept }}'
+                for ifname in self.lan_ifs()]
+
+    def nft_payload(self):
+        # Bestaande tabel eerst weg (en aanmaken als die er niet is): één transactie
+        lines = [f'add table {NFT_TABLE}', f'delete table {NFT_TABLE}'] + self.nft_commands()
+        return '\n'.join(lines) + '\n'
+
+    def nft_diff_payload(self, old):
+        """Alleen map-elementen erbij/eraf; None als de rest van de ruleset verschilt."""
+        if [c for c in self.nft_commands() if c not in self.nft_elements()] != \
+                [c for c in old.nft_commands() if c not in old.nft_elements()]:
+            return None
+        new, previous = set(self.nft_elements()), set(old.nft_elements())
+        lines = [c.replace('add element', 'delete element', 1).replace(' : accept', '')
+                 for c in old.nft_elements() if c not in new]
+        lines += [c for c in self.nft_elements() if c not in previous]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def clear_command(self):
+        """Shell-opdracht die de firewall van deze backend weer weghaalt."""
+        if self.firewall == 'nft':
+            return f'nft delete table {NFT_TABLE}'
+        parts = []
+        for tool in ('iptables', 'ip6tables'):
+            for table in self.rules(4 if tool == 'iptables' else 6):
+                parts += [f'{tool} -t {table} -F', f'{tool} -t {table} -X']
+                parts += [f'{tool} -t {table} -P {chain} ACCEPT' for chain, _ in POLICIES[table]]
+        return '; '.join(parts)
+
+    # -------- Incrementeel (live herconfiguratie) --------
+    def compatible(self, old):
+        """Kan old met apply_diff naar self? Alleen als WAN/trunk gelijk blijven."""
+        keys = ('name', 'wan_v4', 'wan_v6', 'gw_v4', 'gw_v6', 'mgmt_port', 'wan_port', 'trunk_port',
+                'firewall')
+        return all(getattr(self, k) == getattr(old, k) for k in keys)
+
+    def ip_diff(self, old):
+        """ip -batch-regels voor verwijderde en nieuwe/gewijzigde VLAN-subinterfaces."""
+        old_vlans = {v.vid: v for v in old.vlans}
+        new_vlans = {v.vid: v for v in self.vlans}
+        lines = [f'link del {old.vlan_if(vid)}' for vid, v in old_vlans.items()
+                 if new_vlans.get(vid) != v]
+        for v in self.vlans:
+            if old_vlans.get(v.vid) != v:
+                lines += self._vlan_lines(v)
+        return lines
+
+    def isp_diff(self, old, isp_if):
+        wan6 = ipaddress.ip_interface(self.wan_v6).ip
+        old_nets = {str(ipaddress.ip_interface(v.gw6).network) for v in old.vlans}
+        new_nets = {str(ipaddress.ip_interface(v.gw6).network) for v in self.vlans}
+        lines = [f'route del {net} dev {isp_if}' for net in sorted(old_nets - new_nets)]
+        lines += [f'route replace {net} via {wan6} dev {isp_if}'
+                  for net in sorted(new_nets - old_nets)]
+        return lines
+
+    def diff_payload(self, old, family):
+        """iptables-restore --noflush-payload die de regels van old naar self brengt."""
+        old_tables, new_tables = old.rules(family), self.rules(family)
+        out = []
+        for table in POLICIES:
+            old_rules = old_tables.get(table, [])
+            new_rules = new_tables.get(table, [])
+            lines = []
+            for chain, _ in POLICIES[table]:
+                lines += _chain_diff(chain, [spec for c, spec in old_rules if c == chain],
+                                     [spec for c, spec in new_rules if c == chain])
+            if lines:
+                out += [f'*{table}'] + lines + ['COMMIT']
+        return '\n'.join(out) + '\n' if out else None
+
+    def apply_diff(self, node, old):
+        """Breng een draaiende router van old naar self; geeft #commando's terug."""
+        payloads, templates = {}, []
+        ip = self.ip_diff(old)
+        if ip:
+            payloads['ip'] = '\n'.join(ip) + '\n'
+            templates.append('ip -force -batch {ip}')
+        old_ctl = set(old.sysctls())
+        ctl = [kv for kv in self.sysctls() if kv not in old_ctl]
+        if ctl:
+            payloads['sysctl'] = ''.join(f'{k} = {v}\n' for k, v in ctl)
+            templates.append('sysctl -q -e -p {sysctl}')
+        if self.firewall == 'nft':
+            payload = self.nft_diff_payload(old)
+            if payload is None:
+                payload = self.nft_payload()
+            if payload:
+                payloads['nft'] = payload
+                templates.append('nft -f {nft}')
+        else:
+            for family, key, tool in ((4, 'v4', 'iptables-restore'), (6, 'v6', 'ip6tables-restore')):
+                payload = self.diff_payload(old, family)
+                if payload:
+                    payloads[key] = payload
+                    templates.append(f'{tool} --noflush < {{{key}}}')
+        if not templates:
+            return 0
+        return run_payloads(node, payloads, templates, prefix=self.name)
+
+    def apply_isp_diff(self, node, old, isp_if):
+        lines = self.isp_diff(old, isp_if)
+        if not lines:
+            return 0
+        return run_payloads(node, {'ip': '\n'.join(lines) + '\n'},
+                            ['ip -force -batch {ip}'], prefix=node.name)
+
+    # -------- Toepassen --------
+    def commands(self):
+        """Oude pad: elke regel als losse shell-opdracht."""
+        cmds = [f'ip {line}' for line in self.ip_batch()]
+        cmds += [f'sysctl -q -w {key}={val}' for key, val in self.sysctls()]
+        if self.firewall == 'nft':
+            cmds.append(f'nft delete table {NFT_TABLE} 2>/dev/null')
+            cmds += [f"nft '{c}'" for c in self.nft_commands()]
+            return cmds
+        for family, tool in ((4, 'iptables'), (6, 'ip6tables')):
+            for table, rules in self.rules(family).items():
+                cmds.append(f'{tool} -t {table} -F')
+                cmds.append(f'{tool} -t {table} -X')
+                for chain, policy in POLICIES[table]:
+                    cmds.append(f'{tool} -t {table} -P {chain} {policy}')
+                for chain, spec in rules:
+                    cmds.append(f'{tool} -t {table} -A {chain} {spec}')
+        return cmds
+
+    def apply_sequential(self, node):
+        cmds = self.commands()
+        for c in cmds:
+            node.cmd(c)
+        return len(cmds)
+
+    def apply(self, node):
+        """Pas het model toe in drie à vier bulk-transacties; geeft #commando's terug."""
+        payloads = {
+            'ip': '\n'.join(self.ip_batch()) + '\n',
+            'sysctl': ''.join(f'{k} = {v}\n' for k, v in self.sysctls()),
+        }
+        # Volgorde: interfaces moeten bestaan voor de per-interface sysctls
+        templates = ['ip -force -batch {ip}', 'sysctl -q -e -p {sysctl}']
+        if self.firewall == 'nft':
+            payloads['nft'] = self.nft_payload()
+            templates.append('nft -f {nft}')
+        else:
+            payloads['v4'] = self.restore_payload(4)
+            payloads['v6'] = self.restore_payload(6)
+            templates += ['iptables-restore < {v4}', 'ip6tables-restore < {v6}']
+        return run_payloads(node, payloads, templates, prefix=self.name)
+
+    def apply_isp(self, node, isp_if):
+        lines = self.isp_batch(isp_if)
+        return run_payloads(node, {'ip': '\n'.join(lines) + '\n'},
+                            ['ip -force -batch {ip}'], prefix=node.name)
+
+
+def _match_rule(tokens, in_if, out_if, proto, state):
+    # Geeft het target van de regel als die matcht, anders None
+    # (alle opties in het model hebben precies één argument)
+    target = None
+    for opt, arg in zip(tokens[::2], tokens[1::2]):
+        if opt == '-i' and arg != in_if:
+            return None
+        if opt == '-o' and arg != out_if:
+            return None
+        if opt == '-p' and arg != proto:
+            return None
+        if opt == '--ctstate' and state not in arg.split(','):
+            return None
+        if opt == '-j':
+            target = arg
+    return target
+
+
+def _chain_diff(chain, old, new):
+    """-D/-I-regels die chain van old naar new brengen, achteraan beginnend
+    zodat de regelnummers van het nog niet behandelde deel kloppen."""
+    lines = []
+    ops = difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in reversed(ops):
+        if tag == 'equal':
+            continue
+        for i in range(i2, i1, -1):
+            lines.append(f'-D {chain} {i}')
+        for offset, spec in enumerate(new[j1:j2]):
+            lines.append(f'-I {chain} {i1 + 1 + offset} {spec}')
+    return lines
+
+
+def run_payloads(node, payloads, templates, prefix='edge'):
+    """Schrijf payloads naar tijdelijke bestanden en voer templates uit op node.
+
+    Mininet-hosts delen het bestandssysteem, dus de payloads gaan via
+    tijdelijke bestanden naar ip/sysctl/iptables-restore.
+    """
+    tmpdir = tempfile.mkdtemp(prefix=f'{prefix}-')
+    paths = {}
+    for key, text in payloads.items():
+        paths[key] = os.path.join(tmpdir, key)
+        with open(paths[key], 'w') as f:
+            f.write(text)
+    try:
+        for template in templates:
+            node.cmd(template.format(**paths))
+    finally:
+        for path in paths.values():
+            os.unlink(path)
+        os.rmdir(tmpdir)
+    return len(templates)
+
+
+def provision(node, router, mode='batch'):
+    """Configureer node volgens router; geeft (#commando's, seconden) terug."""
+    start = time.time()
+    if mode == 'sequential':
+        count = router.apply_sequential(node)
+    else:
+        count = router.apply(node)
+    return count, time.time() - start
+
+
+def _bench_net():
+    """Minimale topologie: edgeA met lan0 op mgmt en trunk, isp0 op de WAN."""
+    from mininet.net import Mininet
+    from mininet.topo import Topo
+
+    class EdgeBenchTopo(Topo):
+        def build(self):
+            edgeA = self.addHost('edgeA')
+            isp0 = self.addHost('isp0')
+            lan0 = self.addHost('lan0')
+            self.addLink(edgeA, lan0)   # edgeA-eth0 (mgmt)
+            self.addLink(edgeA, isp0)   # edgeA-eth1 (WAN)
+            self.addLink(edgeA, lan0)   # edgeA-eth2 (trunk)
+
+    return Mininet(topo=EdgeBenchTopo(), controller=None)
+
+
+def compare(runs=5):
+    """Timing-rapport: batch vs. losse commando's op een minimale topologie."""
+    router = EdgeRouter()
+    results = {}
+    for mode in ('sequential', 'batch'):
+        times = []
+        for _ in range(runs):
+            net = _bench_net()
+            net.start()
+            try:
+                count, elapsed = provision(net.get('edgeA'), router, mode)
+            finally:
+                net.stop()
+            times.append(elapsed)
+        times.sort()
+        results[mode] = (count, times[len(times) // 2], times[0], times[-1])
+
+    print('*** edgeA provisioning (%d runs)' % runs)
+    print('%-12s %6s %10s %10s %10s' % ('mode', 'cmds', 'median_s', 'min_s', 'max_s'))
+    for mode, (count, med, lo, hi) in results.items():
+        print('%-12s %6d %10.3f %10.3f %10.3f' % (mode, count, med, lo, hi))
+    seq, batch = results['sequential'][1], results['batch'][1]
+    if batch > 0:
+        print('*** speedup: %.1fx' % (seq / batch))
+    return results
+
+
+def _bench_vlans(count):
+    from netmodel import gateway4, gateway6, make_vlan
+
+    vlans = [make_vlan(vid) for vid in range(10, 10 + count)]
+    return vlans, [EdgeVlan(v.vid, f'{gateway4(v)}/{v.net4.prefixlen}',
+                            f'{gateway6(v)}/{v.net6.prefixlen}') for v in vlans]
+
+
+def _udp_pps(node, addr, duration, port=5201):
+    """Ontvangen pakketten/s voor 64-byte UDP zo snel als de zender kan."""
+    import json
+
+    out = node.cmd(f'iperf3 -c {addr} -p {port} -u -l 64 -b 0 -t {duration} -J')
+    try:
+        s = json.loads(out[out.index('{'):]).get('end', {}).get('sum', {})
+        return (s['packets'] - s['lost_packets']) / s['seconds']
+    except (ValueError, KeyError, ZeroDivisionError):
+        return None
+
+
+def firewall_bench(vlan_counts=(3, 30, 300), firewalls=FIREWALLS, duration=5):
+    """pps en nieuwe connecties/s door edgeA per backend en aantal VLANs.
+
+    Het verkeer komt uit de laatste VLAN (voor iptables het slechtste geval:
+    de LAN->WAN-regel staat achteraan) en gaat via NAT naar 8.8.8.8 op isp0.
+    """
+    from bench import CPS_PORT, HERE
+
+    results = []
+    print('%-6s %-9s %8s %8s %12s %10s' % ('vlans', 'firewall', 'rules', 'load_s', 'pps', 'cps'))
+    for count in vlan_counts:
+        vlans, edge_vlans = _bench_vlans(count)
+        src = vlans[-1]
+        for firewall in firewalls:
+            router = EdgeRouter(vlans=edge_vlans, firewall=firewall)
+            net = _bench_net()
+            net.start()
+            pids = []
+            try:
+                edge, isp0, lan0 = net.get('edgeA'), net.get('isp0'), net.get('lan0')
+                router.apply_isp(isp0, 'isp0-eth0')
+                _, load = provision(edge, router)
+                ifname = f'lan0-eth1.{src.vid}'
+                lan0.cmd(f'ip link set lan0-eth1 up; '
+                         f'ip link add link lan0-eth1 name {ifname} type vlan id {src.vid}; '
+                         f'ip addr add {src.net4.network_address + 1}/{src.net4.prefixlen} dev {ifname}; '
+                         f'ip link set {ifname} up; '
+                         f'ip route replace default via {ipaddress.ip_interface(edge_vlans[-1].gw4).ip}')
+                # Niet -D: de servers moeten met deze run mee stoppen (zie bench._start_servers)
+                pids.append(isp0.cmd('iperf3 -s -p 5201 >/dev/null 2>&1 & echo $!'))
+                pids.append(isp0.cmd(f'python3 {HERE} cps-server {CPS_PORT} >/dev/null 2>&1 & echo $!'))
+                time.sleep(0.5)
+                pps = _udp_pps(lan0, '8.8.8.8', duration)
+                out = lan0.cmd(f'python3 {HERE} cps-client 8.8.8.8 {CPS_PORT} {duration}')
+                try:
+                    cps = float(out.strip().splitlines()[-1])
+                except (ValueError, IndexError):
+                    cps = None
+            finally:
+                for pid in pids:
+                    pid = pid.strip().splitlines()[-1] if pid.strip() else ''
+                    if pid.isdigit():
+                        isp0.cmd(f'kill {pid}')
+                net.stop()
+            if firewall == 'nft':
+                rules = len(router.nft_commands())
+            else:
+                rules = sum(len(r) for f in (4, 6) for r in router.rules(f).values())
+            row = {'vlans': count, 'firewall': firewall, 'rules': rules,
+                   'load_s': round(load, 3), 'pps': pps, 'cps': cps}
+            results.append(row)
+            print('%-6d %-9s %8d %8.3f %12s %10s' % (
+                count, firewall, rules, load,
+                '-' if pps is None else f'{pps:.0f}', '-' if cps is None else f'{cps:.0f}'))
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    from mininet.log import setLogLevel
+
+    parser = argparse.ArgumentParser(description='edgeA provisioning: batch vs. sequentieel')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--firewall-bench', metavar='VLANS', nargs='?', const='3,30,300',
+                        help='pps/cps per firewall-backend voor deze aantallen VLANs')
+    parser.add_argument('--duration', type=int, default=5)
+    args = parser.parse_args()
+    setLogLevel('warning')
+    if args.firewall_bench:
+        firewall_bench([int(n) for n in args.firewall_bench.split(',')], duration=args.duration)
+    else:
+        compare(args.runs)
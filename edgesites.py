@@ -0,0 +1,152 @@
+"""Edge-routers per site: belasting meten en gateway-failover.
+
+Met NetModel(edge_sites=N) heeft elke site een eigen edge-router met ISP;
+hosts gaan via hun eigen site naar buiten. Twee hulpmiddelen:
+  - EdgeLoad: darkfiber-bytes (tx op de core-poorten) tijdens een meting en
+    het aantal conntrack-entries per router, als meta-velden voor bench.py;
+    vergelijk een run met --edge-sites 1 en --edge-sites 2.
+  - EdgeFailover: achtergrondthread die per interval de WAN- en trunk-link
+    van elke router controleert. Valt een router uit, dan neemt de volgende
+    gezonde router (in sitevolgorde, rondgaand) zijn gateway-adressen over
+    (plus gratuitous ARP); bij herstel gaan ze terug. Hosts houden dus hun
+    gateway-adres, alleen de MAC erachter verandert. IPv6-hosts merken de
+    wissel via neighbor unreachability detection (enkele seconden).
+"""
+
+import threading
+import time
+
+from mininet.util import quietRun
+
+from telemetry import parse_ports
+
+
+def _ip(cidr):
+    return cidr.split('/')[0]
+
+
+# -------- Belasting --------
+class EdgeLoad(object):
+    """Snapshot bij aanmaken; aanroepen geeft de meta-velden sindsdien."""
+
+    def __init__(self, net, model):
+        self.net = net
+        self.edges = model.edges()
+        self.ports = {}
+        for link in model.links:
+            if link.kind == 'darkfiber':
+                self.ports.setdefault(link.node1, []).append(f'{link.node1}-eth{link.port1}')
+                self.ports.setdefault(link.node2, []).append(f'{link.node2}-eth{link.port2}')
+        self.before = self.darkfiber_bytes()
+
+    def darkfiber_bytes(self):
+        total = 0
+        for core, ports in self.ports.items():
+            counters = parse_ports(quietRun(f'ovs-ofctl -O OpenFlow13 dump-ports {core}'))
+            total += sum(counters.get(f'{p}.tx_bytes', 0) for p in ports)
+        return total
+
+    def conntrack(self):
+        """{router: #conntrack-entries}; /proc/sys/net is per network namespace."""
+        counts = {}
+        for edge in self.edges:
+            out = self.net.get(edge.router.name).cmd(
+                'cat /proc/sys/net/netfilter/nf_conntrack_count 2>/dev/null').strip()
+            counts[edge.router.name] = int(out) if out.isdigit() else None
+        return counts
+
+    def __call__(self):
+        meta = {'edge_routers': len(self.edges),
+                'darkfiber_tx_bytes': self.darkfiber_bytes() - self.before}
+        for name, count in self.conntrack().items():
+            meta[f'conntrack_{name}'] = count
+        return meta
+
+
+# -------- Failover --------
+class EdgeFailover(object):
+    """Verplaatst gateway-adressen van uitgevallen edge-routers naar een buur."""
+
+    def __init__(self, net, model, interval=0.5):
+        self.edges = model.edges()
+        self.nodes = {e.router.name: net.get(e.router.name) for e in self.edges}
+        self.interval = interval
+        # Welke router bedient nu de gateways van router X (None = niemand)
+        self.holder = {e.router.name: e.router.name for e in self.edges}
+        self.events = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self, router, cmd):
+        # pexec start een eigen proces in de namespace; veilig naast node.cmd in de CLI
+        out, _, _ = self.nodes[router.name].pexec(cmd, shell=True)
+        return out
+
+    def healthy(self, router):
+        out = self._run(router, f'ip -o link show dev {router.wan_if}; '
+                                f'ip -o link show dev {router.trunk_if}')
+        lines = out.splitlines()
+        return len(lines) == 2 and all('state UP' in line for line in lines)
+
+    def _addr_cmds(self, owner, router, action):
+        # Gateway-adressen van owner op de VLAN-interfaces van router
+        cmds = []
+        for v in owner.vlans:
+            ifname = router.vlan_if(v.vid)
+            cmds.append(f'ip addr {action} {v.gw4} dev {ifname}')
+            cmds.append(f'ip -6 addr {action} {v.gw6} dev {ifname}' + (' nodad' if action == 'add' else ''))
+            if action == 'add':
+                cmds.append(f'arping -q -U -c 1 -I {ifname} {_ip(v.gw4)}')
+        return '; '.join(f'{c} 2>/dev/null' for c in cmds)
+
+    def _target(self, index, health):
+        # De router zelf als die gezond is, anders de eerstvolgende gezonde
+        for offset in range(len(self.edges)):
+            edge = self.edges[(index + offset) % len(self.edges)]
+            if health[edge.router.name]:
+                return edge.router
+        return None
+
+    def check(self):
+        """Eén ronde: gezondheid bepalen en gateways verplaatsen; geeft de events."""
+        routers = {e.router.name: e.router for e in self.edges}
+        health = {name: self.healthy(router) for name, router in routers.items()}
+        events = []
+        for index, edge in enumerate(self.edges):
+            owner = edge.router
+            target = self._target(index, health)
+            current = self.holder[owner.name]
+            new = target.name if target else None
+            if new == current:
+                continue
+            if current:
+                self._run(routers[current], self._addr_cmds(owner, routers[current], 'del'))
+            if target:
+                self._run(target, self._addr_cmds(owner, target, 'add'))
+            self.holder[owner.name] = new
+            event = (time.time(), owner.name, current, new)
+            events.append(event)
+            print(f'*** failover: gateways van {owner.name}: {current or "-"} -> {new or "-"}')
+        self.events += events
+        return events
+
+    # -------- Achtergrondthread --------
+    def _loop(self):
+        while not self._stop.is_set():
+            start = time.time()
+            try:
+                self.check()
+            except OSError as e:
+                print(f'*** failover: controle mislukt: {e}')
+            self._stop.wait(max(0.0, self.interval - (time.time() - start)))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name='edge-failover', daemon=True)
+        self._thread.start()
+        print(f'*** failover: {len(self.edges)} edge-routers elke {self.interval}s gecontroleerd')
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,78 @@
+"""Parallelle hostconfiguratie: default routes en IPv6 per host.
+
+Elke Mininet-host heeft een eigen shell, dus de configuratie kan per host
+tegelijk lopen. Per host gaat er één gebundelde opdracht naar de shell; een
+begrensde threadpool bepaalt hoeveel hosts tegelijk worden geconfigureerd.
+"""
+
+import ipaddress
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ip4/ip6: (extra) adressen in cidr-notatie, gw4/gw6: gateways; None = overslaan
+# routes: extra [(prefix, via)] naast de default routes
+HostConfig = namedtuple('HostConfig', 'name intf ip4 gw4 ip6 gw6 routes')
+
+WORKERS = 32
+
+
+def host_config(name, ip4=None, gw4=None, ip6=None, gw6=None, intf=None, routes=()):
+    return HostConfig(name, intf or f'{name}-eth0', ip4, gw4, ip6, gw6, list(routes))
+
+
+def from_vlan_table(vlans, table):
+    """Configs uit een tabel [(host, vid, ip6)] en de VLANs van de edge-router."""
+    gateways = {v.vid: v for v in vlans}
+    configs = []
+    for name, vid, ip6 in table:
+        v = gateways[vid]
+        configs.append(host_config(
+            name,
+            gw4=str(ipaddress.ip_interface(v.gw4).ip),
+            ip6=ip6,
+            gw6=str(ipaddress.ip_interface(v.gw6).ip)))
+    return configs
+
+
+def from_model(model):
+    """Configs voor alle hosts van een netmodel.NetModel."""
+    configs = []
+    for h in model.hosts:
+        vlan = model.vlan(h.vlan)
+        if vlan.routed:
+            gw4, gw6 = model.host_gateways(h)
+            configs.append(host_config(h.name, gw4=gw4, ip6=h.ip6, gw6=gw6,
+                                       routes=model.host_routes(h)))
+        else:
+            configs.append(host_config(h.name, ip6=h.ip6))
+    return configs
+
+
+def command(cfg):
+    """Eén gebundelde shell-opdracht voor de host."""
+    parts = []
+    if cfg.ip4:
+        parts.append(f'ip addr add {cfg.ip4} dev {cfg.intf}')
+    if cfg.gw4:
+        parts.append(f'ip route replace default via {cfg.gw4}')
+    if cfg.ip6:
+        parts.append(f'ip -6 addr add {cfg.ip6} dev {cfg.intf}')
+    if cfg.gw6:
+        parts.append(f'ip -6 route replace default via {cfg.gw6}')
+    for prefix, via in cfg.routes:
+        parts.append(f'ip route replace {prefix} via {via}')
+    return '; '.join(parts)
+
+
+def provision_hosts(net, configs, workers=WORKERS):
+    """Configureer alle hosts parallel; geeft (#hosts, seconden) terug."""
+    start = time.time()
+    jobs = [(net.get(cfg.name), command(cfg)) for cfg in configs]
+    jobs = [(node, cmd) for node, cmd in jobs if cmd]
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            # list() zodat exceptions uit de workers hier omhoog komen
+            list(pool.map(lambda job: job[0].cmd(job[1]), jobs))
+    return len(jobs), time.time() - start
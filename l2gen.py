@@ -0,0 +1,301 @@
+"""Synthetische L2-endpoints achter één access-poort (draait in een Mininet-host).
+
+Eén proces per generator stuurt met een raw socket (AF_PACKET) frames met
+duizenden bron-MACs de poort op:
+  - aanmelden: per nieuw endpoint een gratuitous ARP (en met --nd een IPv6
+    DAD neighbor solicitation), in --rate endpoints per seconde;
+  - ARP-verversing: elk actief endpoint opnieuw elke --arp-interval seconden;
+  - churn: zodra alle endpoints actief zijn verdwijnt per seconde een fractie
+    (--churn) van de niet-stabiele endpoints en komen er nieuwe MACs voor in
+    de plaats;
+  - flows: --pps UDP-frames van de stabiele endpoints naar die van de peer-
+    generator; de peer telt wat er aankomt (per fase: fill/churn).
+Adressen komen uit 100.64.0.0/10 en fd00::/8 (alleen voor realistische
+ARP/ND-frames; Faucet leert op MAC). De /10 heeft 22 bits: 6 voor het
+generatornummer (MAX_GEN) en 16 voor het serienummer (MAX_SERIALS, inclusief
+alle door churn vervangen endpoints); daarboven zouden adressen dubbel gaan.
+
+Uitvoer: één JSON-object op stdout met per MAC het aanmeldtijdstip en de
+tellers.
+
+Alleen standaardbibliotheek, zodat het in elke host-namespace start:
+    python3 l2gen.py --intf h3v10-eth0 --gen 1 --peer 2 --endpoints 1000 ...
+"""
+
+import ipaddress
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+
+ETH_P_ALL = 0x0003
+ETH_P_IP = 0x0800
+ETH_P_ARP = 0x0806
+ETH_P_IPV6 = 0x86DD
+SOL_PACKET = 263
+PACKET_ADD_MEMBERSHIP = 1
+PACKET_MR_PROMISC = 1
+
+FLOW_PORT = 9999
+BROADCAST = b'\xff' * 6
+TICK = 0.01
+PHASES = ('fill', 'churn')
+
+BASE4 = ipaddress.ip_address('100.64.0.0')
+BASE6 = ipaddress.ip_address('fd00::')
+MAX_GEN = 0x3f
+MAX_SERIALS = 1 << 16
+
+
+# -------- Adressen --------
+def endpoint_mac(gen, serial):
+    # 06:.. = lokaal beheerd unicast; gen in de tweede byte, serial in de laatste vier
+    return '06:%02x:%02x:%02x:%02x:%02x' % (
+        gen & 0xff, (serial >> 24) & 0xff, (serial >> 16) & 0xff, (serial >> 8) & 0xff, serial & 0xff)
+
+
+def endpoint_ip4(gen, serial):
+    return BASE4 + (gen << 16) + serial
+
+
+def endpoint_ip6(gen, serial):
+    return BASE6 + (gen << 64) + serial
+
+
+def serials_needed(endpoints, stable, churn, duration):
+    """Bovengrens op het aantal serials: alle endpoints plus churn over de hele duur."""
+    stable = min(stable, endpoints)
+    return endpoints + int(churn * (endpoints - stable) * duration) + 1
+
+
+def check_limits(gen, peer, endpoints, stable, churn, duration):
+    """ValueError als generatornummers of serials buiten de adresruimte vallen."""
+    for number in (gen, peer):
+        if number is not None and not 0 <= number <= MAX_GEN:
+            raise ValueError(f'generatornummer {number} buiten 0..{MAX_GEN}')
+    needed = serials_needed(endpoints, stable, churn, duration)
+    if needed > MAX_SERIALS:
+        raise ValueError(f'{needed} endpoints (incl. churn) per generator, maximaal {MAX_SERIALS}')
+
+
+def _mac(text):
+    return bytes(int(b, 16) for b in text.split(':'))
+
+
+# -------- Frames --------
+def _checksum(data):
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    while total >> 16:
+        total = (total & 0xffff) + (total >> 16)
+    return ~total & 0xffff
+
+
+def ether(dst, src, ethertype, payload):
+    return dst + src + struct.pack('!H', ethertype) + payload
+
+
+def garp(mac, ip4):
+    """Gratuitous ARP-request (sender = target = eigen adres) naar broadcast."""
+    ip = ip4.packed
+    payload = struct.pack('!HHBBH6s4s6s4s', 1, ETH_P_IP, 6, 4, 1, mac, ip, b'\0' * 6, ip)
+    return ether(BROADCAST, mac, ETH_P_ARP, payload)
+
+
+def dad_ns(mac, ip6):
+    """DAD neighbor solicitation (bron ::) voor ip6 naar het solicited-node-adres."""
+    target = ip6.packed
+    dst = ipaddress.ip_address('ff02::1:ff00:0') + (int(ip6) & 0xffffff)
+    icmp = struct.pack('!BBHI16s', 135, 0, 0, 0, target)
+    src = ipaddress.ip_address('::')
+    pseudo = src.packed + dst.packed + struct.pack('!I3xB', len(icmp), 58)
+    icmp = icmp[:2] + struct.pack('!H', _checksum(pseudo + icmp)) + icmp[4:]
+    header = struct.pack('!IHBB16s16s', 6 << 28, len(icmp), 58, 255, src.packed, dst.packed)
+    eth_dst = b'\x33\x33' + dst.packed[-4:]
+    return ether(eth_dst, mac, ETH_P_IPV6, header + icmp)
+
+
+def udp4(dst_mac, src_mac, src, dst, payload, port=FLOW_PORT):
+    udp = struct.pack('!HHHH', port, port, 8 + len(payload), 0) + payload
+    header = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(udp), 0, 0, 64, 17, 0,
+                         src.packed, dst.packed)
+    header = header[:10] + struct.pack('!H', _checksum(header)) + header[12:]
+    return ether(dst_mac, src_mac, ETH_P_IP, header + udp)
+
+
+def parse_flow(frame):
+    """(seq, fase) van een flow-frame, anders None."""
+    if len(frame) < 47 or frame[12:14] != b'\x08\x00' or frame[23] != 17:
+        return None
+    ihl = (frame[14] & 0x0f) * 4
+    udp = 14 + ihl
+    if struct.unpack('!H', frame[udp + 2:udp + 4])[0] != FLOW_PORT:
+        return None
+    return struct.unpack('!IB', frame[udp + 8:udp + 13])
+
+
+# -------- Generator --------
+class Generator(object):
+    def __init__(self, intf, gen, peer=None, endpoints=1000, stable=16, rate=500.0,
+                 churn=0.05, arp_interval=30.0, nd=False, pps=1000.0, duration=30.0,
+                 start_at=None):
+        check_limits(gen, peer, endpoints, stable, churn, duration)
+        self.intf = intf
+        self.gen = gen
+        self.peer = peer
+        self.endpoints = endpoints
+        self.stable = min(stable, endpoints)
+        self.rate = rate
+        self.churn = churn
+        self.arp_interval = arp_interval
+        self.nd = nd
+        self.pps = pps if peer is not None else 0.0
+        self.duration = duration
+        self.start_at = start_at or time.time()
+
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        self.sock.bind((intf, 0))
+        # Promiscuous: frames voor de virtuele MACs moeten ook binnenkomen
+        mreq = struct.pack('iHH8s', socket.if_nametoindex(intf), PACKET_MR_PROMISC, 0, b'')
+        self.sock.setsockopt(SOL_PACKET, PACKET_ADD_MEMBERSHIP, mreq)
+        self.sock.settimeout(0.2)
+
+        self.active = deque()     # niet-stabiele serials, oudste eerst
+        self.next_serial = 0
+        self.intro = {}
+        self.counts = {'garp': 0, 'ns': 0, 'refresh': 0, 'retired': 0}
+        self.tx = dict.fromkeys(PHASES, 0)
+        self.rx = dict.fromkeys(PHASES, 0)
+        self.phase = 'fill'
+        self._done = threading.Event()
+
+    def _send(self, frame):
+        try:
+            self.sock.send(frame)
+        except OSError:
+            pass   # volle queue: telt als niet verstuurd, niet als verlies
+
+    def _announce(self, serial, refresh=False):
+        mac = _mac(endpoint_mac(self.gen, serial))
+        self._send(garp(mac, endpoint_ip4(self.gen, serial)))
+        if refresh:
+            self.counts['refresh'] += 1
+            return
+        self.counts['garp'] += 1
+        if self.nd:
+            self._send(dad_ns(mac, endpoint_ip6(self.gen, serial)))
+            self.counts['ns'] += 1
+
+    def _add(self):
+        serial = self.next_serial
+        self.next_serial += 1
+        self.intro[endpoint_mac(self.gen, serial)] = time.time()
+        self._announce(serial)
+        if serial >= self.stable:
+            self.active.append(serial)
+
+    def _flow(self, seq):
+        i = seq % self.stable
+        phase = PHASES.index(self.phase)
+        self._send(udp4(_mac(endpoint_mac(self.peer, i)), _mac(endpoint_mac(self.gen, i)),
+                        endpoint_ip4(self.gen, i), endpoint_ip4(self.peer, i),
+                        struct.pack('!IB', seq, phase)))
+        self.tx[self.phase] += 1
+
+    def _receive(self):
+        own = {_mac(endpoint_mac(self.gen, i)) for i in range(self.stable)}
+        while not self._done.is_set():
+            try:
+                frame = self.sock.recv(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if frame[:6] not in own:
+                continue
+            parsed = parse_flow(frame)
+            if parsed:
+                self.rx[PHASES[min(parsed[1], len(PHASES) - 1)]] += 1
+
+    def run(self):
+        receiver = threading.Thread(target=self._receive, daemon=True)
+        receiver.start()
+        while time.time() < self.start_at:
+            time.sleep(TICK)
+        start = time.time()
+        end = start + self.duration
+        # Tegoeden per soort: zo volgt elke stroom zijn eigen tempo
+        credit = {'add': 0.0, 'churn': 0.0, 'refresh': 0.0, 'flow': 0.0}
+        seq = 0
+        refresh = 0
+        last = start
+        while time.time() < end:
+            now = time.time()
+            dt, last = now - last, now
+            if self.phase == 'fill':
+                credit['add'] += self.rate * dt
+                while credit['add'] >= 1 and self.next_serial < self.endpoints:
+                    self._add()
+                    credit['add'] -= 1
+                if self.next_serial >= self.endpoints:
+                    self.phase = 'churn'
+            else:
+                credit['churn'] += self.churn * len(self.active) * dt
+                while credit['churn'] >= 1 and self.active:
+                    self.active.popleft()
+                    self.counts['retired'] += 1
+                    self._add()
+                    credit['churn'] -= 1
+            total = self.stable + len(self.active)
+            if self.arp_interval:
+                credit['refresh'] += total / self.arp_interval * dt
+                while credit['refresh'] >= 1 and total:
+                    serial = refresh % total
+                    self._announce(serial if serial < self.stable else self.active[serial - self.stable],
+                                   refresh=True)
+                    refresh += 1
+                    credit['refresh'] -= 1
+            credit['flow'] += self.pps * dt
+            while credit['flow'] >= 1:
+                self._flow(seq)
+                seq += 1
+                credit['flow'] -= 1
+            time.sleep(max(0.0, TICK - (time.time() - now)))
+        # In-flight frames van de peer nog meetellen
+        time.sleep(1.0)
+        self._done.set()
+        receiver.join()
+        return {'gen': self.gen, 'peer': self.peer, 'intf': self.intf, 'start': start,
+                'endpoints': self.next_serial, 'intro': self.intro, 'counts': self.counts,
+                'tx': self.tx, 'rx': self.rx}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Synthetische L2-endpoints op één interface')
+    parser.add_argument('--intf', required=True)
+    parser.add_argument('--gen', type=int, required=True, help=f'generatornummer (0..{MAX_GEN})')
+    parser.add_argument('--peer', type=int, default=None, help='generator die de flows ontvangt')
+    parser.add_argument('--endpoints', type=int, default=1000)
+    parser.add_argument('--stable', type=int, default=16, help='endpoints zonder churn (flowbronnen)')
+    parser.add_argument('--rate', type=float, default=500.0, help='nieuwe endpoints per seconde')
+    parser.add_argument('--churn', type=float, default=0.05, help='fractie vervangen per seconde')
+    parser.add_argument('--arp-interval', type=float, default=30.0)
+    parser.add_argument('--nd', action='store_true', help='ook IPv6 DAD-NS per nieuw endpoint')
+    parser.add_argument('--pps', type=float, default=1000.0)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--start-at', type=float, default=None, help='gezamenlijk starttijdstip (epoch)')
+    args = parser.parse_args(argv)
+    gen = Generator(args.intf, args.gen, args.peer, args.endpoints, args.stable, args.rate,
+                    args.churn, args.arp_interval, args.nd, args.pps, args.duration, args.start_at)
+    json.dump(gen.run(), sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
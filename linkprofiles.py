@@ -0,0 +1,115 @@
+"""Benoemde link-profielen (bandbreedte/delay/loss) per linksoort.
+
+Een profielnaam beschrijft zichzelf: "darkfiber-10G-2ms" = 10 Gbit/s en
+2 ms delay, "isp-1G-15ms-0.1%loss" = 1 Gbit/s, 15 ms en 0.1% verlies. Naast
+de vaste PROFILES wordt elke naam in dit formaat geparst: een optioneel
+label vooraan ("isp", "wan2"), daarna tokens <n>G/<n>M (bandbreedte), <n>ms
+(delay), j<n>ms (jitter) en <n>%loss; "1G-15ms" kan dus ook. Toegepast met TCLink (HTB + netem); Mininet begrenst bw standaard
+op 1000 Mbit/s, ShapedIntf niet.
+
+Linksoorten komen uit het netmodel: access, uplink, darkfiber, wan, edge.
+"""
+
+import re
+
+from mininet.link import TCIntf, TCLink
+
+
+UNSHAPED = 'unshaped'
+
+PROFILES = {
+    UNSHAPED: {},
+    'darkfiber-10G-2ms': {'bw': 10000, 'delay': '2ms'},
+    'isp-1G-15ms-0.1%loss': {'bw': 1000, 'delay': '15ms', 'loss': 0.1},
+    'access-1G': {'bw': 1000},
+    'uplink-10G': {'bw': 10000},
+}
+
+# Standaardkeuze per linksoort voor --link-profiles default
+DEFAULT_PROFILES = {
+    'access': 'access-1G',
+    'uplink': 'uplink-10G',
+    'darkfiber': 'darkfiber-10G-2ms',
+    'wan': 'isp-1G-15ms-0.1%loss',
+    'edge': 'uplink-10G',
+}
+
+TOKEN_RE = re.compile(r'^(?:(?P<bw>[\d.]+)(?P<unit>[GM])|(?P<delay>[\d.]+ms)|'
+                      r'j(?P<jitter>[\d.]+ms)|(?P<loss>[\d.]+)%loss)$')
+LABEL_RE = re.compile(r'^[a-z][a-z0-9_]*$')
+
+
+class ShapedIntf(TCIntf):
+    # HTB op veths haalt ook >1G; de Mininet-grens is alleen een sanity check
+    bwParamMax = 100000
+
+
+class ShapedLink(TCLink):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('cls1', ShapedIntf)
+        kwargs.setdefault('cls2', ShapedIntf)
+        TCLink.__init__(self, *args, **kwargs)
+
+
+def parse_profile(name):
+    """TCLink-parameters voor een profielnaam; ValueError bij onbekende tokens."""
+    if name in PROFILES:
+        return dict(PROFILES[name])
+    tokens = name.split('-')
+    # Label alleen vooraan en alleen als het zelf geen parameter is
+    if tokens and not TOKEN_RE.match(tokens[0]) and LABEL_RE.match(tokens[0]):
+        tokens = tokens[1:]
+    params = {}
+    for token in tokens:
+        m = TOKEN_RE.match(token)
+        if not m:
+            raise ValueError(f'link-profiel {name}: onbekend deel {token!r}')
+        if m.group('bw'):
+            key, value = 'bw', float(m.group('bw')) * (1000 if m.group('unit') == 'G' else 1)
+        elif m.group('delay'):
+            key, value = 'delay', m.group('delay')
+        elif m.group('jitter'):
+            key, value = 'jitter', m.group('jitter')
+        else:
+            key, value = 'loss', float(m.group('loss'))
+        if key in params:
+            raise ValueError(f'link-profiel {name}: {key} staat er twee keer in')
+        params[key] = value
+    if not params:
+        raise ValueError(f'link-profiel {name}: geen bandbreedte, delay, jitter of verlies')
+    return params
+
+
+def link_params(name):
+    """Opties voor Topo.addLink: leeg voor unshaped, anders ShapedLink + parameters."""
+    params = parse_profile(name) if name else {}
+    if not params:
+        return {}
+    return dict(params, cls=ShapedLink)
+
+
+def parse_assignments(text):
+    """'default' of 'soort=profiel,...' (optioneel na 'default,') -> {soort: profiel}."""
+    result = {}
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        if part == 'default':
+            result.update(DEFAULT_PROFILES)
+            continue
+        kind, sep, name = part.partition('=')
+        if not sep:
+            raise ValueError(f'link-profiel {part!r}: verwacht soort=profiel')
+        parse_profile(name)
+        result[kind] = name
+    return result
+
+
+def profile_meta(profiles):
+    """Platte meta-velden voor het benchmarkrapport (profile_<soort>: naam)."""
+    return {f'profile_{kind}': name for kind, name in sorted((profiles or {}).items())}
+
+
+def add_arguments(parser):
+    parser.add_argument('--link-profiles', metavar='SPEC', default=None,
+                        help="'default' of soort=profiel,... (soorten: "
+                             + ', '.join(DEFAULT_PROFILES) + '; profielen: '
+                             + ', '.join(p for p in PROFILES if p != UNSHAPED) + ')')
@@ -0,0 +1,300 @@
+"""L2-loadtest: duizenden virtuele endpoints per access-poort tegen Faucet en OVS.
+
+Bouwt een topologie uit netmodel.NetModel (zonder edge/ctrl), laadt de
+Faucet-config en start in elke host een l2gen.py-generator: die host staat op
+zijn eigen access-poort, dus achter elke poort komen --endpoints MACs bij.
+Generatoren in dezelfde VLAN sturen elkaar UDP-flows (ring). Ondertussen
+pollt de root-namespace alle switches (dump-flows) en legt vast:
+  - learning-latency: aanmelding van een endpoint (eerste gratuitous ARP) tot
+    zijn eth_dst-flow op de eigen access-switch staat (p50/p95/max, en welk
+    deel van de endpoints überhaupt geleerd is). De polls lopen na elkaar
+    (--poll-interval, plus de duur van dump-flows), dus een latency is niet
+    nauwkeuriger dan learn_resolution_ms (pollperiode + polltijd);
+  - flows per seconde: gemiddeld (tot de piek) en de hoogste rate tussen twee
+    polls;
+  - tabelgroottes per switch en tabel over de tijd (<output>_tables.csv);
+  - verlies van de flows tussen de stabiele endpoints, apart voor de
+    vulfase en de churnfase.
+Paren die volgens de ACLs (verify.acl_allows) geblokkeerd zijn, tellen niet
+mee voor verlies. De run start eigen Faucet-instanties (controller.FaucetGroup,
+--controllers N); een systeem-Faucet en zijn config worden niet aangeraakt.
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from mininet.link import Link
+from mininet.net import Mininet
+
+from controller import FaucetGroup
+from l2gen import MAX_GEN, PHASES, check_limits, endpoint_ip4
+from multictl import percentile
+from netmodel import NetModel, load_acls
+from ovs import FaucetSwitch
+from ready import IfaceReady, SwitchesConnected, wait_ready
+from telemetry import dump_flows, parse_flows
+from topo_schaalbaar import SDNTopo, add_controllers
+from verify import acl_allows, vlan_acls
+
+
+L2GEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'l2gen.py')
+POLL_INTERVAL = 0.5
+START_DELAY = 2.0
+# Generatornummers 1..MAX_GEN (zie l2gen: 6 bits in het IPv4-adres)
+MAX_GENERATORS = MAX_GEN
+
+# Eén generator: host (op zijn access-poort), generatornummer, peer-nummer of None
+Generator = namedtuple('Generator', 'host gen peer')
+
+
+def build_model(sites=2, access=2, hosts_per_vlan=1, vids=(10, 20, 30), controllers=1):
+    return NetModel(sites=sites, access_per_site=access, hosts_per_vlan=hosts_per_vlan,
+                    vids=vids, ctrl=False, edge=False, controllers=controllers)
+
+
+def generators(model, limit=None):
+    """Eén generator per host; de peer is de volgende host in dezelfde VLAN (ring)."""
+    hosts = model.hosts[:limit] if limit else list(model.hosts)
+    if len(hosts) > MAX_GENERATORS:
+        raise ValueError(f'maximaal {MAX_GENERATORS} generatoren (gebruik --ports)')
+    numbers = {h.name: i + 1 for i, h in enumerate(hosts)}
+    by_vlan = {}
+    for h in hosts:
+        by_vlan.setdefault(h.vlan, []).append(h)
+    result = []
+    for group in by_vlan.values():
+        for i, h in enumerate(group):
+            peer = group[(i + 1) % len(group)] if len(group) > 1 else None
+            result.append(Generator(h, numbers[h.name], numbers[peer.name] if peer else None))
+    return sorted(result, key=lambda g: g.gen)
+
+
+def check_options(options):
+    """ValueError als de endpoints (incl. churn) niet in de l2gen-adresruimte passen."""
+    check_limits(MAX_GENERATORS, None, options['endpoints'], options['stable'],
+                 options['churn'], options['duration'])
+
+
+def flow_allowed(model, config, g):
+    # De UDP-flows lopen binnen één VLAN; alleen de acl_in van die VLAN telt
+    if g.peer is None:
+        return False
+    rules = vlan_acls(config).get(model.vlan(g.host.vlan).vid)
+    pkt = {'eth_type': 0x0800, 'ip_proto': 17,
+           'ipv4_src': str(endpoint_ip4(g.gen, 0)), 'ipv4_dst': str(endpoint_ip4(g.peer, 0))}
+    return acl_allows(rules, pkt)
+
+
+def _worker_args(g, options, start_at):
+    args = [sys.executable, L2GEN, '--intf', f'{g.host.name}-eth0', '--gen', str(g.gen),
+            '--start-at', repr(start_at)]
+    if g.peer is not None:
+        args += ['--peer', str(g.peer)]
+    for key in ('endpoints', 'stable', 'rate', 'churn', 'arp_interval', 'pps', 'duration'):
+        args += ['--' + key.replace('_', '-'), str(options[key])]
+    if options['nd']:
+        args.append('--nd')
+    return args
+
+
+class Monitor(object):
+    """Pollt alle switches; onthoudt tabelgroottes en wanneer een MAC geleerd is."""
+
+    def __init__(self, model, gens):
+        self.switches = [sw.name for sw in model.switches]
+        # Synthetische MACs worden op de access-switch van hun generator verwacht
+        self.access = {g.gen: g.host.switch for g in gens}
+        self.rows = []
+        self.totals = []
+        self.learned = {}
+        self.poll_seconds = 0.0
+
+    def resolution(self):
+        """Onzekerheid van één learning-tijdstip in seconden: pollperiode + polltijd."""
+        starts = [ts for ts, _ in self.totals]
+        if len(starts) < 2:
+            return None
+        period = (starts[-1] - starts[0]) / (len(starts) - 1)
+        return period + self.poll_seconds / len(starts)
+
+    def poll(self):
+        start = time.time()
+        total = 0
+        for sw, text in dump_flows(self.switches).items():
+            tables, macs = parse_flows(text)
+            for table, count in sorted(tables.items()):
+                self.rows.append((start, sw, table, count))
+            total += sum(tables.values())
+            for mac in macs:
+                if mac.startswith('06:') and mac not in self.learned:
+                    gen = int(mac.split(':')[1], 16)
+                    if self.access.get(gen) == sw:
+                        self.learned[mac] = start
+        self.totals.append((start, total))
+        self.poll_seconds += time.time() - start
+
+    def run_until(self, deadline, interval=POLL_INTERVAL):
+        while time.time() < deadline:
+            start = time.time()
+            self.poll()
+            time.sleep(max(0.0, interval - (time.time() - start)))
+
+
+def summarize(monitor, reports, allowed):
+    """Meetresultaten uit de monitor en de generator-rapporten."""
+    intro = {mac: ts for r in reports for mac, ts in r['intro'].items()}
+    latencies = [(monitor.learned[mac] - ts) * 1000 for mac, ts in intro.items()
+                 if mac in monitor.learned and monitor.learned[mac] >= ts]
+    totals = monitor.totals
+    base = totals[0][1] if totals else 0
+    peak_ts, peak = max(totals, key=lambda t: t[1]) if totals else (0, 0)
+    start = min(r['start'] for r in reports) if reports else 0
+    rates = [(b[1] - a[1]) / (b[0] - a[0]) for a, b in zip(totals, totals[1:]) if b[0] > a[0]]
+    resolution = monitor.resolution()
+    result = {
+        'generators': len(reports),
+        'endpoints': len(intro),
+        'learned': len(latencies),
+        'learned_pct': round(100.0 * len(latencies) / len(intro), 1) if intro else None,
+        'learn_p50_ms': _round(percentile(latencies, 50)),
+        'learn_p95_ms': _round(percentile(latencies, 95)),
+        'learn_max_ms': _round(max(latencies) if latencies else None),
+        'learn_resolution_ms': _round(resolution * 1000 if resolution is not None else None),
+        'flows_base': base,
+        'flows_peak': peak,
+        'flows_per_s_avg': _round((peak - base) / (peak_ts - start) if peak_ts > start else None),
+        'flows_per_s_peak': _round(max(rates) if rates else None),
+        'poll_ms': _round(monitor.poll_seconds / len(totals) * 1000 if totals else None),
+        'garp': sum(r['counts']['garp'] for r in reports),
+        'ns': sum(r['counts']['ns'] for r in reports),
+        'refresh': sum(r['counts']['refresh'] for r in reports),
+        'retired': sum(r['counts']['retired'] for r in reports),
+    }
+    # Verlies: tx van een generator komt aan bij zijn peer
+    rx = {r['gen']: r['rx'] for r in reports}
+    for phase in PHASES:
+        tx = sum(r['tx'][phase] for r in reports if allowed.get(r['gen']))
+        got = sum(rx.get(r['peer'], {}).get(phase, 0) for r in reports if allowed.get(r['gen']))
+        result[f'tx_{phase}'] = tx
+        result[f'loss_{phase}_pct'] = round(100.0 * (1 - got / tx), 2) if tx else None
+    result['blocked_pairs'] = sum(1 for r in reports if r['peer'] is not None and not allowed.get(r['gen']))
+    return result
+
+
+def _round(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def run(model, options, ports=None, output='bench_loadgen', acls_from='faucet.yaml',
+        poll_interval=POLL_INTERVAL):
+    check_options(options)
+    acls = load_acls(acls_from) if acls_from else None
+    config = model.faucet_config(acls)
+    group = FaucetGroup(model.faucet_yamls(acls), base=f'{os.path.splitext(output)[0]}-faucet').start()
+
+    net = Mininet(topo=SDNTopo(model=model, link_opts={}), switch=FaucetSwitch, link=Link,
+                  build=False, controller=None)
+    add_controllers(net, group)
+    try:
+        net.build()
+        net.start()
+        conditions = [IfaceReady(net.get(h.name), f'{h.name}-eth0') for h in model.hosts]
+        conditions.append(SwitchesConnected(len(net.switches)))
+        wait_ready(conditions, timeout=max(30.0, len(conditions) * 0.05), verbose=False)
+
+        gens = generators(model, ports)
+        allowed = {g.gen: flow_allowed(model, config, g) for g in gens}
+        monitor = Monitor(model, gens)
+        monitor.poll()
+        start_at = time.time() + START_DELAY
+        procs = [net.get(g.host.name).popen(_worker_args(g, options, start_at),
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            universal_newlines=True) for g in gens]
+        print(f'*** {len(gens)} generatoren x {options["endpoints"]} endpoints, '
+              f'{options["duration"]}s (churn {options["churn"]:.0%}/s)')
+        monitor.run_until(start_at + options['duration'] + 1.5, poll_interval)
+
+        reports = []
+        for g, proc in zip(gens, procs):
+            out, err = proc.communicate()
+            if proc.returncode:
+                print(f'*** generator {g.host.name} faalde: {err.strip()}')
+                continue
+            reports.append(json.loads(out))
+        result = summarize(monitor, reports, allowed)
+    finally:
+        net.stop()
+        group.stop()
+
+    base = os.path.splitext(output)[0]
+    meta = dict(options, timestamp=time.time(), switches=len(model.switches),
+                controllers=model.controllers, vids=[v.vid for v in model.vlans])
+    with open(base + '.json', 'w') as f:
+        json.dump({'meta': meta, 'results': [result]}, f, indent=2)
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(result))
+        writer.writeheader()
+        writer.writerow(result)
+    # Tabelgroottes over de tijd (t relatief aan de eerste poll)
+    t0 = monitor.rows[0][0] if monitor.rows else 0
+    with open(base + '_tables.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['t', 'switch', 'table', 'flows'])
+        for ts, sw, table, count in monitor.rows:
+            writer.writerow([f'{ts - t0:.3f}', sw, table, count])
+
+    print('*** learning: %s/%s endpoints (%s%%), p50 %s ms, p95 %s ms, max %s ms '
+          '(resolutie %s ms)' % (
+              result['learned'], result['endpoints'], result['learned_pct'],
+              result['learn_p50_ms'], result['learn_p95_ms'], result['learn_max_ms'],
+              result['learn_resolution_ms']))
+    print('*** flows: %s -> %s (gem. %s/s, piek %s/s); verlies vul %s%%, churn %s%%' % (
+        result['flows_base'], result['flows_peak'], result['flows_per_s_avg'],
+        result['flows_per_s_peak'], result['loss_fill_pct'], result['loss_churn_pct']))
+    print(f'*** L2-loadtest geschreven naar {base}.json, {base}.csv en {base}_tables.csv')
+    return result
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from mininet.log import setLogLevel
+
+    parser = argparse.ArgumentParser(description='Synthetische L2-load: MAC-learning en flowtabellen')
+    parser.add_argument('--sites', type=int, default=2)
+    parser.add_argument('--access', type=int, default=2, help='access-switches per site')
+    parser.add_argument('--hosts-per-vlan', type=int, default=1)
+    parser.add_argument('--vlans', default='10,20,30', help='kommagescheiden VLAN-ids')
+    parser.add_argument('--controllers', type=int, default=1)
+    parser.add_argument('--ports', type=int, default=None,
+                        help='alleen de eerste N hosts/access-poorten als generator')
+    parser.add_argument('--endpoints', type=int, default=1000, help='virtuele endpoints per poort')
+    parser.add_argument('--stable', type=int, default=16, help='endpoints per poort zonder churn')
+    parser.add_argument('--rate', type=float, default=500.0, help='nieuwe endpoints per seconde per poort')
+    parser.add_argument('--churn', type=float, default=0.05,
+                        help='fractie endpoints die per seconde vervangen wordt')
+    parser.add_argument('--arp-interval', type=float, default=30.0)
+    parser.add_argument('--nd', action='store_true', help='ook IPv6 DAD-NS per nieuw endpoint')
+    parser.add_argument('--pps', type=float, default=1000.0, help='flowframes per seconde per poort')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help='seconden tussen twee dump-flows-rondes (bepaalt de resolutie)')
+    parser.add_argument('--acls-from', default='faucet.yaml')
+    parser.add_argument('-o', '--output', default='bench_loadgen')
+    args = parser.parse_args()
+
+    setLogLevel('warning')
+    options = {key: getattr(args, key) for key in
+               ('endpoints', 'stable', 'rate', 'churn', 'arp_interval', 'nd', 'pps', 'duration')}
+    try:
+        model = build_model(args.sites, args.access, args.hosts_per_vlan,
+                            [int(v) for v in args.vlans.split(',')], args.controllers)
+        check_options(options)
+    except ValueError as e:
+        parser.error(str(e))
+    run(model, options, args.ports, args.output, args.acls_from, args.poll_interval)
@@ -0,0 +1,197 @@
+"""Multi-controller-benchmark: MAC-learning en flow-installatie per aantal Faucet-instanties.
+
+Per controlleraantal wordt dezelfde topologie opgebouwd (netmodel.NetModel met
+controllers=N), met N lokale Faucet-processen (controller.FaucetGroup) die
+elk een deel van de dps aansturen (per site of op hash van dp_id). Daarna
+stuurt elke host tegelijk één gratuitous ARP en wordt alle switches gepold:
+  - MAC-learning-latency: tijd tot de eth_dst-flow van de host op zijn eigen
+    access-switch staat (p50/p95/max over alle hosts);
+  - flow-installatiesnelheid: flows die Faucet erbij zet, gedeeld door de tijd
+    tot het aantal flows niet meer verandert.
+Het eerste controlleraantal (standaard 1) is de referentie. Vereist faucet en
+arping in $PATH; een systeem-Faucet op 6653 stoort niet (instanties vanaf 6654).
+"""
+
+import csv
+import json
+import os
+import time
+
+from mininet.link import Link
+from mininet.net import Mininet
+
+from controller import FaucetGroup
+from hosts import from_model, provision_hosts
+from netmodel import CONTROLLER_SPLITS, NetModel
+from ovs import FaucetSwitch
+from ready import IfaceReady, SwitchesConnected, wait_ready
+from telemetry import dump_flows, parse_flows
+from topo_schaalbaar import SDNTopo, add_controllers
+
+
+POLL_INTERVAL = 0.05
+SETTLE = 1.0
+
+
+def build_model(controllers, split='site', sites=2, access=2, hosts_per_vlan=4):
+    return NetModel(sites=sites, access_per_site=access, hosts_per_vlan=hosts_per_vlan,
+                    ctrl=False, edge=False, controllers=controllers, controller_split=split)
+
+
+def poll_flows(switches):
+    """{switch: (#flows, {geleerde MACs})} met één shell-aanroep voor alle switches."""
+    result = {}
+    for sw, text in dump_flows(switches).items():
+        tables, macs = parse_flows(text)
+        result[sw] = (sum(tables.values()), macs)
+    return result
+
+
+def _total(sample):
+    return sum(flows for flows, _ in sample.values())
+
+
+def wait_stable(switches, quiet=SETTLE, timeout=30.0):
+    """Poll tot het totaal aantal flows quiet seconden gelijk blijft; geeft (totaal, ts laatste wijziging)."""
+    start = time.time()
+    total, changed = _total(poll_flows(switches)), start
+    while time.time() - start < timeout:
+        time.sleep(POLL_INTERVAL)
+        now = _total(poll_flows(switches))
+        if now != total:
+            total, changed = now, time.time()
+        elif time.time() - changed >= quiet:
+            break
+    return total, changed
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def learn_burst(net, model, timeout=30.0):
+    """Alle hosts tegelijk een gratuitous ARP; geeft de meetresultaten terug."""
+    switches = [sw.name for sw in model.switches]
+    base, _ = wait_stable(switches)
+
+    sent = {}
+    for h in model.hosts:
+        node = net.get(h.name)
+        node.sendCmd(f'arping -q -U -c 1 -I {h.name}-eth0 {h.ip4.split("/")[0]}')
+        sent[h.mac] = time.time()
+    start = min(sent.values())
+
+    # Poll tot elke host op zijn eigen access-switch geleerd is
+    learned = {}
+    own = {h.mac: h.switch for h in model.hosts}
+    polls = 0
+    while len(learned) < len(own) and time.time() - start < timeout:
+        sample = poll_flows(switches)
+        now = time.time()
+        polls += 1
+        for mac, sw in own.items():
+            if mac not in learned and mac in sample.get(sw, (0, set()))[1]:
+                learned[mac] = now - sent[mac]
+    for h in model.hosts:
+        net.get(h.name).waitOutput()
+
+    total, changed = wait_stable(switches)
+    latencies = [v * 1000 for v in learned.values()]
+    installed = total - base
+    elapsed = changed - start
+    return {
+        'hosts': len(own),
+        'learned': len(learned),
+        'learn_p50_ms': _round(percentile(latencies, 50)),
+        'learn_p95_ms': _round(percentile(latencies, 95)),
+        'learn_max_ms': _round(max(latencies) if latencies else None),
+        'flows_base': base,
+        'flows_installed': installed,
+        'flows_per_s': _round(installed / elapsed if elapsed > 0 else None),
+        'poll_ms': _round((time.time() - start) / polls * 1000 if polls else None),
+    }
+
+
+def _round(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def run_one(controllers, split, sites, access, hosts_per_vlan, base):
+    model = build_model(controllers, split, sites, access, hosts_per_vlan)
+    group = FaucetGroup(model.faucet_yamls(), base=f'{base}-faucet').start()
+    net = Mininet(topo=SDNTopo(model=model, link_opts={}), switch=FaucetSwitch, link=Link,
+                  build=False, controller=None)
+    add_controllers(net, group)
+    try:
+        net.build()
+        start = time.time()
+        net.start()
+        provision_hosts(net, from_model(model))
+        conditions = [IfaceReady(net.get(h.name), f'{h.name}-eth0') for h in model.hosts]
+        conditions.append(SwitchesConnected(len(net.switches)))
+        wait_ready(conditions, timeout=max(30.0, len(conditions) * 0.05), verbose=False)
+        result = {'controllers': controllers, 'split': split, 'switches': len(model.switches),
+                  'connect_s': round(time.time() - start, 3)}
+        result.update(learn_burst(net, model))
+        return result
+    finally:
+        net.stop()
+        group.stop()
+
+
+def bench(controller_counts=(1, 2, 4), split='site', sites=4, access=2, hosts_per_vlan=4,
+          output='bench_multictl'):
+    print('%-11s %-5s %6s %9s %9s %9s %10s %8s' % (
+        'controllers', 'split', 'hosts', 'p50_ms', 'p95_ms', 'max_ms', 'flows/s', 'speedup'))
+    base = os.path.splitext(output)[0]
+    results = []
+    for n in controller_counts:
+        r = run_one(n, split, sites, access, hosts_per_vlan, base)
+        # Flow-installatiesnelheid t.o.v. het eerste controlleraantal
+        first = results[0]['flows_per_s'] if results else r['flows_per_s']
+        r['speedup'] = round(r['flows_per_s'] / first, 2) if first and r['flows_per_s'] else None
+        results.append(r)
+        print('%-11d %-5s %6d %9s %9s %9s %10s %8s' % (
+            n, split, r['hosts'], r['learn_p50_ms'], r['learn_p95_ms'], r['learn_max_ms'],
+            r['flows_per_s'], r['speedup']))
+
+    with open(base + '.json', 'w') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'sites': sites, 'access': access,
+                            'hosts_per_vlan': hosts_per_vlan},
+                   'results': results}, f, indent=2)
+    keys = sorted({k for r in results for k in r})
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=keys)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f'*** multi-controller-benchmark geschreven naar {base}.json en {base}.csv')
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from mininet.log import setLogLevel
+
+    parser = argparse.ArgumentParser(description='MAC-learning en flow-installatie per aantal controllers')
+    parser.add_argument('--controllers', default='1,2,4', help='kommagescheiden controlleraantallen')
+    parser.add_argument('--split', choices=CONTROLLER_SPLITS, default='site')
+    parser.add_argument('--sites', type=int, default=4)
+    parser.add_argument('--access', type=int, default=2, help='access-switches per site')
+    parser.add_argument('--hosts-per-vlan', type=int, default=4)
+    parser.add_argument('-o', '--output', default='bench_multictl')
+    args = parser.parse_args()
+    counts = [int(n) for n in args.controllers.split(',')]
+    # Ongeldige combinaties (bv. meer controllers dan sites bij split site) vooraf melden
+    for n in counts:
+        try:
+            build_model(n, args.split, args.sites, args.access, args.hosts_per_vlan)
+        except ValueError as e:
+            parser.error(str(e))
+
+    setLogLevel('warning')
+    bench(counts, args.split, args.sites, args.access,
+          args.hosts_per_vlan, args.output)
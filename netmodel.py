@@ -0,0 +1,492 @@
+"""Topologiemodel voor een multi-site campus (core + access per site).
+
+Eén model levert zowel de Mininet-topologie (topo_schaalbaar.SDNTopo) als de
+bijbehorende Faucet-config (dps/interfaces/vlans). DPIDs, switch- en
+hostnamen en poortnummers zijn deterministisch: dezelfde parameters geven
+altijd exact dezelfde topologie en faucet.yaml.
+"""
+
+import ipaddress
+import itertools
+import math
+import zlib
+from collections import namedtuple
+
+import yaml
+
+from edge import EdgeRouter, EdgeVlan
+
+
+# routed: edge-router krijgt een subinterface en de VLAN krijgt hosts
+Vlan = namedtuple('Vlan', 'name vid description net4 net6 acl_in routed')
+Switch = namedtuple('Switch', 'name dpid site role')
+Host = namedtuple('Host', 'name site switch port vlan ip4 ip6 mac')
+Link = namedtuple('Link', 'node1 port1 node2 port2 kind')
+# Edge-router van een site met zijn eigen ISP-node
+Edge = namedtuple('Edge', 'site index router isp')
+
+DESCRIPTIONS = {10: 'Employee', 20: 'Guest', 30: 'Management', 100: 'Controller-Mgmt'}
+ACLS = {20: 'guest_isolation'}
+CTRL_VID = 100
+DARKFIBER_MODES = ('lacp', 'stack')
+# Verdeling van de dps over meerdere Faucet-instanties
+CONTROLLER_SPLITS = ('site', 'hash')
+
+HARDWARE = 'Open vSwitch'
+
+# WAN per edge-router: een /28 en een /64 per site (index 0 = 203.0.113.0/28)
+WAN4 = ipaddress.ip_network('203.0.113.0/24')
+WAN6 = ipaddress.ip_network('2001:db8:ffff::/48')
+MAX_EDGES = 15
+# Hosts per VLAN per access-switch: slot 0..15 in poortnummer en MAC
+MAX_SLOTS = 16
+# Hoogste gewone OpenFlow-poort (0xff00 en hoger zijn gereserveerd)
+MAX_PORT = 0xfeff
+
+
+class _Dumper(yaml.SafeDumper):
+    # Geen &id001-ankers voor gedeelde tagged_vlans-lijsten
+    def ignore_aliases(self, data):
+        return True
+
+
+def site_name(index):
+    # A, B, ... Z, daarna S26, S27, ...
+    return chr(ord('A') + index) if index < 26 else f'S{index}'
+
+
+def vlan_prefix(hosts):
+    # Kleinste v4-prefix (max /24) voor hosts + gateway + netwerk/broadcast
+    bits = max(8, math.ceil(math.log2(hosts + 3)))
+    return 32 - bits
+
+
+def make_vlan(vid, hosts=1, routed=True):
+    """VLAN met deterministische subnetten: 10.0.<vid>.0/24 en 2001:db8:<vid>::/64.
+
+    Past een /24 niet, dan wordt een groter blok uit 10.0.0.0/8 gekozen
+    (blok nummer vid ter grootte van de benodigde prefix). Zo'n blok kan een
+    ander VLAN overlappen; NetModel controleert dat (check_overlap).
+    """
+    prefix = vlan_prefix(hosts)
+    base = ipaddress.ip_network('10.0.0.0/8')
+    size = 2 ** (32 - prefix)
+    if vid * size >= base.num_addresses:
+        raise ValueError(f'vlan{vid}: geen /{prefix} vrij in {base}')
+    net4 = ipaddress.ip_network((int(base.network_address) + vid * size, prefix))
+    # vid als hex-groep, zodat vlan10 -> 2001:db8:10::/64 (zoals faucet.yaml)
+    net6 = ipaddress.ip_network(f'2001:db8:{vid}::/64')
+    return Vlan(f'vlan{vid}', vid, DESCRIPTIONS.get(vid, f'VLAN {vid}'),
+                net4, net6, ACLS.get(vid), routed)
+
+
+def check_overlap(vlans):
+    """ValueError als v4-subnetten van twee VLANs (ook de ctrl-VLAN) overlappen."""
+    for a, b in itertools.combinations(vlans, 2):
+        if a.net4.overlaps(b.net4):
+            raise ValueError(f'{a.name} ({a.net4}) overlapt met {b.name} ({b.net4})')
+
+
+def gateway4(vlan, index=0):
+    # Laatste bruikbare adres (10.0.10.254 voor een /24); edge-router index
+    # krijgt het adres daaronder (10.0.10.253, ...)
+    return vlan.net4.broadcast_address - 1 - index
+
+
+def gateway6(vlan, index=0):
+    return vlan.net6.network_address + 1 + index
+
+
+def wan_addresses(index):
+    """(wan_v4, wan_v6, gw_v4, gw_v6) voor de edge-router met deze index."""
+    net4 = list(WAN4.subnets(new_prefix=28))[index]
+    net6 = ipaddress.ip_network((int(WAN6.network_address) + (index << 64), 64))
+    return (f'{net4.network_address + 2}/28', f'{net6.network_address + 2}/64',
+            str(net4.network_address + 1), str(net6.network_address + 1))
+
+
+def host_name(dpid, vid, slot=0):
+    # h<dpid>v<vid>, tweede host in dezelfde VLAN h<dpid>v<vid>b, ...
+    return f'h{dpid}v{vid}' + (chr(ord('a') + slot) if slot else '')
+
+
+def host_key(dpid, vid, slot=0):
+    # Uniek per (switch, VLAN, slot); basis voor MAC-adres
+    return (dpid << 16) | (vid << 4) | slot
+
+
+def host_mac(index):
+    return '02:00:%02x:%02x:%02x:%02x' % (
+        (index >> 24) & 0xff, (index >> 16) & 0xff, (index >> 8) & 0xff, index & 0xff)
+
+
+class NetModel(object):
+    """Gegenereerde multi-site topologie.
+
+    sites: aantal sites (elk met één core-switch), cores in een keten
+    verbonden via darkfiber. access_per_site: int of lijst per site.
+    hosts_per_vlan: hosts per VLAN per access-switch. vids: VLANs met hosts
+    (en een subinterface op de edge-router). ctrl: per site een ctrl-host in
+    VLAN 100 op de core. edge: edge-router + ISP op de eerste site;
+    edge_sites: op zoveel sites (vanaf A) een eigen edge-router + ISP. Hosts
+    gaan via de router van hun site naar buiten (lokale breakout: eigen NAT en
+    conntrack, geen internetverkeer over de darkfiber); inter-VLAN verkeer
+    loopt via edgeA, zodat de stateful firewall beide richtingen ziet.
+    darkfiber_links: parallelle links per core-paar; darkfiber_mode 'lacp'
+    (LAG, verkeer verdeeld over de leden) of 'stack' (Faucet-stacking,
+    redundantie met één actief pad). link_profiles: {linksoort: profielnaam}
+    (zie linkprofiles.py), toegepast door topo_schaalbaar.SDNTopo. firewall:
+    backend van de edge-router ('iptables' of 'nft').
+    """
+
+    def __init__(self, sites=2, access_per_site=2, hosts_per_vlan=1,
+                 vids=(10, 20, 30), ctrl=True, edge=True,
+                 darkfiber_links=1, darkfiber_mode='lacp', link_profiles=None,
+                 firewall='iptables', edge_sites=1, controllers=1, controller_split='site'):
+        if isinstance(access_per_site, int):
+            access_per_site = [access_per_site] * sites
+        if len(access_per_site) != sites:
+            raise ValueError('access_per_site moet één waarde per site hebben')
+        self.sites = [site_name(i) for i in range(sites)]
+        self.edge_sites = edge_sites if edge else 0
+        if not 0 <= self.edge_sites <= min(sites, MAX_EDGES):
+            raise ValueError(f'edge_sites moet tussen 0 en {min(sites, MAX_EDGES)} liggen')
+        self.access_per_site = list(access_per_site)
+        if not 1 <= hosts_per_vlan <= MAX_SLOTS:
+            raise ValueError(f'hosts_per_vlan moet tussen 1 en {MAX_SLOTS} liggen')
+        self.hosts_per_vlan = hosts_per_vlan
+
+        # Extra gateway-adressen per edge-router bovenop de eerste
+        per_vlan = hosts_per_vlan * sum(self.access_per_site) + max(0, self.edge_sites - 1)
+        self.vlans = [make_vlan(vid, per_vlan) for vid in vids]
+        if ctrl:
+            self.vlans.append(make_vlan(CTRL_VID, sites, routed=False))
+        check_overlap(self.vlans)
+        self.ctrl = ctrl
+        self.edge = edge
+        if darkfiber_mode not in DARKFIBER_MODES:
+            raise ValueError(f'darkfiber_mode moet een van {DARKFIBER_MODES} zijn')
+        self.darkfiber_links = darkfiber_links
+        self.darkfiber_mode = darkfiber_mode
+        if controller_split not in CONTROLLER_SPLITS:
+            raise ValueError(f'controller_split moet een van {CONTROLLER_SPLITS} zijn')
+        if controllers > 1 and darkfiber_mode == 'stack':
+            # Een stack verwijst naar dps van de andere site; die kent een deelconfig niet
+            raise ValueError('darkfiber_mode stack werkt alleen met één controller')
+        self.controllers = controllers
+        self.controller_split = controller_split
+        self.link_profiles = dict(link_profiles or {})
+        self.firewall = firewall
+
+        self.switches = []
+        self.hosts = []
+        self.links = []
+        # switch -> {poort: faucet-interfaceconfig}
+        self.interfaces = {}
+        # switch -> extra dp-opties (stack-root, LACP-systeem-MAC)
+        self.dp_options = {}
+        self._next_port = {}
+        self._generate()
+        if not all(self.controller_groups()):
+            # Een Faucet-instantie zonder dps heeft niets te doen
+            raise ValueError(f'{controllers} controllers met split {controller_split}: '
+                             f'niet elke controller krijgt een switch ({sites} sites, '
+                             f'{len(self.switches)} switches)')
+
+    # -------- Opvragen --------
+    @property
+    def routed_vlans(self):
+        return [v for v in self.vlans if v.routed]
+
+    @property
+    def ctrl_vlan(self):
+        for v in self.vlans:
+            if not v.routed:
+                return v
+        return None
+
+    def vlan(self, name):
+        for v in self.vlans:
+            if v.name == name:
+                return v
+        raise KeyError(name)
+
+    def core(self, site):
+        for sw in self.switches:
+            if sw.site == site and sw.role == 'core':
+                return sw
+        raise KeyError(site)
+
+    def site_switches(self, site):
+        return [sw for sw in self.switches if sw.site == site]
+
+    # -------- Generatie --------
+    def _add_switch(self, site, role):
+        index = len(self.switches) + 1
+        sw = Switch(f's{index}', index, site, role)
+        self.switches.append(sw)
+        self.interfaces[sw.name] = {}
+        self._next_port[sw.name] = 1
+        return sw
+
+    def _port(self, node):
+        port = self._next_port[node]
+        self._next_port[node] = port + 1
+        return port
+
+    def _attach(self, sw, description, port=None, **cfg):
+        # port: vast poortnummer i.p.v. het volgende vrije
+        if port is None:
+            port = self._port(sw.name)
+        elif port in self.interfaces[sw.name] or port < self._next_port[sw.name]:
+            raise ValueError(f'{sw.name}: poort {port} is al in gebruik')
+        cfg = dict(description=description, **cfg)
+        self.interfaces[sw.name][port] = cfg
+        return port
+
+    def _trunk(self, a, b, kind, vlans):
+        tagged = [v.name for v in vlans]
+        pa = self._attach(a, f'to {b.name} ({kind})', tagged_vlans=tagged)
+        pb = self._attach(b, f'to {a.name} ({kind})', tagged_vlans=tagged)
+        self.links.append(Link(a.name, pa, b.name, pb, kind))
+
+    def _darkfiber(self, a, b, lag):
+        """darkfiber_links parallelle links a <-> b als één LAG of als stack-links."""
+        if self.darkfiber_links == 1:
+            return self._trunk(a, b, 'darkfiber', self.vlans)
+        tagged = [v.name for v in self.vlans]
+        for _ in range(self.darkfiber_links):
+            pa, pb = self._port(a.name), self._port(b.name)
+            for sw, port, peer, peer_port in ((a, pa, b, pb), (b, pb, a, pa)):
+                cfg = {'description': f'to {peer.name} (darkfiber)'}
+                if self.darkfiber_mode == 'lacp':
+                    # lacp-id uniek per dp: één LAG per buur-core
+                    cfg.update(tagged_vlans=tagged, lacp=lag, lacp_active=True)
+                else:
+                    # Stackpoorten dragen alle VLANs
+                    cfg['stack'] = {'dp': peer.name, 'port': peer_port}
+                self.interfaces[sw.name][port] = cfg
+            self.links.append(Link(a.name, pa, b.name, pb, 'darkfiber'))
+        for sw in (a, b):
+            options = self.dp_options.setdefault(sw.name, {})
+            if self.darkfiber_mode == 'lacp':
+                # LACP-systeem-id = faucet_dp_mac; moet per core verschillen
+                options['faucet_dp_mac'] = '0e:00:00:fa:%02x:%02x' % (
+                    (sw.dpid >> 8) & 0xff, sw.dpid & 0xff)
+            elif lag == 1 and sw is a:
+                # Eerste core is stack-root
+                options['stack'] = {'priority': 1}
+
+    def _address(self, vlan, index):
+        ip4 = vlan.net4.network_address + 1 + index
+        if ip4 >= gateway4(vlan, max(0, self.edge_sites - 1)):
+            raise ValueError(f'{vlan.name}: subnet {vlan.net4} is vol')
+        # v6 vanaf ::10 (zoals h3v10 = 2001:db8:10::10)
+        ip6 = vlan.net6.network_address + 0x10 + index
+        return (f'{ip4}/{vlan.net4.prefixlen}', f'{ip6}/{vlan.net6.prefixlen}')
+
+    def _add_host(self, name, site, sw, vlan, index, key, port=None):
+        # index: adres binnen de VLAN; key: MAC; port: vaste switchpoort of None
+        if len(name) > 10:
+            # Mininet-interfacenamen (<naam>-eth0) zijn max. 15 tekens
+            raise ValueError(f'hostnaam {name} is te lang')
+        port = self._attach(sw, name, port, native_vlan=vlan.name)
+        ip4, ip6 = self._address(vlan, index)
+        host = Host(name, site, sw.name, port, vlan.name, ip4, ip6, host_mac(key))
+        self.hosts.append(host)
+        self.links.append(Link(name, 0, sw.name, port, 'access'))
+        return host
+
+    def _host_port(self, vid, slot):
+        # Vaste poort per (VLAN, slot) op de access-switch; poort 1 is de uplink
+        port = vid * MAX_SLOTS + slot + 1
+        if port > MAX_PORT:
+            raise ValueError(f'vlan{vid}: hostpoort {port} boven {MAX_PORT}')
+        return port
+
+    def _generate(self):
+        # Eerst alle cores (s1..sN), daarna de access-switches per site
+        cores = [self._add_switch(site, 'core') for site in self.sites]
+        access = {site: [self._add_switch(site, 'access') for _ in range(n)]
+                  for site, n in zip(self.sites, self.access_per_site)}
+
+        routed = self.routed_vlans
+        for site, core in zip(self.sites, cores):
+            for sw in access[site]:
+                self._trunk(core, sw, 'uplink', routed)
+
+        # Darkfiber: cores in een keten (lusvrij zonder stacking), per paar
+        # eventueel meerdere parallelle links
+        for lag, (a, b) in enumerate(zip(cores, cores[1:]), 1):
+            self._darkfiber(a, b, lag)
+
+        # Naam, MAC, adres en poort volgen uit (switch, VLAN, slot): een VLAN
+        # erbij of eraf laat de hosts in de andere VLANs ongemoeid
+        ordinal = 0
+        for site in self.sites:
+            for sw in access[site]:
+                for vlan in routed:
+                    for slot in range(self.hosts_per_vlan):
+                        self._add_host(host_name(sw.dpid, vlan.vid, slot), site, sw, vlan,
+                                       ordinal * self.hosts_per_vlan + slot,
+                                       host_key(sw.dpid, vlan.vid, slot),
+                                       self._host_port(vlan.vid, slot))
+                ordinal += 1
+
+        if self.ctrl:
+            for index, (site, core) in enumerate(zip(self.sites, cores)):
+                self._add_host(f'ctrl{site}', site, core, self.ctrl_vlan, index,
+                               host_key(core.dpid, CTRL_VID))
+
+        for index in range(self.edge_sites):
+            edge = f'edge{self.sites[index]}'
+            # edge-eth0 <-> ispN-eth0 (WAN), edge-eth1 <-> core (trunk)
+            self.links.append(Link(edge, 0, f'isp{index}', 0, 'wan'))
+            port = self._attach(cores[index], f'to {edge} (trunk)',
+                                tagged_vlans=[v.name for v in routed])
+            self.links.append(Link(edge, 1, cores[index].name, port, 'edge'))
+
+    # -------- Uitvoer --------
+    def edges(self):
+        """Edge-routers per site (met index en ISP-node)."""
+        result = []
+        for index in range(self.edge_sites):
+            vlans = [EdgeVlan(v.vid, f'{gateway4(v, index)}/{v.net4.prefixlen}',
+                              f'{gateway6(v, index)}/{v.net6.prefixlen}')
+                     for v in self.routed_vlans]
+            wan_v4, wan_v6, gw_v4, gw_v6 = wan_addresses(index)
+            router = EdgeRouter(f'edge{self.sites[index]}', vlans,
+                                wan_v4=wan_v4, wan_v6=wan_v6, gw_v4=gw_v4, gw_v6=gw_v6,
+                                mgmt_port=None, wan_port=0, trunk_port=1,
+                                firewall=self.firewall)
+            result.append(Edge(self.sites[index], index, router, f'isp{index}'))
+        return result
+
+    def edge_router(self):
+        # Router van de eerste site (policy-verificatie en standaardscenario's)
+        edges = self.edges()
+        return edges[0].router if edges else None
+
+    def uplinks(self, holder=None):
+        """{host: (eigenaar, router)}: de edge-router van wie de host zijn gateway
+        heeft en de router die die gateway nu bedient.
+
+        holder: {router: router die zijn gateways bedient of None}, zoals
+        edgesites.EdgeFailover.holder; zonder holder bedient elke router zichzelf.
+        """
+        edges = self.edges()
+        if not edges:
+            return {}
+        routers = {e.router.name: e.router for e in edges}
+        result = {}
+        for h in self.hosts:
+            owner = edges[self.edge_index(h.site)].router
+            name = (holder or {}).get(owner.name, owner.name)
+            result[h.name] = (owner, routers.get(name))
+        return result
+
+    def edge_index(self, site):
+        """Index van de edge-router die site gebruikt."""
+        index = self.sites.index(site)
+        return index if index < self.edge_sites else 0
+
+    def host_gateways(self, host):
+        """(gw4, gw6) van de host: de edge-router van zijn eigen site."""
+        vlan = self.vlan(host.vlan)
+        index = self.edge_index(host.site)
+        return str(gateway4(vlan, index)), str(gateway6(vlan, index))
+
+    def host_routes(self, host):
+        """[(prefix, via)] naar de andere VLANs via edgeA (alleen bij een eigen siterouter)."""
+        if not self.edge_index(host.site):
+            return []
+        vlan = self.vlan(host.vlan)
+        routes = []
+        for other in self.routed_vlans:
+            if other.name != vlan.name:
+                routes.append((str(other.net4), str(gateway4(vlan))))
+                routes.append((str(other.net6), str(gateway6(vlan))))
+        return routes
+
+    def controller_index(self, sw):
+        """Index van de Faucet-instantie die switch sw aanstuurt."""
+        if self.controllers <= 1:
+            return 0
+        if self.controller_split == 'site':
+            return self.sites.index(sw.site) % self.controllers
+        # Stabiele hash (niet hash(): die verschilt per Python-proces)
+        return zlib.crc32(sw.dpid.to_bytes(8, 'big')) % self.controllers
+
+    def controller_groups(self):
+        """[[switchnaam, ...] per controller]."""
+        groups = [[] for _ in range(max(1, self.controllers))]
+        for sw in self.switches:
+            groups[self.controller_index(sw)].append(sw.name)
+        return groups
+
+    def faucet_config(self, acls=None, dps=None):
+        # dps: alleen deze switches (config-deel voor één controller)
+        vlans = {}
+        for v in self.vlans:
+            cfg = {'vid': v.vid, 'description': v.description}
+            if v.acl_in and acls and v.acl_in in acls:
+                cfg['acl_in'] = v.acl_in
+            vlans[v.name] = cfg
+        result = {}
+        for sw in self.switches:
+            if dps is not None and sw.name not in dps:
+                continue
+            result[sw.name] = {
+                'dp_id': sw.dpid,
+                'hardware': HARDWARE,
+                'interfaces': dict(sorted(self.interfaces[sw.name].items())),
+            }
+            result[sw.name].update(self.dp_options.get(sw.name, {}))
+        config = {'version': 2, 'vlans': vlans}
+        if acls:
+            config['acls'] = acls
+        config['dps'] = result
+        return config
+
+    def faucet_yaml(self, acls=None, dps=None):
+        return yaml.dump(self.faucet_config(acls, dps), Dumper=_Dumper, sort_keys=False,
+                         default_flow_style=None, width=120)
+
+    def faucet_yamls(self, acls=None):
+        """Eén config per controller (alle vlans/acls, alleen de eigen dps)."""
+        return [self.faucet_yaml(acls, dps) for dps in self.controller_groups()]
+
+
+def load_acls(path):
+    with open(path) as f:
+        return yaml.safe_load(f).get('acls') or {}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Genereer faucet.yaml voor een multi-site topologie')
+    parser.add_argument('--sites', type=int, default=2)
+    parser.add_argument('--access', type=int, default=2, help='access-switches per site')
+    parser.add_argument('--hosts-per-vlan', type=int, default=1)
+    parser.add_argument('--vlans', default='10,20,30', help='kommagescheiden VLAN-ids')
+    parser.add_argument('--darkfiber-links', type=int, default=1,
+                        help='parallelle darkfiber-links per core-paar')
+    parser.add_argument('--darkfiber-mode', choices=DARKFIBER_MODES, default='lacp')
+    parser.add_argument('--edge-sites', type=int, default=1,
+                        help='aantal sites (vanaf A) met een eigen edge-router en ISP')
+    parser.add_argument('--acls-from', default='faucet.yaml', help='neem acls over uit dit bestand')
+    parser.add_argument('-o', '--output', help='schrijf naar bestand i.p.v. stdout')
+    args = parser.parse_args()
+
+    model = NetModel(sites=args.sites, access_per_site=args.access,
+                     hosts_per_vlan=args.hosts_per_vlan,
+                     vids=[int(v) for v in args.vlans.split(',')],
+                     darkfiber_links=args.darkfiber_links, darkfiber_mode=args.darkfiber_mode,
+                     edge_sites=args.edge_sites)
+    text = model.faucet_yaml(load_acls(args.acls_from) if args.acls_from else None)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text, end='')
@@ -0,0 +1,153 @@
+"""OVS-instellingen voor alle switches: controller, fail-mode en OpenFlow13.
+
+Switches krijgen deze instellingen bij het aanmaken (FaucetSwitch), zodat ze
+meteen met de juiste instellingen naar Faucet verbinden. Herconfiguratie van
+een draaiend netwerk gaat in één ovs-vsctl-transactie i.p.v. 4 x N losse calls.
+"""
+
+import time
+from functools import partial
+
+from mininet.node import OVSSwitch
+from mininet.util import quietRun
+
+
+CONTROLLER_IP = '127.0.0.1'
+CONTROLLER_PORT = 6653
+PROTOCOLS = 'OpenFlow13'
+FAIL_MODE = 'secure'
+
+class MappedSwitch(OVSSwitch):
+    """OVSSwitch die alleen met zijn eigen controller verbindt.
+
+    addSwitch(..., controller='c1') koppelt de switch bij het starten aan c1
+    (multi-controller); zonder die optie gelden alle controllers van het net.
+    """
+
+    def start(self, controllers):
+        name = self.params.get('controller')
+        if name:
+            controllers = [c for c in controllers if c.name == name]
+        OVSSwitch.start(self, controllers)
+
+
+# Switchklasse voor Mininet(switch=...): OpenFlow13 + secure vanaf creatie.
+# Zonder batch=True doet elke switch bij net.start() zijn eigen ovs-vsctl-aanroep
+# (met controller, fail-mode en protocols erin); batchStartup bundelt dan niets.
+FaucetSwitch = partial(MappedSwitch, protocols=PROTOCOLS, failMode=FAIL_MODE)
+
+
+def controller_target(ip=CONTROLLER_IP, port=CONTROLLER_PORT):
+    return f'tcp:{ip}:{port}'
+
+
+def vsctl_transaction(switches, target=None):
+    """Eén ovs-vsctl-commando dat alle switches in één ovsdb-transactie zet.
+
+    switches: Mininet-switches of bridgenamen. target: een controller-target
+    voor alle switches, of een dict {switchnaam: target}.
+    """
+    target = target or controller_target()
+    parts = ['ovs-vsctl']
+    for sw in switches:
+        name = getattr(sw, 'name', sw)
+        tgt = target.get(name, controller_target()) if isinstance(target, dict) else target
+        parts += [
+            f'-- set-controller {name} {tgt}',
+            f'-- set-fail-mode {name} {FAIL_MODE}',
+            f'-- set bridge {name} protocols={PROTOCOLS}',
+        ]
+    return ' '.join(parts)
+
+
+def configure_switches(switches, target=None):
+    return quietRun(vsctl_transaction(switches, target))
+
+
+def configure_switches_legacy(switches, target=None):
+    # Oude pad: 4 losse ovsdb-transacties per switch
+    target = target or controller_target()
+    for sw in switches:
+        name = getattr(sw, 'name', sw)
+        quietRun(f'ovs-vsctl del-controller {name}')
+        quietRun(f'ovs-vsctl set-controller {name} {target}')
+        quietRun(f'ovs-vsctl set-fail-mode {name} {FAIL_MODE}')
+        quietRun(f'ovs-vsctl set bridge {name} protocols={PROTOCOLS}')
+
+
+def connected_count():
+    # Alleen actieve (tcp:) targets tellen; passieve ptcp-listeners nooit 'connected'
+    out = quietRun('ovs-vsctl --bare --columns=target,is_connected list controller')
+    count = 0
+    target = None
+    for line in out.splitlines():
+        line = line.strip().strip('"')
+        if not line:
+            continue
+        if target is None:
+            target = line
+        else:
+            if target.startswith('tcp:') and line == 'true':
+                count += 1
+            target = None
+    return count
+
+
+def wait_connected(expected, timeout=60.0):
+    """Wacht tot expected switches verbonden zijn; geeft seconden of None terug."""
+    from ready import SwitchesConnected, wait_condition
+
+    return wait_condition(SwitchesConnected(expected), time.time() + timeout)
+
+
+def bench(sizes=(7, 100, 500), modes=('legacy', 'transaction', 'create'), timeout=120.0):
+    """Tijd van Mininet(...) tot alle switches met de controller verbonden zijn.
+
+    Vereist een draaiende OpenFlow-controller op CONTROLLER_IP:CONTROLLER_PORT
+    die onbekende datapaths accepteert (bv. ovs-testcontroller ptcp:6653).
+    """
+    from mininet.net import Mininet
+    from mininet.node import RemoteController
+    from mininet.topo import LinearTopo
+
+    print('%-8s %-12s %10s %10s' % ('switches', 'mode', 'start_s', 'connect_s'))
+    results = []
+    for n in sizes:
+        for mode in modes:
+            if mode == 'create':
+                switch = FaucetSwitch
+            else:
+                # Mininet-standaard: fail-mode/protocols pas achteraf zetten
+                switch = partial(OVSSwitch, failMode='standalone')
+            topo = LinearTopo(k=n, n=0)
+            start = time.time()
+            net = Mininet(topo=topo, switch=switch, controller=None, build=False)
+            net.addController('c0', controller=RemoteController,
+                              ip=CONTROLLER_IP, port=CONTROLLER_PORT)
+            net.build()
+            net.start()
+            if mode == 'legacy':
+                configure_switches_legacy(net.switches)
+            elif mode == 'transaction':
+                configure_switches(net.switches)
+            started = time.time() - start
+            connect = wait_connected(len(net.switches), timeout=timeout)
+            net.stop()
+            total = started + connect if connect is not None else float('nan')
+            print('%-8d %-12s %10.3f %10.3f' % (n, mode, started, total))
+            results.append((n, mode, started, total))
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    from mininet.log import setLogLevel
+
+    parser = argparse.ArgumentParser(description='Tijd tot alle OVS-switches verbonden zijn')
+    parser.add_argument('--sizes', default='7,100,500',
+                        help='kommagescheiden aantallen switches')
+    parser.add_argument('--modes', default='legacy,transaction,create')
+    args = parser.parse_args()
+    setLogLevel('warning')
+    bench(sizes=[int(s) for s in args.sizes.split(',')],
+          modes=args.modes.split(','))
@@ -0,0 +1,123 @@
+"""Startup-profiler: wandkloktijd per fase, shell-commando's per node en latencies.
+
+Gebruik:
+    prof = Profiler()
+    with prof:                      # instrumenteert Node.cmd/pexec en quietRun
+        with prof.phase('net.build'):
+            net.build()
+    prof.write('timings.json')
+
+Met cprofile=True wordt ook een cProfile van de Python-kant bijgehouden.
+"""
+
+import cProfile
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from mininet.node import Node
+
+import ovs
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+class Profiler(object):
+    def __init__(self, cprofile=False):
+        self.phases = []
+        self.commands = defaultdict(list)   # node -> [latency_s]
+        self.lock = threading.Lock()
+        self.started = None
+        self.finished = None
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self._saved = None
+
+    # -------- Instrumentatie --------
+    def _record(self, node, elapsed):
+        with self.lock:
+            self.commands[node].append(elapsed)
+
+    def _wrap(self, func, name_of):
+        prof = self
+
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                prof._record(name_of(args), time.time() - start)
+        return wrapper
+
+    def install(self):
+        self._saved = (Node.cmd, Node.pexec, ovs.quietRun)
+        Node.cmd = self._wrap(Node.cmd, lambda args: args[0].name)
+        Node.pexec = self._wrap(Node.pexec, lambda args: args[0].name)
+        # ovs-vsctl en co. draaien in de root-namespace
+        ovs.quietRun = self._wrap(ovs.quietRun, lambda args: 'root')
+        self.started = time.time()
+        if self.cprofile:
+            self.cprofile.enable()
+
+    def uninstall(self):
+        if self.cprofile:
+            self.cprofile.disable()
+        self.finished = time.time()
+        if self._saved:
+            Node.cmd, Node.pexec, ovs.quietRun = self._saved
+            self._saved = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    @contextmanager
+    def phase(self, name):
+        with self.lock:
+            before = sum(len(v) for v in self.commands.values())
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            with self.lock:
+                after = sum(len(v) for v in self.commands.values())
+            self.phases.append({'name': name, 'seconds': round(elapsed, 6),
+                                'commands': after - before})
+
+    # -------- Rapport --------
+    def report(self):
+        latencies = [l for values in self.commands.values() for l in values]
+        end = self.finished or time.time()
+        return {
+            'total_seconds': round(end - self.started, 6) if self.started else None,
+            'phases': self.phases,
+            'commands': {
+                'total': len(latencies),
+                'per_node': {node: len(v) for node, v in sorted(self.commands.items())},
+                'latency_ms': {
+                    key: round(percentile(latencies, pct) * 1000, 3) if latencies else None
+                    for key, pct in (('p50', 50), ('p90', 90), ('p99', 99), ('max', 100))
+                },
+            },
+        }
+
+    def write(self, path, cprofile_path=None):
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        if self.cprofile and cprofile_path:
+            self.cprofile.dump_stats(cprofile_path)
+        print(f'*** startup: {report["total_seconds"]:.3f}s, '
+              f'{report["commands"]["total"]} commando\'s; timings in {path}')
+        return report
@@ -0,0 +1,145 @@
+"""Event-gedreven readiness: wachten op interfaces, IPv6 DAD en Faucet-verbindingen.
+
+Elke conditie heeft een eenmalige toestandscheck en een event-bron
+(`ip monitor` in de namespace van de node, `ovsdb-client monitor` voor OVS).
+Alle condities worden parallel afgewacht; er wordt alleen opnieuw gecheckt
+als er een event binnenkomt, dus geen vaste sleeps.
+"""
+
+import os
+import select
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ovs import connected_count
+
+
+# Fallback als de event-bron wegvalt (bv. geen ip/ovsdb-client beschikbaar)
+POLL_INTERVAL = 0.05
+# Condities die tegelijk gemonitord worden; de rest wacht op een vrije worker
+MAX_WORKERS = 64
+READ_SIZE = 65536
+
+
+class Condition(object):
+    name = 'condition'
+
+    def check(self):
+        raise NotImplementedError
+
+    def monitor(self):
+        """Popen met één regel op stdout per relevant event, of None."""
+        return None
+
+
+class IfaceReady(Condition):
+    """Interface is UP en heeft geen tentative (DAD-lopende) IPv6-adressen."""
+
+    def __init__(self, node, ifname):
+        self.node = node
+        self.ifname = ifname
+        self.name = f'{node.name}:{ifname}'
+
+    def check(self):
+        link, _, _ = self.node.pexec(['ip', '-o', 'link', 'show', 'dev', self.ifname])
+        addr, _, _ = self.node.pexec(['ip', '-6', '-o', 'addr', 'show', 'dev', self.ifname])
+        return 'state UP' in link and 'tentative' not in addr and 'dadfailed' not in addr
+
+    def monitor(self):
+        return self.node.popen(['ip', '-o', 'monitor', 'link', 'address'],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+class SwitchesConnected(Condition):
+    """Minstens count OVS-bridges verbonden met hun controller (Faucet)."""
+
+    def __init__(self, count):
+        self.count = count
+        self.name = f'{count} switches verbonden'
+
+    def check(self):
+        return connected_count() >= self.count
+
+    def monitor(self):
+        return subprocess.Popen(['ovsdb-client', 'monitor', 'Open_vSwitch',
+                                 'Controller', 'is_connected'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def wait_condition(cond, deadline, start=None):
+    """Wacht op één conditie; geeft de latency in seconden of None (timeout).
+
+    start: begin van de meting (standaard nu); de check gebeurt altijd minstens
+    één keer, ook als de deadline al voorbij is.
+    """
+    start = time.time() if start is None else start
+    # Monitor eerst starten, dan checken: zo gaat er geen event verloren
+    proc = cond.monitor()
+    buf = b''
+    try:
+        if cond.check():
+            return time.time() - start
+        while time.time() < deadline:
+            remaining = deadline - time.time()
+            events = 1
+            if proc is not None and proc.poll() is None:
+                readable, _, _ = select.select([proc.stdout], [], [], remaining)
+                if not readable:
+                    break
+                # Ongebufferd lezen en zelf regels splitsen: readline() kan
+                # regels in de buffer laten waar select() niets meer van ziet
+                data = os.read(proc.stdout.fileno(), READ_SIZE)
+                if not data:
+                    proc = None
+                    continue
+                buf += data
+                events = buf.count(b'\n')
+                buf = buf[buf.rfind(b'\n') + 1:]
+            else:
+                time.sleep(min(POLL_INTERVAL, max(remaining, 0)))
+            # Eén check per volledige regel (event)
+            for _ in range(events):
+                if cond.check():
+                    return time.time() - start
+        return None
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+def wait_ready(conditions, timeout=10.0, verbose=True):
+    """Wacht parallel op alle condities; geeft {naam: latency of None} terug.
+
+    Alle condities delen één deadline (timeout vanaf nu) en latencies tellen
+    vanaf nu. Bij meer dan MAX_WORKERS condities wachten de overige op een
+    vrije worker; blijven er veel hangen, dan krijgen die pas na de deadline
+    hun ene check. Kies timeout dus naar het aantal condities (zoals
+    topo_schaalbaar.run: 0.05 s per conditie, minimaal 10 s).
+    """
+    conditions = list(conditions)
+    if not conditions:
+        return {}
+    start = time.time()
+    deadline = start + timeout
+    workers = min(MAX_WORKERS, len(conditions))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(lambda c: wait_condition(c, deadline, start), conditions))
+    result = dict(zip((c.name for c in conditions), latencies))
+    if verbose:
+        report(result, timeout)
+    return result
+
+
+def report(result, timeout, detail=20):
+    # Bij grote topologieën alleen een samenvatting + wat niet klaar is
+    done = sorted(l for l in result.values() if l is not None)
+    for name, latency in result.items():
+        if latency is None:
+            print(f'*** niet klaar na {timeout:.1f}s: {name}')
+        elif len(result) <= detail:
+            print(f'*** klaar: {name} ({latency * 1000:.0f} ms)')
+    if done and len(result) > detail:
+        print(f'*** {len(done)}/{len(result)} condities klaar, '
+              f'mediaan {done[len(done) // 2] * 1000:.0f} ms, max {done[-1] * 1000:.0f} ms')
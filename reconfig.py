@@ -0,0 +1,296 @@
+"""Live herconfiguratie van een draaiend netwerk zonder volledige rebuild.
+
+De gewenste toestand (een nieuw netmodel.NetModel + ACLs) wordt gediffd tegen
+de draaiende; alleen de verschillen worden toegepast:
+  - switches/hosts/links erbij of eraf (OVS-poorten met vaste ofport_request);
+  - Faucet-config herladen als die verandert (SIGHUP, zie controller.py);
+  - edge-router: VLAN-subinterfaces en firewallregels incrementeel
+    (iptables-restore --noflush met -D/-I, of nft map-elementen); alleen bij
+    een andere WAN/trunk/backend volledig opnieuw.
+Daarna wordt gepingd tot de data-plane overeenkomt met de nieuwe policy; die
+tijd is de convergentietijd.
+"""
+
+import argparse
+import shlex
+import time
+from collections import namedtuple
+
+from mininet.cli import CLI
+
+from controller import reload_faucet, write_config
+from edge import provision
+from hosts import WORKERS, from_model, provision_hosts
+from linkprofiles import link_params
+from netmodel import load_acls
+from verify import PolicyModel, endpoints_from_model, run_probes, vlan_acls
+
+
+# Per soort de namen die eraf/erbij moeten; edge: {router: 'full' | 'diff'}
+Plan = namedtuple('Plan', 'del_links del_hosts del_switches add_switches add_hosts '
+                          'add_links faucet edge')
+
+CONVERGE_TIMEOUT = 30.0
+PROBES_PER_VLAN = 4
+
+
+def _nodes(model):
+    """{naam: addHost/addSwitch-parameters} voor alle nodes van het model."""
+    nodes = {sw.name: {'dpid': '%016x' % sw.dpid} for sw in model.switches}
+    if model.controllers > 1:
+        for sw in model.switches:
+            nodes[sw.name]['controller'] = f'c{model.controller_index(sw)}'
+    nodes.update({h.name: {'ip': h.ip4, 'mac': h.mac} for h in model.hosts})
+    for edge in model.edges():
+        nodes[edge.router.name] = {}
+        nodes[edge.isp] = {'ip': f'{edge.router.gw_v4}/28'}
+    return nodes
+
+
+def _edge_action(old_router, new_router, added, add_links):
+    if old_router is None or new_router.name in added or not new_router.compatible(old_router):
+        return 'full'
+    if any(new_router.name in (l.node1, l.node2) for l in add_links):
+        # Nieuwe trunk/WAN-link: subinterfaces zijn weg, dus alles opnieuw
+        return 'full'
+    if new_router.vlans != old_router.vlans:
+        return 'diff'
+    return None
+
+
+def diff(old, new, old_config, new_config):
+    """Plan om van model old naar model new te gaan."""
+    old_nodes, new_nodes = _nodes(old), _nodes(new)
+    switches = {sw.name for sw in old.switches} | {sw.name for sw in new.switches}
+    # Gewijzigde nodes (ander adres/dpid) gaan eraf en er opnieuw bij
+    gone = {n for n, p in old_nodes.items() if new_nodes.get(n) != p}
+    added = {n for n, p in new_nodes.items() if old_nodes.get(n) != p}
+    old_links = set(old.links)
+    new_links = set(new.links)
+    # Links van verdwenen nodes verdwijnen vanzelf mee; nieuwe nodes krijgen al hun links
+    del_links = [l for l in old.links if l not in new_links or {l.node1, l.node2} & gone]
+    add_links = [l for l in new.links if l not in old_links or {l.node1, l.node2} & added]
+
+    old_routers = {e.router.name: e.router for e in old.edges()}
+    edge = {}
+    for e in new.edges():
+        action = _edge_action(old_routers.get(e.router.name), e.router, added, add_links)
+        if action:
+            edge[e.router.name] = action
+    return Plan(del_links=del_links,
+                del_hosts=sorted(n for n in gone if n not in switches),
+                del_switches=sorted(n for n in gone if n in switches),
+                add_switches=sorted(n for n in added if n in switches),
+                add_hosts=sorted(n for n in added if n not in switches),
+                add_links=add_links,
+                faucet=old_config != new_config,
+                edge=edge)
+
+
+def affected_vids(old, new, plan, old_config, new_config):
+    """VLANs waarvan de bereikbaarheid kan veranderen (None = alle)."""
+    if plan.add_switches or plan.del_switches or plan.edge:
+        return None
+    if any(l.kind != 'access' for l in plan.add_links + plan.del_links):
+        return None
+    vids = {new.vlan(h.vlan).vid for h in new.hosts if h.name in plan.add_hosts}
+    old_acls, new_acls = vlan_acls(old_config), vlan_acls(new_config)
+    vids |= {vid for vid in set(old_acls) | set(new_acls) if old_acls.get(vid) != new_acls.get(vid)}
+    return vids
+
+
+class LiveNet(object):
+    """Draaiend netwerk + het model waaruit het gebouwd is."""
+
+    def __init__(self, net, model, faucet_out='faucet_generated.yaml', acls_from='faucet.yaml',
+                 workers=WORKERS, controllers=None, failover=None):
+        # controllers: controller.FaucetGroup bij multi-controller, anders None
+        # failover: edgesites.EdgeFailover als die draait (wie bedient welke gateways)
+        self.net = net
+        self.controllers = controllers
+        self.failover = failover
+        self.model = model
+        self.faucet_out = faucet_out
+        self.acls_from = acls_from
+        self.workers = workers
+        self.config = model.faucet_config(self._acls())
+
+    def _acls(self):
+        return load_acls(self.acls_from) if self.acls_from else None
+
+    def uplinks(self):
+        """Per host de edge-router voor WAN-verkeer, na eventuele failover."""
+        return self.model.uplinks(dict(self.failover.holder) if self.failover else None)
+
+    # -------- Nodes en links --------
+    def _is_running_switch(self, name, new_switches):
+        return name not in new_switches and any(sw.name == name for sw in self.net.switches)
+
+    def _del_link(self, link):
+        node1, node2 = self.net.get(link.node1), self.net.get(link.node2)
+        for mn_link in self.net.linksBetween(node1, node2):
+            ports = {(mn_link.intf1.node.name, mn_link.intf1.node.ports[mn_link.intf1]),
+                     (mn_link.intf2.node.name, mn_link.intf2.node.ports[mn_link.intf2])}
+            if ports != {(link.node1, link.port1), (link.node2, link.port2)}:
+                continue
+            for intf in (mn_link.intf1, mn_link.intf2):
+                if intf.node in self.net.switches:
+                    intf.node.detach(intf)
+            self.net.delLink(mn_link)
+            return
+
+    def _add_link(self, link, profiles, new_switches):
+        mn_link = self.net.addLink(link.node1, link.node2, port1=link.port1, port2=link.port2,
+                                   **link_params(profiles.get(link.kind)))
+        for intf in (mn_link.intf1, mn_link.intf2):
+            sw = intf.node
+            if self._is_running_switch(sw.name, new_switches):
+                # OVSSwitch.attach zet geen ofport_request; Faucet adresseert poorten op nummer
+                sw.vsctl('add-port', sw, intf, sw.intfOpts(intf))
+                intf.ifconfig('up')
+                sw.TCReapply(intf)
+
+    def _apply_topology(self, plan, old, new):
+        net = self.net
+        for link in plan.del_links:
+            if link.node1 in net and link.node2 in net:
+                self._del_link(link)
+        for name in plan.del_hosts:
+            net.delHost(net.get(name))
+        for name in plan.del_switches:
+            net.delSwitch(net.get(name))
+
+        nodes = _nodes(new)
+        for name in plan.add_switches:
+            net.addSwitch(name, **nodes[name])
+        for name in plan.add_hosts:
+            net.addHost(name, **nodes[name])
+        for link in plan.add_links:
+            self._add_link(link, new.link_profiles, plan.add_switches)
+        for name in plan.add_hosts:
+            net.get(name).configDefault()
+        for name in plan.add_switches:
+            net.get(name).start(net.controllers)
+
+        # Nieuwe hosts, en bestaande waarvan gateway/routes veranderen (bv. --edge-sites)
+        old_configs = {cfg.name: cfg for cfg in from_model(old)}
+        configs = [cfg for cfg in from_model(new)
+                   if cfg.name in plan.add_hosts or old_configs.get(cfg.name) != cfg]
+        if configs:
+            provision_hosts(net, configs, workers=self.workers)
+
+    def _apply_edge(self, plan, old, new):
+        old_routers = {e.router.name: e.router for e in old.edges()}
+        count = 0
+        for edge in new.edges():
+            action = plan.edge.get(edge.router.name)
+            if not action:
+                continue
+            router, old_router = edge.router, old_routers.get(edge.router.name)
+            node, isp, isp_if = self.net.get(router.name), self.net.get(edge.isp), f'{edge.isp}-eth0'
+            if action == 'full':
+                if old_router and old_router.firewall != router.firewall:
+                    node.cmd(old_router.clear_command())
+                router.apply_isp(isp, isp_if)
+                count += provision(node, router)[0]
+            else:
+                count += router.apply_diff(node, old_router)
+                count += router.apply_isp_diff(isp, old_router, isp_if)
+        return count
+
+    # -------- Convergentie --------
+    def converge(self, vids=None, timeout=CONVERGE_TIMEOUT):
+        """Ping tot alle probes de verwachte uitkomst geven; (seconden, #mismatches)."""
+        endpoints = endpoints_from_model(self.model)
+        if vids is not None:
+            endpoints = [e for e in endpoints if e.vid in vids]
+        # Per VLAN een paar endpoints is genoeg om de policy te zien
+        per_vid = {}
+        for e in endpoints:
+            per_vid.setdefault(e.vid, [])
+            if len(per_vid[e.vid]) < PROBES_PER_VLAN:
+                per_vid[e.vid].append(e)
+        endpoints = [e for group in per_vid.values() for e in group]
+        probes = PolicyModel(self.config, self.model.edge_router(), self.uplinks()).probes(endpoints)
+        start = time.time()
+        mismatches = len(probes)
+        while probes and time.time() - start < timeout:
+            results = run_probes(self.net, probes)
+            mismatches = sum(1 for p in probes if results[p] != p.expected)
+            if not mismatches:
+                break
+        return time.time() - start, mismatches
+
+    # -------- Herconfigureren --------
+    def reconfigure(self, new):
+        """Breng het draaiende netwerk naar model new; geeft een rapport-dict terug."""
+        old, old_config = self.model, self.config
+        if (new.controllers, new.controller_split) != (old.controllers, old.controller_split):
+            print('*** reconfigure: --controllers/--controller-split kan niet live wijzigen')
+            return None
+        new_config = new.faucet_config(self._acls())
+        plan = diff(old, new, old_config, new_config)
+
+        start = time.time()
+        self._apply_topology(plan, old, new)
+        reloaded = 0
+        if plan.faucet:
+            if self.controllers:
+                write_config(new.faucet_yaml(self._acls()), self.faucet_out)
+                reloaded = self.controllers.reload(new.faucet_yamls(self._acls()))
+            else:
+                # Alleen een Faucet die faucet_out inleest wordt herladen
+                reloaded = reload_faucet(new.faucet_yaml(self._acls()), self.faucet_out)
+            if not reloaded:
+                print(f'*** reconfigure: geen Faucet herladen; draait Faucet met '
+                      f'FAUCET_CONFIG={self.faucet_out}?')
+        edge_cmds = self._apply_edge(plan, old, new) if plan.edge else 0
+        applied = time.time() - start
+
+        self.model, self.config = new, new_config
+        vids = affected_vids(old, new, plan, old_config, new_config)
+        converge, mismatches = self.converge(vids)
+
+        report = {
+            'switches': f'+{len(plan.add_switches)}/-{len(plan.del_switches)}',
+            'hosts': f'+{len(plan.add_hosts)}/-{len(plan.del_hosts)}',
+            'links': f'+{len(plan.add_links)}/-{len(plan.del_links)}',
+            'faucet_reload': reloaded,
+            'edge': ' '.join(f'{name}:{action}' for name, action in sorted(plan.edge.items())) or '-',
+            'edge_cmds': edge_cmds,
+            'apply_s': round(applied, 3),
+            'converge_s': round(converge, 3),
+            'mismatches': mismatches,
+        }
+        print('*** reconfigure: ' + ', '.join(f'{k}={v}' for k, v in report.items()))
+        return report
+
+
+class SDNCLI(CLI):
+    """Mininet-CLI met een `reconfigure`-commando.
+
+    parser/args: de argparse-parser en -opties waarmee gestart is; niet
+    opgegeven opties houden hun huidige waarde. make_model(args) -> NetModel.
+    """
+
+    def __init__(self, mininet, live, parser, args, make_model, **kwargs):
+        self.live = live
+        self.parser = parser
+        self.args = args
+        self.make_model = make_model
+        CLI.__init__(self, mininet, **kwargs)
+
+    def do_reconfigure(self, line):
+        """reconfigure [--hosts-per-vlan N] [--vlans 10,20,40] [--acls-from F] ...
+        Past alleen de verschillen met de draaiende toestand toe; zonder
+        opties wordt alleen opnieuw ingelezen (bv. na het aanpassen van ACLs)."""
+        try:
+            args = self.parser.parse_args(shlex.split(line),
+                                          namespace=argparse.Namespace(**vars(self.args)))
+            new = self.make_model(args)
+        except (SystemExit, ValueError) as e:
+            print(f'*** reconfigure: {e}')
+            return
+        self.args = args
+        self.live.acls_from = args.acls_from
+        self.live.reconfigure(new)
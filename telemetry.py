@@ -0,0 +1,283 @@
+"""Telemetrie van switches en controllerverkeer naar een compact tijdreeksbestand.
+
+Een achtergrondthread sampelt per interval alle switches met één shell-aanroep
+(ovs-ofctl dump-tables/dump-ports per switch + ovs-appctl coverage/show) en
+schrijft alleen wat veranderd is:
+  - .csv  : rollend bestand met regels  ts,switch,metric,delta,rate
+  - .prom : Prometheus textfile met de actuele totalen (atomisch vervangen)
+
+Metrics per switch: flows (actieve flow-entries, gauge) en
+<poort>.rx_bytes/tx_bytes/rx_pkts/tx_pkts/rx_drop/tx_drop. Onder 'root' de OVS
+coverage-tellers voor OpenFlow-verkeer (rconn_*, ofproto_*, connmgr_*,
+vconn_*); die zijn globaal voor ovs-vswitchd, niet per switch.
+
+Misses en packet-ins per switch staan niet in de tabelstatistiek (Faucet zet
+in elke tabel een expliciete miss-flow, dus lookup - matched blijft ~0). Ze
+komen uit dump-flows, dat met de flowtabel meegroeit; daarom alleen elke
+flow_interval seconden (0 = uit): table<N>.table_miss en table_miss
+(n_packets van de priority=0-flows) en packet_in (n_packets van flows met
+output naar CONTROLLER). Het zijn sommen over de flows die er nu staan: bij
+een Faucet-reload of verlopen flow gaan ze omlaag. Een daling geldt als
+reset; de .prom-totalen tellen dan door vanaf het vorige totaal.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+
+
+COUNTER_PREFIXES = ('rconn_', 'ofproto_', 'connmgr_', 'vconn_')
+GAUGES = ('flows',)
+MAX_BYTES = 10 * 1024 * 1024
+FLOW_INTERVAL = 10.0
+
+TABLE_RE = re.compile(r'table (\d+):\s*\n\s*active=(\d+)')
+
+PORT_RE = re.compile(
+    r'port\s+"?([^":\s]+)"?:\s+rx pkts=(\d+), bytes=(\d+), drop=(\d+|\?).*?\n'
+    r'\s+tx pkts=(\d+), bytes=(\d+), drop=(\d+|\?)')
+COVERAGE_RE = re.compile(r'^(\w+)\s+.*total: (\d+)', re.M)
+SECTION_RE = re.compile(r'^### (\S+)$', re.M)
+FLOW_TABLE_RE = re.compile(r'\btable=(\d+)')
+DL_DST_RE = re.compile(r'dl_dst=([0-9a-f:]{17})')
+N_PACKETS_RE = re.compile(r'\bn_packets=(\d+)')
+PRIORITY_RE = re.compile(r'\bpriority=(\d+)')
+TABLE_LABEL_RE = re.compile(r'^table(\d+)$')
+DEFAULT_PRIORITY = 32768
+
+
+def _num(value):
+    return 0 if value == '?' else int(value)
+
+
+def parse_tables(text):
+    return {'flows': sum(int(active) for _, active in TABLE_RE.findall(text))}
+
+
+def parse_flow_stats(text):
+    """table_miss (totaal en per tabel) en packet_in uit dump-flows."""
+    packet_in = 0
+    misses = {}
+    for line in text.splitlines():
+        if 'cookie=' not in line:
+            continue
+        packets = N_PACKETS_RE.search(line)
+        packets = int(packets.group(1)) if packets else 0
+        table = FLOW_TABLE_RE.search(line)
+        table = int(table.group(1)) if table else 0
+        priority = PRIORITY_RE.search(line)
+        priority = int(priority.group(1)) if priority else DEFAULT_PRIORITY
+        if 'CONTROLLER' in line.partition('actions=')[2]:
+            packet_in += packets
+        if priority == 0:
+            misses[table] = misses.get(table, 0) + packets
+    result = {'packet_in': packet_in, 'table_miss': sum(misses.values())}
+    for table, packets in sorted(misses.items()):
+        result[f'table{table}.table_miss'] = packets
+    return result
+
+
+def parse_ports(text):
+    result = {}
+    for port, rxp, rxb, rxd, txp, txb, txd in PORT_RE.findall(text):
+        result.update({
+            f'{port}.rx_pkts': int(rxp), f'{port}.rx_bytes': int(rxb), f'{port}.rx_drop': _num(rxd),
+            f'{port}.tx_pkts': int(txp), f'{port}.tx_bytes': int(txb), f'{port}.tx_drop': _num(txd),
+        })
+    return result
+
+
+def parse_coverage(text):
+    return {name: int(total) for name, total in COVERAGE_RE.findall(text)
+            if name.startswith(COUNTER_PREFIXES)}
+
+
+def sample_command(switches, flows=False):
+    # Eén shell voor alle switches: één fork per interval i.p.v. 2 x N
+    parts = []
+    for sw in switches:
+        part = (f'echo "### {sw}"; ovs-ofctl -O OpenFlow13 dump-tables {sw}; '
+                f'ovs-ofctl -O OpenFlow13 dump-ports {sw}')
+        if flows:
+            part += f'; ovs-ofctl -O OpenFlow13 dump-flows {sw}'
+        parts.append(part)
+    parts.append('echo "### root"; ovs-appctl coverage/show')
+    return '; '.join(parts)
+
+
+def parse_sample(text):
+    """{switch: {metric: waarde}}; de coverage-tellers staan onder 'root'."""
+    result = {}
+    for block in text.split('### ')[1:]:
+        name, _, body = block.partition('\n')
+        name = name.strip()
+        if name == 'root':
+            result[name] = parse_coverage(body)
+        else:
+            metrics = parse_tables(body)
+            metrics.update(parse_ports(body))
+            if 'cookie=' in body:
+                metrics.update(parse_flow_stats(body))
+            result[name] = metrics
+    return result
+
+
+def dump_flows(switches):
+    """{switch: dump-flows-uitvoer} met één shell-aanroep voor alle switches."""
+    cmd = '; '.join(f'echo "### {sw}"; ovs-ofctl -O OpenFlow13 dump-flows {sw}' for sw in switches)
+    out = subprocess.run(['sh', '-c', cmd], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                         universal_newlines=True).stdout
+    parts = SECTION_RE.split(out)
+    return dict(zip(parts[1::2], parts[2::2]))
+
+
+def parse_flows(text):
+    """({tabel: #flows}, {MACs met een eth_dst-flow}); zonder table= is het tabel 0."""
+    tables = {}
+    for line in text.splitlines():
+        if 'cookie=' not in line:
+            continue
+        m = FLOW_TABLE_RE.search(line)
+        table = int(m.group(1)) if m else 0
+        tables[table] = tables.get(table, 0) + 1
+    return tables, set(DL_DST_RE.findall(text))
+
+
+class Collector(object):
+    def __init__(self, switches, path='telemetry.csv', interval=1.0, max_bytes=MAX_BYTES,
+                 flow_interval=FLOW_INTERVAL):
+        self.switches = [getattr(sw, 'name', sw) for sw in switches]
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.flow_interval = flow_interval
+        self.prom = path.endswith('.prom')
+        # {switch: {metric: (waarde, ts)}}; flow-metrics blijven staan tussen dump-flows door
+        self.last = {}
+        # Opgetelde waarden van vóór een reset, per (switch, metric)
+        self.offsets = {}
+        self.last_flows = None
+        self.samples = 0
+        self.sample_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------- Sampling --------
+    def sample(self):
+        start = time.time()
+        flows = bool(self.flow_interval) and (
+            self.last_flows is None or start - self.last_flows >= self.flow_interval)
+        out = subprocess.run(['sh', '-c', sample_command(self.switches, flows)],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                             universal_newlines=True).stdout
+        if flows:
+            self.last_flows = start
+        rows = self._deltas(start, parse_sample(out))
+        if self.prom:
+            self._write_prom()
+        else:
+            self._write_csv(rows)
+        self.samples += 1
+        self.sample_seconds += time.time() - start
+        return rows
+
+    def _deltas(self, ts, current):
+        rows = []
+        for sw, metrics in current.items():
+            previous = self.last.setdefault(sw, {})
+            for metric, value in metrics.items():
+                old, old_ts = previous.get(metric, (None, None))
+                previous[metric] = (value, ts)
+                if metric in GAUGES:
+                    if value != old:
+                        rows.append((ts, sw, metric, value, None))
+                    continue
+                if old is None:
+                    continue   # eerste sample is de referentie
+                delta = value - old
+                if delta < 0:
+                    # Reset (flows opnieuw geïnstalleerd, poort opnieuw aangemaakt)
+                    self.offsets[(sw, metric)] = self.offsets.get((sw, metric), 0) + old
+                    delta = value
+                if delta:
+                    elapsed = ts - old_ts
+                    rows.append((ts, sw, metric, delta, delta / elapsed if elapsed > 0 else None))
+        return rows
+
+    def _write_csv(self, rows):
+        if not rows:
+            return
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+            os.replace(self.path, self.path + '.1')
+        new = not os.path.exists(self.path)
+        with open(self.path, 'a') as f:
+            if new:
+                f.write('ts,switch,metric,delta,rate\n')
+            for ts, sw, metric, delta, rate in rows:
+                rate = '' if rate is None else f'{rate:.3f}'
+                f.write(f'{ts:.3f},{sw},{metric},{delta},{rate}\n')
+
+    def _write_prom(self):
+        lines = []
+        for sw, metrics in sorted(self.last.items()):
+            for metric, (value, _) in sorted(metrics.items()):
+                port, _, name = metric.rpartition('.')
+                table = TABLE_LABEL_RE.match(port)
+                labels = f'switch="{sw}"'
+                if table:
+                    labels += f',table="{table.group(1)}"'
+                elif port:
+                    labels += f',port="{port}"'
+                if name in GAUGES:
+                    kind = name
+                else:
+                    kind = f'{name}_total'
+                    value += self.offsets.get((sw, metric), 0)
+                lines.append(f'sdn_{kind}{{{labels}}} {value}')
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp, self.path)
+
+    # -------- Achtergrondthread --------
+    def _loop(self):
+        while not self._stop.is_set():
+            start = time.time()
+            try:
+                self.sample()
+            except OSError as e:
+                print(f'*** telemetry: sample mislukt: {e}')
+            self._stop.wait(max(0.0, self.interval - (time.time() - start)))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name='telemetry', daemon=True)
+        self._thread.start()
+        print(f'*** telemetry: {len(self.switches)} switches elke {self.interval}s -> {self.path}')
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self.samples:
+            print(f'*** telemetry: {self.samples} samples, gemiddeld '
+                  f'{self.sample_seconds / self.samples * 1000:.1f} ms per sample')
+
+
+def add_arguments(parser):
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help='sample flows/poorten/OpenFlow-tellers naar FILE (.csv rollend, .prom textfile)')
+    parser.add_argument('--telemetry-interval', type=float, default=1.0,
+                        help='seconden tussen twee samples')
+    parser.add_argument('--telemetry-flow-interval', type=float, default=FLOW_INTERVAL,
+                        help='seconden tussen twee dump-flows-rondes voor misses/packet-ins (0 = uit)')
+
+
+def telemetry_options(args):
+    """Vertaal de argparse-opties naar Collector-argumenten (of None)."""
+    if not args.telemetry:
+        return None
+    return {'path': args.telemetry, 'interval': args.telemetry_interval,
+            'flow_interval': args.telemetry_flow_interval}
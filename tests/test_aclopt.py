@@ -0,0 +1,35 @@
+import pytest
+
+from aclopt import optimize_config, prove_equivalent
+
+SSH_DENY = [
+    {'eth_type': 0x0800, 'ip_proto': 6, 'tcp_dst': 22, 'actions': {'allow': 0}},
+    {'actions': {'allow': 1}},
+]
+
+
+def test_l4_port_rule_removed_is_rejected():
+    ok, pkt = prove_equivalent(SSH_DENY, SSH_DENY[1:])
+    assert not ok
+    assert pkt['tcp_dst'] == 22
+
+
+def test_l4_port_rule_rewritten_is_rejected():
+    rewritten = [dict(SSH_DENY[0], tcp_dst=23), SSH_DENY[1]]
+    ok, _ = prove_equivalent(SSH_DENY, rewritten)
+    assert not ok
+
+
+def test_l4_port_rule_unchanged_is_equivalent():
+    ok, _ = prove_equivalent(SSH_DENY, list(SSH_DENY))
+    assert ok
+
+
+def test_unmodelled_field_refused():
+    rules = [{'eth_type': 0x0800, 'ip_dscp': 46, 'actions': {'allow': 0}}, {'actions': {'allow': 1}}]
+    with pytest.raises(ValueError):
+        prove_equivalent(rules, rules[1:])
+    config = {'acls': {'qos': [{'rule': r} for r in rules]}}
+    new, report, _ = optimize_config(config)
+    assert new['acls']['qos'] == config['acls']['qos']
+    assert report['qos']['proof'] == 'niet geprobeerd'
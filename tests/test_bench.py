@@ -0,0 +1,47 @@
+import argparse
+
+import pytest
+
+from bench import add_arguments, bench_options, check_tests, compare
+
+
+def _report(**metrics):
+    return {'results': [dict(scenario='h3v10-wan4', test='tcp', **metrics)]}
+
+
+def test_compare_tolerance():
+    base = _report(bps=100e6, cps=1000.0)
+    assert compare(_report(bps=91e6, cps=1000.0), base, tolerance=0.1) == []
+    assert compare(_report(bps=89e6, cps=1000.0), base, tolerance=0.1) == [
+        'h3v10-wan4/tcp bps: 100000000.000 -> 89000000.000']
+    # Beter is nooit een regressie
+    assert compare(_report(bps=200e6, cps=5000.0), base) == []
+
+
+def test_compare_abs_slack():
+    # rtt 0.1 -> 0.15 ms is +50%, maar binnen ABS_SLACK (0.05 ms) bovenop 10%
+    base = _report(rtt_avg_ms=0.1, loss_pct=0.0)
+    assert compare(_report(rtt_avg_ms=0.15, loss_pct=0.5), base) == []
+    regressions = compare(_report(rtt_avg_ms=0.17, loss_pct=0.6), base)
+    assert [r.split(':')[0] for r in regressions] == ['h3v10-wan4/tcp rtt_avg_ms',
+                                                       'h3v10-wan4/tcp loss_pct']
+
+
+def test_compare_skips_missing():
+    base = _report(bps=None)
+    assert compare(_report(bps=1.0), base) == []
+    assert compare({'results': [dict(scenario='other', test='tcp', bps=1.0)]},
+                   _report(bps=100e6)) == []
+
+
+def test_unknown_tests():
+    assert check_tests(['tcp', 'ping']) == ['tcp', 'ping']
+    with pytest.raises(ValueError, match='tpc'):
+        check_tests(['tcp', 'tpc'])
+
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    args = parser.parse_args(['--bench', 'out', '--bench-tests', 'udp,cps'])
+    assert bench_options(args)['options']['tests'] == ['udp', 'cps']
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--bench', 'out', '--bench-tests', 'tcp,iperf'])
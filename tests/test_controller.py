@@ -0,0 +1,31 @@
+import os
+import subprocess
+import time
+
+from controller import DEFAULT_CONFIG, faucet_config_path
+
+
+def _config_of(env):
+    proc = subprocess.Popen(['sleep', '5'], env=env)
+    try:
+        # Tot exec klaar is staat de omgeving van de ouder nog in /proc
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            with open(f'/proc/{proc.pid}/cmdline', 'rb') as f:
+                if f.read().startswith(b'sleep'):
+                    break
+            time.sleep(0.01)
+        return faucet_config_path(proc.pid)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_config_path_from_environment():
+    env = dict(os.environ, FAUCET_CONFIG='/tmp/andere-faucet.yaml')
+    assert _config_of(env) == '/tmp/andere-faucet.yaml'
+
+
+def test_config_path_default():
+    env = {k: v for k, v in os.environ.items() if k != 'FAUCET_CONFIG'}
+    assert _config_of(env) == DEFAULT_CONFIG
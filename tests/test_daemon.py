@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+
+from daemon import NetDaemon
+
+
+class FakeNode(object):
+    def __init__(self, name, net):
+        self.name = name
+        self.net = net
+
+    def cmd(self, cmd):
+        self.net.ran.append((self.name, cmd))
+        if cmd == 'slow':
+            self.net.release.wait(2)
+        return f'{self.name}: {cmd}'
+
+
+class FakeNet(object):
+    def __init__(self, hosts=('h1', 'h2'), switches=('s1',)):
+        self.ran = []
+        self.release = threading.Event()
+        self.hosts = [FakeNode(n, self) for n in hosts]
+        self.switches = [FakeNode(n, self) for n in switches]
+
+    def __contains__(self, name):
+        return any(n.name == name for n in self.hosts + self.switches)
+
+    def get(self, name):
+        return next(n for n in self.hosts + self.switches if n.name == name)
+
+
+class FakeWriter(object):
+    def __init__(self, on_write=None):
+        self.responses = []
+        self.on_write = on_write
+        self.closed = False
+
+    def write(self, data):
+        response = json.loads(data)
+        self.responses.append(response)
+        if self.on_write:
+            self.on_write(response)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class LoggingLock(asyncio.Lock):
+    def __init__(self, name, log):
+        super().__init__()
+        self.name = name
+        self.log = log
+
+    async def acquire(self):
+        await super().acquire()
+        self.log.append(self.name)
+        return True
+
+
+def _request(daemon, request):
+    async def main():
+        writer = FakeWriter()
+        line = request if isinstance(request, bytes) else json.dumps(request).encode()
+        await daemon._handle(line, writer, asyncio.Lock())
+        return writer.responses
+    return asyncio.run(main())
+
+
+def test_dispatch():
+    daemon = NetDaemon(FakeNet(), workers=2)
+    [response] = _request(daemon, {'id': 7, 'op': 'nodes'})
+    assert response == {'ok': True, 'id': 7,
+                        'result': {'hosts': ['h1', 'h2'], 'switches': ['s1']}}
+    [response] = _request(daemon, {'id': 8, 'op': 'cmd', 'node': 'h2', 'cmd': 'ip a',
+                                   'timeout': 0})
+    assert response == {'ok': True, 'id': 8, 'result': {'node': 'h2', 'output': 'h2: ip a'}}
+    # Standaard met timeout om het commando
+    [response] = _request(daemon, {'id': 9, 'op': 'cmd', 'node': 'h1', 'cmd': 'true'})
+    assert response['result']['output'].startswith('h1: timeout ')
+    daemon.pool.shutdown()
+
+
+def test_errors():
+    daemon = NetDaemon(FakeNet(), workers=2)
+    [response] = _request(daemon, {'id': 3, 'op': 'frobnicate'})
+    assert response == {'ok': False, 'id': 3, 'error': 'ValueError: onbekende op frobnicate'}
+    [response] = _request(daemon, {'id': 4, 'op': 'cmd', 'node': 'h99', 'cmd': 'true'})
+    assert response['ok'] is False and 'h99' in response['error'] and response['id'] == 4
+    [response] = _request(daemon, {'id': 5, 'op': 'nodes', 'extra': 1})
+    assert response['ok'] is False and response['error'].startswith('TypeError')
+    [response] = _request(daemon, b'geen json\n')
+    assert response['ok'] is False and response['id'] is None
+    # Zonder live/check/cli_args zijn verify en reconfigure niet beschikbaar
+    [response] = _request(daemon, {'id': 6, 'op': 'reconfigure', 'args': '--vlans 10'})
+    assert response['error'] == 'ValueError: reconfigure niet beschikbaar'
+    daemon.pool.shutdown()
+
+
+def test_concurrent_requests_matched_by_id():
+    net = FakeNet()
+    daemon = NetDaemon(net, workers=2)
+
+    def on_write(response):
+        # Het trage commando loopt pas door als het snelle al beantwoord is
+        if response['id'] == 2:
+            net.release.set()
+
+    async def main():
+        daemon.stopped = asyncio.Event()
+        reader = asyncio.StreamReader()
+        for request in ({'id': 1, 'op': 'cmd', 'node': 'h1', 'cmd': 'slow', 'timeout': 0},
+                        {'id': 2, 'op': 'cmd', 'node': 'h2', 'cmd': 'fast', 'timeout': 0}):
+            reader.feed_data((json.dumps(request) + '\n').encode())
+        reader.feed_eof()
+        writer = FakeWriter(on_write)
+        await asyncio.wait_for(daemon._client(reader, writer), 5)
+        return writer
+
+    writer = asyncio.run(main())
+    assert [r['id'] for r in writer.responses] == [2, 1]
+    assert all(r['ok'] for r in writer.responses)
+    assert writer.closed and not daemon.clients
+    daemon.pool.shutdown()
+
+
+def test_exclusive_lock_order():
+    net = FakeNet(hosts=('h2', 'h1'), switches=('s1',))
+    daemon = NetDaemon(net, workers=2)
+    log = []
+
+    async def main():
+        daemon.locks = {name: LoggingLock(name, log) for name in ('h1', 'h2', 's1')}
+        # Een lopend commando op h2
+        await daemon.locks['h2'].acquire()
+        log.clear()
+        inside = asyncio.Event()
+        release = asyncio.Event()
+
+        async def exclusive():
+            async with daemon._exclusive():
+                inside.set()
+                await release.wait()
+
+        task = asyncio.ensure_future(exclusive())
+        await asyncio.sleep(0.05)
+        # Vaste volgorde: h1 gepakt, wacht op h2, s1 nog vrij
+        assert log == ['h1'] and not inside.is_set()
+        assert (await daemon.op_cmd('s1', 'x', timeout=0))['output'] == 's1: x'
+
+        daemon.locks['h2'].release()
+        await asyncio.wait_for(inside.wait(), 1)
+        assert log == ['h1', 's1', 'h2', 's1']
+
+        # Tijdens de exclusieve sectie wacht een cmd tot alles vrij is
+        pending = asyncio.ensure_future(daemon.op_cmd('h1', 'y', timeout=0))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        release.set()
+        await asyncio.wait_for(task, 1)
+        assert (await asyncio.wait_for(pending, 1))['output'] == 'h1: y'
+        assert not any(lock.locked() for lock in daemon.locks.values())
+
+    asyncio.run(main())
+    daemon.pool.shutdown()
@@ -0,0 +1,89 @@
+import random
+
+from edge import DEFAULT_VLANS, NFT_TABLE, EdgeRouter, EdgeVlan, _chain_diff
+
+
+def _apply(rules, lines):
+    # -D/-I uitvoeren zoals iptables-restore --noflush (regelnummers vanaf 1)
+    rules = list(rules)
+    for line in lines:
+        op, _, rest = line.split(' ', 2)
+        if op == '-D':
+            del rules[int(rest) - 1]
+        else:
+            index, spec = rest.split(' ', 1)
+            rules.insert(int(index) - 1, spec)
+    return rules
+
+
+def _chain(payload, table, chain):
+    # Regels van chain in een restore-payload (alleen -A)
+    rules, current = [], None
+    for line in payload.splitlines():
+        if line.startswith('*'):
+            current = line[1:]
+        elif current == table and line.startswith(f'-A {chain} '):
+            rules.append(line[len(f'-A {chain} '):])
+    return rules
+
+
+def test_restore_payload():
+    router = EdgeRouter()
+    v4 = router.restore_payload(4).splitlines()
+    assert v4[:4] == ['*filter', ':INPUT DROP [0:0]', ':FORWARD DROP [0:0]',
+                      ':OUTPUT ACCEPT [0:0]']
+    assert v4.count('COMMIT') == 2
+    nat = v4[v4.index('*nat'):]
+    assert nat[-2:] == ['-A POSTROUTING -o edgeA-eth1 -j MASQUERADE', 'COMMIT']
+    filt = v4[:v4.index('*nat')]
+    assert [l for l in filt if l.startswith('-A')] == \
+        [f'-A {chain} {spec}' for chain, spec in router.rules(4)['filter']]
+
+    v6 = router.restore_payload(6)
+    assert v6.endswith('COMMIT\n') and '*nat' not in v6
+    assert '-A FORWARD -p ipv6-icmp -j ACCEPT' in v6.splitlines()
+
+
+def test_chain_diff_reverse_order():
+    old = ['a', 'b', 'c', 'd']
+    new = ['a', 'x', 'c', 'y']
+    # Achteraan beginnen: d -> y eerst, dan b -> x
+    assert _chain_diff('FORWARD', old, new) == [
+        '-D FORWARD 4', '-I FORWARD 4 y', '-D FORWARD 2', '-I FORWARD 2 x']
+    assert _chain_diff('FORWARD', old, old) == []
+
+
+def test_chain_diff_applies():
+    rng = random.Random(1)
+    for _ in range(200):
+        old = [rng.choice('abcdef') for _ in range(rng.randint(0, 8))]
+        new = [rng.choice('abcdef') for _ in range(rng.randint(0, 8))]
+        assert _apply(old, _chain_diff('FORWARD', old, new)) == new
+
+
+def test_diff_payload():
+    old = EdgeRouter()
+    new = EdgeRouter(vlans=DEFAULT_VLANS[:2] + [EdgeVlan(40, '10.0.40.254/24', '2001:db8:40::1/64')])
+    for family in (4, 6):
+        payload = new.diff_payload(old, family)
+        assert payload.startswith('*filter\n') and payload.endswith('COMMIT\n')
+        lines = [l for l in payload.splitlines() if l.startswith(('-D', '-I'))]
+        forward = _chain(old.restore_payload(family), 'filter', 'FORWARD')
+        assert _apply(forward, lines) == _chain(new.restore_payload(family), 'filter', 'FORWARD')
+        # Alleen FORWARD verandert; nat blijft ongemoeid
+        assert all(l.split()[1] == 'FORWARD' for l in lines)
+        assert '*nat' not in payload
+    assert old.diff_payload(old, 4) is None
+
+
+def test_nft_diff_payload():
+    old = EdgeRouter(firewall='nft')
+    new = EdgeRouter(firewall='nft', vlans=[DEFAULT_VLANS[0], DEFAULT_VLANS[2],
+                                             EdgeVlan(40, '10.0.40.254/24', '2001:db8:40::1/64')])
+    assert new.nft_diff_payload(old).splitlines() == [
+        f'delete element {NFT_TABLE} forward_policy {{ "edgeA-eth2.20" . "edgeA-eth1" }}',
+        f'add element {NFT_TABLE} forward_policy {{ "edgeA-eth2.40" . "edgeA-eth1" : accept }}',
+    ]
+    assert old.nft_diff_payload(old) == ''
+    # Andere WAN-interface: de rest van de ruleset verschilt, dus geen diff
+    assert EdgeRouter(firewall='nft', wan_port=3).nft_diff_payload(old) is None
@@ -0,0 +1,28 @@
+from edge import DEFAULT_VLANS
+from hosts import command, from_vlan_table, host_config
+
+
+def test_from_vlan_table():
+    configs = from_vlan_table(DEFAULT_VLANS, [('h1', 10, '2001:db8:10::10/64'),
+                                              ('h2', 20, '2001:db8:20::10/64')])
+    assert [c.name for c in configs] == ['h1', 'h2']
+    assert configs[1].intf == 'h2-eth0'
+    assert (configs[1].gw4, configs[1].gw6) == ('10.0.20.254', '2001:db8:20::1')
+    assert command(configs[0]) == '; '.join([
+        'ip route replace default via 10.0.10.254',
+        'ip -6 addr add 2001:db8:10::10/64 dev h1-eth0',
+        'ip -6 route replace default via 2001:db8:10::1',
+    ])
+
+
+def test_command_addresses_and_routes():
+    cfg = host_config('h3v10', ip4='10.0.10.1/24', gw4='10.0.10.253',
+                      routes=[('10.0.20.0/24', '10.0.10.254'),
+                              ('2001:db8:20::/64', '2001:db8:10::1')])
+    assert command(cfg) == '; '.join([
+        'ip addr add 10.0.10.1/24 dev h3v10-eth0',
+        'ip route replace default via 10.0.10.253',
+        'ip route replace 10.0.20.0/24 via 10.0.10.254',
+        'ip route replace 2001:db8:20::/64 via 2001:db8:10::1',
+    ])
+    assert command(host_config('ctrlA')) == ''
@@ -0,0 +1,17 @@
+import pytest
+
+from l2gen import MAX_GEN, MAX_SERIALS, check_limits, endpoint_ip4, endpoint_mac
+
+
+def test_endpoint_identities_unique_across_generators():
+    ips = {endpoint_ip4(gen, serial) for gen in range(MAX_GEN + 1) for serial in (0, MAX_SERIALS - 1)}
+    assert len(ips) == 2 * (MAX_GEN + 1)
+    assert endpoint_mac(1, 0) != endpoint_mac(MAX_GEN, 0)
+
+
+def test_limits():
+    check_limits(MAX_GEN, 1, endpoints=2000, stable=16, churn=0.1, duration=60)
+    with pytest.raises(ValueError):
+        check_limits(MAX_GEN + 1, None, endpoints=10, stable=1, churn=0, duration=1)
+    with pytest.raises(ValueError):
+        check_limits(1, 2, endpoints=60000, stable=16, churn=0.1, duration=60)
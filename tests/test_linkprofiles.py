@@ -0,0 +1,29 @@
+import pytest
+
+from linkprofiles import PROFILES, UNSHAPED, parse_assignments, parse_profile
+
+
+def test_named_profiles():
+    assert parse_profile(UNSHAPED) == {}
+    assert parse_profile('darkfiber-10G-2ms') == PROFILES['darkfiber-10G-2ms']
+
+
+def test_parse_tokens():
+    assert parse_profile('1G-15ms') == {'bw': 1000.0, 'delay': '15ms'}
+    assert parse_profile('wan2-100M-40ms-j5ms-0.5%loss') == {
+        'bw': 100.0, 'delay': '40ms', 'jitter': '5ms', 'loss': 0.5}
+    assert parse_profile('isp-2.5G') == {'bw': 2500.0}
+    assert parse_profile('0.1%loss') == {'loss': 0.1}
+
+
+@pytest.mark.parametrize('name', ['isp-1G-15', 'isp-1T', '1G-isp', 'isp--1G', 'isp',
+                                  '1G-100M', 'ISP-1G'])
+def test_parse_errors(name):
+    with pytest.raises(ValueError, match='link-profiel'):
+        parse_profile(name)
+
+
+def test_parse_assignments():
+    assert parse_assignments('default,wan=1G-15ms')['wan'] == '1G-15ms'
+    with pytest.raises(ValueError):
+        parse_assignments('wan=1G-15x')
@@ -0,0 +1,58 @@
+import pytest
+import yaml
+
+from netmodel import NetModel
+
+
+def test_faucet_config_all_dps():
+    model = NetModel()
+    names = [sw.name for sw in model.switches]
+    assert list(model.faucet_config()['dps']) == names
+    assert list(yaml.safe_load(model.faucet_yaml())['dps']) == names
+
+
+def test_faucet_config_per_controller():
+    model = NetModel(sites=4, controllers=2, controller_split='site')
+    groups = model.controller_groups()
+    assert sorted(n for g in groups for n in g) == sorted(sw.name for sw in model.switches)
+    for group, text in zip(groups, model.faucet_yamls()):
+        assert group
+        assert list(model.faucet_config(dps=group)['dps']) == group
+        assert list(yaml.safe_load(text)['dps']) == group
+
+
+def test_extra_vlan_keeps_hosts():
+    old = NetModel(vids=(10, 20, 30))
+    new = NetModel(vids=(10, 20, 30, 40))
+    added = [h for h in new.hosts if h not in old.hosts]
+    assert set(old.hosts) <= set(new.hosts)
+    assert added and all(h.vlan == 'vlan40' for h in added)
+    assert set(old.links) <= set(new.links)
+    assert {l.node1 for l in set(new.links) - set(old.links)} == {h.name for h in added}
+
+
+def test_extra_vlan_diff():
+    pytest.importorskip('mininet')
+    from reconfig import diff
+
+    old = NetModel(vids=(10, 20, 30))
+    new = NetModel(vids=(10, 20, 30, 40))
+    plan = diff(old, new, old.faucet_yaml(), new.faucet_yaml())
+    assert plan.add_hosts == sorted(h.name for h in new.hosts if h.vlan == 'vlan40')
+    assert not plan.del_hosts and not plan.del_links and not plan.del_switches
+    assert not plan.add_switches
+    assert {l.node1 for l in plan.add_links} == set(plan.add_hosts)
+
+
+def test_vlan_blocks_overlap():
+    # 256 hosts per VLAN -> /23; vlan50 valt dan op 10.0.100.0/23 (ctrl-VLAN)
+    with pytest.raises(ValueError, match='vlan50 .* overlapt met vlan100'):
+        NetModel(sites=1, access_per_site=16, hosts_per_vlan=16, vids=(50,))
+    with pytest.raises(ValueError, match='vlan25 .* overlapt met vlan100'):
+        NetModel(sites=2, access_per_site=16, hosts_per_vlan=16, vids=(25,))
+    NetModel(sites=1, access_per_site=16, hosts_per_vlan=16, vids=(10, 20), ctrl=False)
+
+
+def test_controllers_without_dps():
+    with pytest.raises(ValueError, match='niet elke controller'):
+        NetModel(sites=2, controllers=4, controller_split='site')
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import time
+
+from ready import Condition, wait_condition, wait_ready
+
+
+class Sequence(Condition):
+    """check() geeft achtereenvolgens de waarden uit results; monitor schrijft
+    alle events in één keer en blijft daarna stil."""
+
+    def __init__(self, results, events=b'a\nb\n', name='seq'):
+        self.results = list(results)
+        self.events = events
+        self.name = name
+        self.checks = 0
+
+    def check(self):
+        self.checks += 1
+        return self.results.pop(0) if self.results else True
+
+    def monitor(self):
+        code = f'import os, time; os.write(1, {self.events!r}); time.sleep(10)'
+        return subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE)
+
+
+def test_buffered_events_are_not_lost():
+    # Twee events in één write: ook het tweede moet een check opleveren
+    cond = Sequence([False, False, True])
+    latency = wait_condition(cond, time.time() + 3)
+    assert latency is not None and latency < 2
+    assert cond.checks == 3
+
+
+def test_partial_line_waits_for_newline():
+    cond = Sequence([False, True], events=b'half')
+    assert wait_condition(cond, time.time() + 0.5) is None
+    assert cond.checks == 1
+
+
+def test_shared_deadline_checks_queued_conditions():
+    # Deadline al voorbij: elke conditie krijgt nog één check
+    result = wait_ready([Sequence([True], name='a'), Sequence([False], name='b')],
+                        timeout=0, verbose=False)
+    assert result['a'] is not None and result['b'] is None
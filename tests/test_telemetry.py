@@ -0,0 +1,53 @@
+from telemetry import Collector, parse_sample, sample_command
+
+TABLES = '''OFPST_TABLE reply (OF1.3) (xid=0x2):
+  table 0:
+    active=2, lookup=13, matched=13
+  table 1:
+    active=1, lookup=7, matched=7
+'''
+FLOWS = '''OFPST_FLOW reply (OF1.3) (xid=0x2):
+ cookie=0x5adc15c0, duration=5.1s, table=0, n_packets=10, n_bytes=600, priority=4096,in_port=1 actions=goto_table:1
+ cookie=0x5adc15c0, duration=5.1s, table=0, n_packets=3, n_bytes=180, priority=0 actions=drop
+ cookie=0x5adc15c0, duration=5.1s, table=1, n_packets=7, n_bytes=420, priority=0 actions=CONTROLLER:128,goto_table:2
+'''
+PORTS = '''OFPST_PORT reply (OF1.3) (xid=0x3): 1 ports
+  port  "s1-eth1": rx pkts=5, bytes=300, drop=0, errs=0, frame=0, over=0, crc=0
+           tx pkts=6, bytes=360, drop=0, errs=0, coll=0
+'''
+ROOT = '''### root
+rconn_sent          0.0/sec     0.000/sec        0.0000/sec   total: 42
+'''
+
+
+def test_tables_and_ports_without_flows():
+    sample = parse_sample('### s1\n' + TABLES + PORTS + ROOT)
+    assert sample['s1']['flows'] == 3
+    assert sample['s1']['s1-eth1.tx_bytes'] == 360
+    assert 'table_miss' not in sample['s1']
+    assert sample['root'] == {'rconn_sent': 42}
+
+
+def test_misses_and_packet_in_from_dump_flows():
+    s1 = parse_sample('### s1\n' + TABLES + PORTS + FLOWS + ROOT)['s1']
+    assert s1['table_miss'] == 10
+    assert s1['table0.table_miss'] == 3
+    assert s1['table1.table_miss'] == 7
+    assert s1['packet_in'] == 7
+
+
+def test_dump_flows_only_on_request():
+    assert 'dump-flows' not in sample_command(['s1'])
+    assert 'dump-flows' in sample_command(['s1'], flows=True)
+
+
+def test_decrease_is_a_reset(tmp_path):
+    collector = Collector(['s1'], path=str(tmp_path / 't.prom'))
+    collector._deltas(0.0, {'s1': {'packet_in': 100}})
+    rows = collector._deltas(1.0, {'s1': {'packet_in': 120}})
+    assert rows == [(1.0, 's1', 'packet_in', 20, 20.0)]
+    # Faucet-reload: flows opnieuw, tellers weer vanaf 0
+    rows = collector._deltas(2.0, {'s1': {'packet_in': 5}})
+    assert rows == [(2.0, 's1', 'packet_in', 5, 5.0)]
+    collector._write_prom()
+    assert 'sdn_packet_in_total{switch="s1"} 125' in (tmp_path / 't.prom').read_text()
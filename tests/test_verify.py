@@ -0,0 +1,80 @@
+import os
+
+from edge import EdgeRouter
+from netmodel import NetModel
+from verify import WAN4, Endpoint, PolicyModel, endpoints_from_model, host_vlans, load_faucet
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _wan_probes(model, holder=None):
+    """{host: verwacht} voor v4-WAN-probes van hosts in gerouteerde VLANs."""
+    routed = {v.name for v in model.routed_vlans}
+    endpoints = [e for e, h in zip(endpoints_from_model(model), model.hosts) if h.vlan in routed]
+    policy = PolicyModel(model.faucet_config(), model.edge_router(), model.uplinks(holder))
+    return {p.src: p.expected for p in policy.probes(endpoints, families=(4,)) if p.addr == WAN4}
+
+
+def test_uplink_per_site():
+    model = NetModel(sites=2, edge_sites=2)
+    uplinks = model.uplinks()
+    for h in model.hosts:
+        owner, via = uplinks[h.name]
+        assert owner.name == via.name == f'edge{h.site}'
+    expected = _wan_probes(model)
+    assert expected and all(expected.values())
+
+
+def test_uplink_after_failover():
+    model = NetModel(sites=2, edge_sites=2)
+    site_b = {h.name for h in model.hosts if h.site == 'B' and h.vlan != 'vlan100'}
+    uplinks = model.uplinks({'edgeB': 'edgeA'})
+    for name in site_b:
+        owner, via = uplinks[name]
+        assert (owner.name, via.name) == ('edgeB', 'edgeA')
+    assert all(_wan_probes(model, {'edgeB': 'edgeA'}).values())
+    # Niemand bedient de gateways van edgeB: site B kan niet naar buiten
+    expected = _wan_probes(model, {'edgeB': None})
+    assert not any(expected[name] for name in site_b)
+    assert all(v for name, v in expected.items() if name not in site_b)
+
+
+# Hosts van topo.py (adressen en VLANs zoals in faucet.yaml)
+TOPO_HOSTS = {'h1': ('10.0.10.1', '2001:db8:10::10'), 'h4': ('10.0.10.2', '2001:db8:10::11'),
+              'h2': ('10.0.20.1', '2001:db8:20::10'), 'h5': ('10.0.20.2', '2001:db8:20::11'),
+              'h3': ('10.0.30.1', '2001:db8:30::10'), 'h6': ('10.0.30.2', '2001:db8:30::11')}
+
+
+def _repo_policy():
+    config = load_faucet(os.path.join(ROOT, 'faucet.yaml'))
+    vids = host_vlans(config)
+    endpoints = [Endpoint(name, vids[name], ip4, ip6, None)
+                 for name, (ip4, ip6) in sorted(TOPO_HOSTS.items())]
+    return PolicyModel(config, EdgeRouter()), endpoints
+
+
+def test_repo_policy_host_pairs():
+    policy, endpoints = _repo_policy()
+    expected = {(p.src, p.dst, p.family): p.expected
+                for p in policy.probes(endpoints) if p.dst != 'wan'}
+    # v4: alleen binnen employee en management; guest-isolatie (acl_in op
+    # vlan20) en de edge-router (inter-VLAN DROP) houden de rest tegen
+    allowed4 = {(s, d) for (s, d, f), ok in expected.items() if ok and f == 4}
+    assert allowed4 == {('h1', 'h4'), ('h4', 'h1'), ('h3', 'h6'), ('h6', 'h3')}
+    # v6: ICMPv6 mag altijd door FORWARD, dus ping tussen vlan10 en vlan30
+    # gaat wel; guests blijven geïsoleerd (ook NDP naar de gateway valt
+    # binnen het guest-subnet)
+    allowed6 = {(s, d) for (s, d, f), ok in expected.items() if ok and f == 6}
+    non_guest = [n for n in TOPO_HOSTS if n not in ('h2', 'h5')]
+    assert allowed6 == {(s, d) for s in non_guest for d in non_guest if s != d}
+
+
+def test_repo_policy_wan():
+    policy, endpoints = _repo_policy()
+    wan = {(p.src, p.family): p.expected for p in policy.probes(endpoints) if p.dst == 'wan'}
+    assert len(wan) == 2 * len(endpoints)
+    # Iedereen kan via NAT naar buiten over v4, guests ook
+    assert all(wan[(name, 4)] for name in TOPO_HOSTS)
+    # v6: guests bereiken hun gateway niet (ACL op het eigen /64)
+    assert {name for name in TOPO_HOSTS if not wan[(name, 6)]} == {'h2', 'h5'}
@@ -1,13 +1,52 @@
 from mininet.topo import Topo
 from mininet.net import Mininet
-from mininet.node import RemoteController, OVSSwitch
+from mininet.node import RemoteController
 from mininet.cli import CLI
 from mininet.log import setLogLevel
-from mininet.util import quietRun
+
+import sys
+
+from bench import Scenario, add_arguments, bench_options, run_and_report
+from daemon import SOCKET, NetDaemon
+from edge import FIREWALLS, EdgeRouter, provision
+from hosts import from_vlan_table, host_config, provision_hosts
+from linkprofiles import link_params, parse_assignments, profile_meta
+from linkprofiles import add_arguments as add_profile_arguments
+from ovs import CONTROLLER_IP, CONTROLLER_PORT, FaucetSwitch
+from profiler import Profiler
+from ready import IfaceReady, SwitchesConnected, wait_ready
+from telemetry import Collector, telemetry_options
+from telemetry import add_arguments as add_telemetry_arguments
+from verify import endpoints_from_net, load_faucet, verify
+
+# Benchmarkmatrix; deze topologie heeft geen twee hosts in dezelfde VLAN op
+# dezelfde site (zie topo_schaalbaar.py voor intra-site scenario's)
+BENCH_SCENARIOS = [
+    Scenario('vlan10-darkfiber', 'h1', 'h4', '10.0.10.2', 4),
+    Scenario('vlan30-darkfiber', 'h3', 'h6', '10.0.30.2', 4),
+    Scenario('wan-nat', 'h1', 'isp0', '8.8.8.8', 4),
+    Scenario('wan-v6', 'h1', 'isp0', '2001:db8:ffff::1', 6),
+]
+
+# host -> (VLAN, IPv6-adres)
+HOST_VLANS = [
+    ('h1', 10, '2001:db8:10::10/64'),
+    ('h4', 10, '2001:db8:10::11/64'),
+    ('h2', 20, '2001:db8:20::10/64'),
+    ('h5', 20, '2001:db8:20::11/64'),
+    ('h3', 30, '2001:db8:30::10/64'),
+    ('h6', 30, '2001:db8:30::11/64'),
+]
 
 
 class SDNTopo(Topo):
-    def build(self):
+    def link(self, node1, node2, kind):
+        # Shaping per linksoort (linkprofiles.py); zonder profiel een kale veth
+        return self.addLink(node1, node2, **link_params(self.profiles.get(kind)))
+
+    def build(self, profiles=None):
+        self.profiles = profiles or {}
+
         # -------- Switches met vaste DPIDs (matchen met faucet.yaml) --------
         a_core = self.addSwitch('s1', dpid='0000000000000001')  # Core A
         b_core = self.addSwitch('s2', dpid='0000000000000002')  # Core B
@@ -37,274 +76,164 @@ class SDNTopo(Topo):
 
         # -------- Links --------
         # Core <-> Access (A)
-        self.addLink(a_core, a1)
-        self.addLink(a_core, a2)
+        self.link(a_core, a1, 'uplink')
+        self.link(a_core, a2, 'uplink')
 
         # Core <-> Access (B)
-        self.addLink(b_core, b1)
-        self.addLink(b_core, b2)
-        self.addLink(b_core, b3)
+        self.link(b_core, b1, 'uplink')
+        self.link(b_core, b2, 'uplink')
+        self.link(b_core, b3, 'uplink')
 
         # Darkfiber A <-> B
-        self.addLink(a_core, b_core)
+        self.link(a_core, b_core, 'darkfiber')
 
         # Hosts A
-        self.addLink(hA1_emp, a1)
-        self.addLink(hA1_gst, a1)
-        self.addLink(hA2_mng, a2)
+        self.link(hA1_emp, a1, 'access')
+        self.link(hA1_gst, a1, 'access')
+        self.link(hA2_mng, a2, 'access')
         
         # Hosts B
-        self.addLink(hB1_emp, b1)
-        self.addLink(hB2_gst, b2)
-        self.addLink(hB3_mng, b3)
+        self.link(hB1_emp, b1, 'access')
+        self.link(hB2_gst, b2, 'access')
+        self.link(hB3_mng, b3, 'access')
 
         # Controllers (optioneel)
-        self.addLink(ctrlA, a_core)
-        self.addLink(ctrlB, b_core)
+        self.link(ctrlA, a_core, 'access')
+        self.link(ctrlB, b_core, 'access')
 
         # Edge-router en ISP
         edgeA = self.addHost('edgeA', ip='10.0.30.254/24')
         isp0 = self.addHost('isp0', ip='203.0.113.1/28')
 
         # LAN naar VLAN30
-        self.addLink(edgeA, a2)
+        self.link(edgeA, a2, 'access')
         # WAN naar ISP
-        self.addLink(edgeA, isp0)
+        self.link(edgeA, isp0, 'wan')
         # LAN naar VLANS (trunk)
-        self.addLink(edgeA, a_core)
-
-def run():
-    topo = SDNTopo()
-    net = Mininet(topo=topo, switch=OVSSwitch, build=False, controller=None)
-
-    c0 = net.addController('c0', controller=RemoteController, ip='127.0.0.1', port=6653)
-    net.build()
-    net.start()
-
-    isp0 = net.get('isp0')
-    # een korte wacht kan helpen, maar 'replace' is meestal genoeg
-    isp0.cmd('ip -6 route replace 2001:db8:10::/64 via 2001:db8:ffff::2')
-    isp0.cmd('ip -6 route replace 2001:db8:20::/64 via 2001:db8:ffff::2')
-    isp0.cmd('ip -6 route replace 2001:db8:30::/64 via 2001:db8:ffff::2')
-
-    # Forceer OpenFlow13 en één controller
-    for s in ['s1','s2','s3','s4','s5','s6','s7']:
-        quietRun(f'ovs-vsctl del-controller {s}')
-        quietRun(f'ovs-vsctl set-controller {s} tcp:127.0.0.1:6653')
-        quietRun(f'ovs-vsctl set-fail-mode {s} secure')
-        quietRun(f'ovs-vsctl set bridge {s} protocols=OpenFlow13')
+        self.link(edgeA, a_core, 'edge')
+
+def run(edge_mode='batch', timings='timings.json', profile=None, bench=None,
+        verify_config=None, telemetry=None, profiles=None, firewall='iptables', daemon=None):
+    # daemon: Unix-socket voor de API (daemon.py) i.p.v. de interactieve CLI
+    prof = Profiler(cprofile=bool(profile))
+    prof.install()
+
+    topo = SDNTopo(profiles=profiles)
+    if profiles:
+        print('*** link-profielen: ' + ', '.join(f'{kind}={name}' for kind, name
+                                                  in sorted(profiles.items())))
+    net = Mininet(topo=topo, switch=FaucetSwitch, build=False, controller=None)
+
+    # OpenFlow13, fail-mode secure en de controller worden bij het aanmaken gezet
+    c0 = net.addController('c0', controller=RemoteController, ip=CONTROLLER_IP, port=CONTROLLER_PORT)
+    with prof.phase('net.build'):
+        net.build()
+    with prof.phase('net.start'):
+        net.start()
 
     # -------- NAT + IPv6-routering (edgeA) --------
     edgeA = net.get('edgeA')
     isp0 = net.get('isp0')
+    router = EdgeRouter('edgeA', firewall=firewall)
 
-    # ISP kant (IPv4 + IPv6)
-    isp0.cmd('ip addr flush dev isp0-eth0')
-    isp0.cmd('ip addr add 203.0.113.1/28 dev isp0-eth0')
-    isp0.cmd('ip -6 addr add 2001:db8:ffff::1/64 dev isp0-eth0')
-    isp0.cmd('ip link set isp0-eth0 up')
-    isp0.cmd('ip -6 route add 2001:db8:10::/64 via 2001:db8:ffff::2')
-    isp0.cmd('ip -6 route add 2001:db8:20::/64 via 2001:db8:ffff::2')
-    isp0.cmd('ip -6 route add 2001:db8:30::/64 via 2001:db8:ffff::2')
-
-    edgeA.cmd('ip addr flush dev edgeA-eth1')
-    edgeA.cmd('ip addr add 203.0.113.2/28 dev edgeA-eth1')
-    edgeA.cmd('ip -6 addr add 2001:db8:ffff::2/64 dev edgeA-eth1')
-    edgeA.cmd('ip link set edgeA-eth1 up')
-    edgeA.cmd('ip route add default via 203.0.113.1')
-    edgeA.cmd('ip -6 route add default via 2001:db8:ffff::1')
-
-    import time
-
-    # --- Robust wait: ensure WAN ifaces are really up & IPv6 DAD finished ---
-    def wait_iface_ready(node, ifname, timeout=6.0):
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            link = node.cmd(f'ip link show {ifname}')
-            addr = node.cmd(f'ip -6 addr show dev {ifname}')
-            if 'state UP' in link and 'tentative' not in addr:
-                return True
-            time.sleep(0.2)
-        return False
-
-    # Wait for both WAN ends
-    wait_iface_ready(edgeA, 'edgeA-eth1')
-    wait_iface_ready(isp0,  'isp0-eth0')
-
-    # --- Stabilize IPv6 WAN link (edgeA <-> isp0) ---
-    # Zorg dat default route bestaat (wordt soms niet actief bij herstart)
-    edgeA.cmd('ip -6 route replace default via 2001:db8:ffff::1 dev edgeA-eth1')
-
-    # Flush oude NDP entries aan beide kanten (voorkomt "Address unreachable" direct na start)
-    edgeA.cmd('ip -6 neigh flush all')
-    isp0.cmd('ip -6 neigh flush all')
-
-    # 1 korte "warm-up" ping aan beide kanten om NDP direct op te bouwen
-    edgeA.cmd('ping6 -c1 -W1 2001:db8:ffff::1 || true')
-    isp0.cmd('ping6 -c1 -W1 2001:db8:ffff::2 || true')
-
-    # VLAN-subinterfaces
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.10 type vlan id 10')
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.20 type vlan id 20')
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.30 type vlan id 30')
-
-    edgeA.cmd('ip addr add 10.0.10.254/24 dev edgeA-eth2.10')
-    edgeA.cmd('ip addr add 10.0.20.254/24 dev edgeA-eth2.20')
-    edgeA.cmd('ip addr add 10.0.30.254/24 dev edgeA-eth2.30')
-
-    edgeA.cmd('ip -6 addr add 2001:db8:10::1/64 dev edgeA-eth2.10')
-    edgeA.cmd('ip -6 addr add 2001:db8:20::1/64 dev edgeA-eth2.20')
-    edgeA.cmd('ip -6 addr add 2001:db8:30::1/64 dev edgeA-eth2.30')
-
-    edgeA.cmd('ip link set edgeA-eth2 up')
-    edgeA.cmd('ip link set edgeA-eth2.10 up')
-    edgeA.cmd('ip link set edgeA-eth2.20 up')
-    edgeA.cmd('ip link set edgeA-eth2.30 up')
-
-    # --- IPv6 routing/iptables ---
-    # Forwarding nogmaals expliciet per interface (nu ze bestaan)
-    edgeA.cmd('sysctl -w net.ipv6.conf.all.forwarding=1')
-    for iface in ['edgeA-eth1','edgeA-eth2','edgeA-eth2.10','edgeA-eth2.20','edgeA-eth2.30']:
-        edgeA.cmd(f"sysctl -w net.ipv6.conf.{iface}.forwarding=1 || true")
-
-    # Schone ip6tables + policies
-    edgeA.cmd('ip6tables -F')
-    edgeA.cmd('ip6tables -P INPUT DROP')
-    edgeA.cmd('ip6tables -P OUTPUT ACCEPT')
-    edgeA.cmd('ip6tables -P FORWARD ACCEPT')
-
-    # Basis INPUT (NDP/PMTU/established)
-    edgeA.cmd('ip6tables -A INPUT -i lo -j ACCEPT')
-    edgeA.cmd('ip6tables -A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-    edgeA.cmd('ip6tables -A INPUT -p ipv6-icmp -j ACCEPT')
-
-    # LAN -> WAN toestaan (IPv6)
-    for vid in ['10','20','30']:
-        edgeA.cmd(f'ip6tables -A FORWARD -i edgeA-eth2.{vid} -o edgeA-eth1 -j ACCEPT')
-
-    # Retourverkeer WAN -> LAN
-    for vid in ['10','20','30']:
-        edgeA.cmd(f'ip6tables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.{vid} -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-
-    # ICMPv6 altijd doorlaten in FORWARD (NDP/PMTU)
-    edgeA.cmd('ip6tables -A FORWARD -p ipv6-icmp -j ACCEPT')
-
-    # --- FIX voor VLAN30 NAT / rp_filter probleem ---
-    # edgeA-eth0 (oude mgmt-interface) uitschakelen om routingconflict te voorkomen
-    edgeA.cmd('ip addr flush dev edgeA-eth0')
-    edgeA.cmd('ip link set edgeA-eth0 down')
-
-    # Reverse-path filtering uitschakelen (anders dropt Linux NAT-verkeer met andere bron)
-    edgeA.cmd('sysctl -w net.ipv4.conf.all.rp_filter=0')
-    edgeA.cmd('sysctl -w net.ipv4.conf.edgeA-eth1.rp_filter=0')
-    edgeA.cmd('sysctl -w net.ipv4.conf.edgeA-eth2.30.rp_filter=0')
-
-    #Zet IPv6 forwarding HIER aan (nu bestaan de interfaces pas echt)
-    edgeA.cmd('sysctl -w net.ipv6.conf.all.forwarding=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.edgeA-eth1.forwarding=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.edgeA-eth2.forwarding=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.edgeA-eth2.10.forwarding=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.edgeA-eth2.20.forwarding=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.edgeA-eth2.30.forwarding=1')
-
-    # IP forwarding
-    edgeA.cmd('sysctl -w net.ipv4.ip_forward=1')
-    edgeA.cmd('sysctl -w net.ipv6.conf.all.forwarding=1')
-
-    # -------- Stateful firewall --------
-    edgeA.cmd('iptables -t nat -F')
-    edgeA.cmd('iptables -F')
-    edgeA.cmd('iptables -X')
-    edgeA.cmd('ip6tables -F')
-    edgeA.cmd('ip6tables -X')
-
-    edgeA.cmd('iptables -P INPUT DROP')
-    edgeA.cmd('iptables -P FORWARD DROP')
-    edgeA.cmd('iptables -P OUTPUT ACCEPT')
-
-    edgeA.cmd('ip6tables -P INPUT DROP')
-    edgeA.cmd('ip6tables -P FORWARD DROP')
-    edgeA.cmd('ip6tables -P OUTPUT ACCEPT')
-
-    edgeA.cmd('iptables -A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-    edgeA.cmd('iptables -A INPUT -i lo -j ACCEPT')
-    edgeA.cmd('iptables -A INPUT -p icmp -j ACCEPT')
-
-    edgeA.cmd('ip6tables -A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-    edgeA.cmd('ip6tables -A INPUT -i lo -j ACCEPT')
-    edgeA.cmd('ip6tables -A INPUT -p ipv6-icmp -j ACCEPT')
-    edgeA.cmd('ip6tables -A FORWARD -p ipv6-icmp -j ACCEPT')
-
-    # LAN ▒^v^r^f^r WAN (v4 + v6)
-    for vid in ['10','20','30']:
-        edgeA.cmd(f'iptables -A FORWARD -i edgeA-eth2.{vid} -o edgeA-eth1 -j ACCEPT')
-        edgeA.cmd(f'ip6tables -A FORWARD -i edgeA-eth2.{vid} -o edgeA-eth1 -j ACCEPT')
-
-    edgeA.cmd('ip6tables -A FORWARD -p ipv6-icmp -j ACCEPT')
-    for vid in ['10','20','30']:
-        edgeA.cmd(f'ip6tables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.{vid} -p ipv6-icmp -j ACCEPT')
-
-    # Retourverkeer toestaan
-    edgeA.cmd('iptables -A FORWARD -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-    edgeA.cmd('ip6tables -A FORWARD -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-
-    # Extra retourverkeerregels specifiek voor VLAN30 ▒^f^t WAN
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth1 -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.30 -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT')
-
-    # Inter-VLAN blokkeren
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.10 -o edgeA-eth2.20 -j DROP')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.20 -o edgeA-eth2.10 -j DROP')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth2.10 -j DROP')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth2.20 -j DROP')
-
-    edgeA.cmd('ip6tables -A FORWARD -i edgeA-eth2.10 -o edgeA-eth2.20 -j DROP')
-    edgeA.cmd('ip6tables -A FORWARD -i edgeA-eth2.20 -o edgeA-eth2.10 -j DROP')
-    edgeA.cmd('ip6tables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth2.10 -j DROP')
-    edgeA.cmd('ip6tables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth2.20 -j DROP')
-
-    # NAT voor IPv4
-    edgeA.cmd('iptables -t nat -A POSTROUTING -o edgeA-eth1 -j MASQUERADE')
-
-    # -------- Default gateways en IPv6 --------
-    # VLAN10
-    net.get('h1').cmd('ip route add default via 10.0.10.254')
-    net.get('h4').cmd('ip route add default via 10.0.10.254')
-    net.get('h1').cmd('ip -6 addr add 2001:db8:10::10/64 dev h1-eth0')
-    net.get('h4').cmd('ip -6 addr add 2001:db8:10::11/64 dev h4-eth0')
-    net.get('h1').cmd('ip -6 route add default via 2001:db8:10::1')
-    net.get('h4').cmd('ip -6 route add default via 2001:db8:10::1')
-
-    # VLAN20
-    net.get('h2').cmd('ip route add default via 10.0.20.254')
-    net.get('h5').cmd('ip route add default via 10.0.20.254')
-    net.get('h2').cmd('ip -6 addr add 2001:db8:20::10/64 dev h2-eth0')
-    net.get('h5').cmd('ip -6 addr add 2001:db8:20::11/64 dev h5-eth0')
-    net.get('h2').cmd('ip -6 route add default via 2001:db8:20::1')
-    net.get('h5').cmd('ip -6 route add default via 2001:db8:20::1')
-
-    # VLAN30
-    net.get('h3').cmd('ip route add default via 10.0.30.254')
-    net.get('h6').cmd('ip route add default via 10.0.30.254')
-    net.get('h3').cmd('ip -6 addr add 2001:db8:30::10/64 dev h3-eth0')
-    net.get('h6').cmd('ip -6 addr add 2001:db8:30::11/64 dev h6-eth0')
-    net.get('h3').cmd('ip -6 route add default via 2001:db8:30::1')
-    net.get('h6').cmd('ip -6 route add default via 2001:db8:30::1')
+    # ISP kant (IPv4 + IPv6, retourroutes naar de VLAN-prefixen, 8.8.8.8)
+    with prof.phase('wan'):
+        router.apply_isp(isp0, 'isp0-eth0')
 
-    # Management servers
-    net.get('ctrlA').cmd('ip addr add 10.0.100.10/24 dev ctrlA-eth0')
-    net.get('ctrlB').cmd('ip addr add 10.0.100.11/24 dev ctrlB-eth0')
+    # Volledige edgeA-toestand (adressen, VLANs, routes, sysctls, firewall)
+    # als model opbouwen en in een paar bulk-transacties laden
+    with prof.phase('edge'):
+        count, elapsed = provision(edgeA, router, mode=edge_mode)
+    print(f'*** edgeA geconfigureerd ({edge_mode}, {firewall}): {count} commando\'s in {elapsed:.3f}s')
 
-    isp0.cmd('ip addr add 8.8.8.8/32 dev isp0-eth0')
+    # -------- Default gateways en IPv6 (parallel per host) --------
+    # Gateways per VLAN volgen uit het edge-model
+    configs = from_vlan_table(router.vlans, HOST_VLANS)
+    # Management servers
+    configs += [host_config('ctrlA', ip4='10.0.100.10/24'),
+                host_config('ctrlB', ip4='10.0.100.11/24')]
+    with prof.phase('hosts'):
+        count, elapsed = provision_hosts(net, configs)
+    print(f'*** {count} hosts geconfigureerd in {elapsed:.3f}s')
+
+    # -------- Readiness (event-gedreven, parallel) --------
+    # WAN-kanten, edgeA-gateways en hosts: link UP en IPv6 DAD klaar;
+    # alle switches verbonden met Faucet voordat er verkeer start
+    conditions = [IfaceReady(edgeA, router.wan_if), IfaceReady(isp0, 'isp0-eth0')]
+    conditions += [IfaceReady(edgeA, ifname) for ifname in router.lan_ifs()]
+    conditions += [IfaceReady(net.get(cfg.name), cfg.intf) for cfg in configs if cfg.ip6]
+    conditions.append(SwitchesConnected(len(net.switches)))
+    with prof.phase('ready'):
+        wait_ready(conditions)
+
+    prof.uninstall()
+    prof.write(timings, cprofile_path=profile)
+
+    # Telemetrie op de achtergrond zolang het netwerk draait
+    collector = Collector(net.switches, **telemetry).start() if telemetry else None
 
     print('*** IPv4/IPv6 routing + stateful firewall actief op edgeA')
-    print('*** Test v4: h1 ping 8.8.8.8 | Test v6: h1 ping6 2001:db8:ffff::1')
-    print('*** Guestisolatie: h2 ping h5 (zou moeten falen door ACL)')
 
-    CLI(net)
+    # Headless: policy-verificatie en/of benchmark i.p.v. de CLI
+    def check(path):
+        config = load_faucet(path)
+        ip6 = {name: addr for name, _, addr in HOST_VLANS}
+        return verify(net, config, endpoints_from_net(net, config, ip6), router)
+
+    if verify_config or bench:
+        code = 0
+        if verify_config:
+            code = check(verify_config)
+        if bench:
+            code = max(code, run_and_report(net, BENCH_SCENARIOS, bench['output'],
+                                            meta=dict(profile_meta(profiles), firewall=firewall),
+                                            **bench['options']))
+        if collector:
+            collector.stop()
+        net.stop()
+        return code
+
+    if daemon:
+        # Vaste topologie: geen reconfigure, verify tegen faucet.yaml
+        NetDaemon(net, path=daemon, scenarios=BENCH_SCENARIOS,
+                  meta=dict(profile_meta(profiles), firewall=firewall),
+                  check=lambda: check('faucet.yaml')).serve()
+    else:
+        print('*** Test v4: h1 ping 8.8.8.8 | Test v6: h1 ping6 2001:db8:ffff::1')
+        print('*** Guestisolatie: h2 ping h5 (zou moeten falen door ACL)')
+        CLI(net)
+    if collector:
+        collector.stop()
     net.stop()
+    return 0
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SDN-topologie (Mininet + Faucet)')
+    parser.add_argument('--edge-mode', choices=['batch', 'sequential'], default='batch',
+                        help='edgeA in bulk-transacties of met losse commando\'s configureren')
+    parser.add_argument('--firewall', choices=FIREWALLS, default='iptables',
+                        help='firewall-backend van edgeA')
+    parser.add_argument('--timings', default='timings.json',
+                        help='JSON-rapport met tijd per startfase')
+    parser.add_argument('--profile', nargs='?', const='startup.prof', default=None,
+                        help='schrijf ook een cProfile van de Python-kant (standaard startup.prof)')
+    parser.add_argument('--verify', nargs='?', const='faucet.yaml', default=None,
+                        metavar='FAUCET_YAML',
+                        help='controleer de bereikbaarheid tegen de policy uit FAUCET_YAML')
+    parser.add_argument('--daemon', nargs='?', const=SOCKET, default=None, metavar='SOCKET',
+                        help=f'netwerk laten draaien met een API op SOCKET (standaard {SOCKET}) '
+                             'i.p.v. de CLI; zie daemon.py')
+    add_arguments(parser)
+    add_telemetry_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
     setLogLevel('info')
-    run()
+    sys.exit(run(edge_mode=args.edge_mode, timings=args.timings, profile=args.profile,
+                 bench=bench_options(args), verify_config=args.verify,
+                 telemetry=telemetry_options(args),
+                 profiles=parse_assignments(args.link_profiles), firewall=args.firewall,
+                 daemon=args.daemon))
 
@@ -1,153 +1,245 @@
 from mininet.topo import Topo
 from mininet.net import Mininet
-from mininet.node import RemoteController, OVSSwitch
+from mininet.node import RemoteController
 from mininet.cli import CLI
 from mininet.log import setLogLevel
-from mininet.util import quietRun  # voor OVS-commando's
+
+import sys
+
+from bench import add_arguments, bench_options, run_and_report, scenarios_from_model
+from controller import FaucetGroup
+from daemon import SOCKET, NetDaemon
+from edge import FIREWALLS, provision
+from edgesites import EdgeFailover, EdgeLoad
+from hosts import WORKERS, from_model, provision_hosts
+from linkprofiles import link_params, parse_assignments, profile_meta
+from linkprofiles import add_arguments as add_profile_arguments
+from netmodel import CONTROLLER_SPLITS, DARKFIBER_MODES, NetModel, load_acls
+from ovs import CONTROLLER_IP, CONTROLLER_PORT, FaucetSwitch
+from profiler import Profiler
+from reconfig import LiveNet, SDNCLI
+from ready import IfaceReady, SwitchesConnected, wait_ready
+from telemetry import Collector, telemetry_options
+from telemetry import add_arguments as add_telemetry_arguments
+from verify import endpoints_from_model, load_faucet, verify
 
 
 class SDNTopo(Topo):
-    def build(self):
-        # -------- Switches met vaste DPIDs (matchen met faucet.yaml) --------
-        a_core = self.addSwitch('s1', dpid='0000000000000001')  # Core A
-        b_core = self.addSwitch('s2', dpid='0000000000000002')  # Core B
-
-        a1 = self.addSwitch('s3', dpid='0000000000000003')      # Access A1
-        a2 = self.addSwitch('s4', dpid='0000000000000004')      # Access A2 (mgmt)
-        b1 = self.addSwitch('s5', dpid='0000000000000005')      # Access B1
-        b2 = self.addSwitch('s6', dpid='0000000000000006')      # Access B2 (guest)
-        b3 = self.addSwitch('s7', dpid='0000000000000007')      # Access B3 (mgmt)
-
-        # -------- Hosts (IPs) --------
-        # VLAN10 (employee)
-        hA1_emp = self.addHost('h1', ip='10.0.10.1/24')
-        hB1_emp = self.addHost('h4', ip='10.0.10.2/24')
-
-        # VLAN20 (guest)
-        hA1_gst = self.addHost('h2', ip='10.0.20.1/24')
-        hB2_gst = self.addHost('h5', ip='10.0.20.2/24')
-
-        # VLAN30 (management) -- MET VASTE MACS (belangrijk voor ACL)
-        hA2_mng = self.addHost('h3', ip='10.0.30.1/24', mac='b2:be:ec:10:f8:d3')
-        hB3_mng = self.addHost('h6', ip='10.0.30.2/24', mac='1e:f0:bf:48:c8:57')
-
-        # (optioneel) management servers
-        ctrlA = self.addHost('ctrlA', ip='10.0.100.1/24')
-        ctrlB = self.addHost('ctrlB', ip='10.0.100.2/24')
-
-        # -------- Links (volgorde bepaalt poortnummers) --------
-        # Core <-> Access (A)
-        self.addLink(a_core, a1)   # s1-eth1 <-> s3-eth1 (trunk)
-        self.addLink(a_core, a2)   # s1-eth2 <-> s4-eth1 (trunk)
-
-        # Core <-> Access (B)
-        self.addLink(b_core, b1)   # s2-eth1 <-> s5-eth1 (trunk)
-        self.addLink(b_core, b2)   # s2-eth2 <-> s6-eth1 (trunk)
-        self.addLink(b_core, b3)   # s2-eth3 <-> s7-eth1 (trunk)
-
-        # Darkfiber A <-> B (trunk)
-        self.addLink(a_core, b_core)  # s1-eth3 <-> s2-eth4
-
-        # Hosts A
-        self.addLink(hA1_emp, a1)  # h1-eth0 <-> s3-eth2 (employee)
-        self.addLink(hA1_gst, a1)  # h2-eth0 <-> s3-eth3 (guest)
-        self.addLink(hA2_mng, a2)  # h3-eth0 <-> s4-eth2 (management)
-
-        # Hosts B
-        self.addLink(hB1_emp, b1)  # h4-eth0 <-> s5-eth2 (employee)
-        self.addLink(hB2_gst, b2)  # h5-eth0 <-> s6-eth2 (guest)
-        self.addLink(hB3_mng, b3)  # h6-eth0 <-> s7-eth2 (management)
-
-        # Controllers (als hosts in mgmt VLAN, optioneel)
-        self.addLink(ctrlA, a_core)  # ctrlA-eth0 <-> s1-eth4
-        self.addLink(ctrlB, b_core)  # ctrlB-eth0 <-> s2-eth5
-
-        # -------- Edge-router en ISP-simulatie --------
-        edgeA = self.addHost('edgeA', ip='10.0.30.254/24')  # LAN-zijde (in VLAN30)
-        isp0 = self.addHost('isp0', ip='203.0.113.1/28')    # WAN-simulatie
-
-        # LAN naar VLAN30 (via A2-switch)
-        self.addLink(edgeA, a2)      # edgeA-eth0 <-> s4-eth3 (faucet: native_vlan vlan30)
-        # WAN naar ISP (buiten Faucet)
-        self.addLink(edgeA, isp0)    # edgeA-eth1 <-> isp0-eth0 (rechtstreeks)
-        # LAN naar VLANS (trunk)
-        self.addLink(edgeA, a_core)  # edgeA-eth2 <-> s1-eth5 (trunk voor VLAN10/20/30)
-
-def run():
-    topo = SDNTopo()
-    net = Mininet(topo=topo, switch=OVSSwitch, build=False, controller=None)
-
-    c0 = net.addController('c0', controller=RemoteController, ip='127.0.0.1', port=6653)
-    net.build()
-    net.start()
-
-    # Forceer OpenFlow13 en één controller
-    for s in ['s1','s2','s3','s4','s5','s6','s7']:
-        quietRun(f'ovs-vsctl del-controller {s}')
-        quietRun(f'ovs-vsctl set-controller {s} tcp:127.0.0.1:6653')
-        quietRun(f'ovs-vsctl set-fail-mode {s} secure')
-        quietRun(f'ovs-vsctl set bridge {s} protocols=OpenFlow13')
-
-    # -------- NAT configureren (edgeA als router) --------
-    edgeA = net.get('edgeA')
-    isp0 = net.get('isp0')
-
-    # Publieke kant (ISP simulatie)
-    isp0.cmd('ip addr flush dev isp0-eth0')
-    isp0.cmd('ip addr add 203.0.113.1/28 dev isp0-eth0')
-    isp0.cmd('ip link set isp0-eth0 up')
-
-    edgeA.cmd('ip addr flush dev edgeA-eth1')
-    edgeA.cmd('ip addr add 203.0.113.2/28 dev edgeA-eth1')
-    edgeA.cmd('ip link set edgeA-eth1 up')
-    edgeA.cmd('ip route add default via 203.0.113.1')
-
-    # Interne kant (VLAN▒^`^ys 10/20/30)
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.10 type vlan id 10')
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.20 type vlan id 20')
-    edgeA.cmd('ip link add link edgeA-eth2 name edgeA-eth2.30 type vlan id 30')
-    edgeA.cmd('ip addr add 10.0.10.254/24 dev edgeA-eth2.10')
-    edgeA.cmd('ip addr add 10.0.20.254/24 dev edgeA-eth2.20')
-    edgeA.cmd('ip addr add 10.0.30.254/24 dev edgeA-eth2.30')
-    edgeA.cmd('ip link set edgeA-eth2 up')
-    edgeA.cmd('ip link set edgeA-eth2.10 up')
-    edgeA.cmd('ip link set edgeA-eth2.20 up')
-    edgeA.cmd('ip link set edgeA-eth2.30 up')
-
-    # IP forwarding + iptables NAT
-    edgeA.cmd('sysctl -w net.ipv4.ip_forward=1')
-    edgeA.cmd('iptables -t nat -F')
-    edgeA.cmd('iptables -F')
-    edgeA.cmd('iptables -P FORWARD DROP')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.10 -m state --state RELATED,ESTABLISHED -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.20 -m state --state RELATED,ESTABLISHED -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth1 -o edgeA-eth2.30 -m state --state RELATED,ESTABLISHED -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.10 -o edgeA-eth1 -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.20 -o edgeA-eth1 -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth2.30 -o edgeA-eth1 -j ACCEPT')
-    edgeA.cmd('iptables -t nat -A POSTROUTING -o edgeA-eth1 -j MASQUERADE')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth0 -o edgeA-eth1 -j ACCEPT')
-    edgeA.cmd('iptables -A FORWARD -i edgeA-eth1 -o edgeA-eth0 -m state --state RELATED,ESTABLISHED -j ACCEPT')
-
-
-    # Default gateways per VLAN
-    net.get('h1').cmd('ip route add default via 10.0.10.254')
-    net.get('h4').cmd('ip route add default via 10.0.10.254')
-    net.get('h2').cmd('ip route add default via 10.0.20.254')
-    net.get('h5').cmd('ip route add default via 10.0.20.254')
-    net.get('h3').cmd('ip route add default via 10.0.30.254')
-    net.get('h6').cmd('ip route add default via 10.0.30.254')
-
-    # ▒^`^|Internet▒^`^}-adres (8.8.8.8) simuleren op ISP
-    isp0.cmd('ip addr add 8.8.8.8/32 dev isp0-eth0')
-
-    print('*** NAT actief: edgeA gateways 10.0.x.254 en WAN 203.0.113.2/28 via 203.0.113.1')
-    print('*** Test: h1 ping 203.0.113.1  |  h1 ping 8.8.8.8  |  edgeA iptables -t nat -L -v')
-
-    CLI(net)
+    def build(self, model=None, link_opts=None):
+        # link_opts: {linksoort: TCLink-parameters}, bv. {'darkfiber': {'bw': 100}};
+        # zonder link_opts gelden de link-profielen uit het model
+        model = model or NetModel()
+        if link_opts is None:
+            link_opts = {kind: link_params(name) for kind, name in model.link_profiles.items()}
+
+        # -------- Switches met vaste DPIDs (matchen met de gegenereerde faucet.yaml) --------
+        # Bij meerdere controllers kiest elke switch zijn eigen (ovs.MappedSwitch)
+        for sw in model.switches:
+            opts = {'controller': f'c{model.controller_index(sw)}'} if model.controllers > 1 else {}
+            self.addSwitch(sw.name, dpid='%016x' % sw.dpid, **opts)
+
+        # -------- Hosts --------
+        for h in model.hosts:
+            self.addHost(h.name, ip=h.ip4, mac=h.mac)
+
+        # -------- Edge-routers en ISP-simulatie (één per site met edge) --------
+        for edge in model.edges():
+            self.addHost(edge.router.name)
+            self.addHost(edge.isp, ip=f'{edge.router.gw_v4}/28')
+
+        # -------- Links (poortnummers expliciet uit het model) --------
+        for link in model.links:
+            self.addLink(link.node1, link.node2, port1=link.port1, port2=link.port2,
+                         **link_opts.get(link.kind, {}))
+
+
+def model_from_args(args):
+    return NetModel(sites=args.sites, access_per_site=args.access,
+                    hosts_per_vlan=args.hosts_per_vlan,
+                    vids=[int(v) for v in args.vlans.split(',')],
+                    darkfiber_links=args.darkfiber_links, darkfiber_mode=args.darkfiber_mode,
+                    link_profiles=parse_assignments(args.link_profiles),
+                    firewall=args.firewall, edge_sites=args.edge_sites,
+                    controllers=args.controllers, controller_split=args.controller_split)
+
+
+def add_controllers(net, group=None):
+    """c0 naar de systeem-Faucet, of c0..cN naar de instanties van een FaucetGroup."""
+    if group is None:
+        return [net.addController('c0', controller=RemoteController,
+                                  ip=CONTROLLER_IP, port=CONTROLLER_PORT)]
+    return [net.addController(f'c{i}', controller=RemoteController, ip=CONTROLLER_IP, port=port)
+            for i, port in enumerate(group.ports)]
+
+
+def run(model, faucet_out='faucet_generated.yaml', acls_from='faucet.yaml', workers=WORKERS,
+        timings='timings.json', profile=None, bench=None, check=False, telemetry=None,
+        cli_args=None, failover=False, daemon=None):
+    # cli_args: (parser, args) voor het reconfigure-commando in de CLI
+    # daemon: Unix-socket voor de API (daemon.py) i.p.v. de interactieve CLI
+    # failover: gateways van uitgevallen edge-routers laten overnemen (edgesites.py)
+    prof = Profiler(cprofile=bool(profile))
+    prof.install()
+
+    # Faucet-config uit hetzelfde model als de topologie
+    with prof.phase('faucet-config'):
+        acls = load_acls(acls_from) if acls_from else None
+        with open(faucet_out, 'w') as f:
+            f.write(model.faucet_yaml(acls))
+        # Multi-controller: eigen Faucet-processen met elk een deel van de dps
+        group = None
+        if model.controllers > 1:
+            group = FaucetGroup(model.faucet_yamls(acls), base=faucet_out.rsplit('.', 1)[0]).start()
+    print(f'*** Faucet-config geschreven naar {faucet_out} '
+          f'({len(model.switches)} switches, {len(model.hosts)} hosts)')
+    if model.link_profiles:
+        print('*** link-profielen: ' + ', '.join(f'{kind}={name}' for kind, name
+                                                  in sorted(model.link_profiles.items())))
+
+    topo = SDNTopo(model=model)
+    net = Mininet(topo=topo, switch=FaucetSwitch, build=False, controller=None)
+
+    # OpenFlow13, fail-mode secure en de controller worden bij het aanmaken gezet
+    add_controllers(net, group)
+    with prof.phase('net.build'):
+        net.build()
+    with prof.phase('net.start'):
+        net.start()
+
+    # -------- NAT configureren (edge-router per site) --------
+    edges = model.edges()
+    router = model.edge_router()
+    for edge in edges:
+        with prof.phase('wan'):
+            edge.router.apply_isp(net.get(edge.isp), f'{edge.isp}-eth0')
+        with prof.phase('edge'):
+            count, elapsed = provision(net.get(edge.router.name), edge.router)
+        print(f'*** {edge.router.name} geconfigureerd: {count} commando\'s in {elapsed:.3f}s')
+
+    # Default gateways en IPv6 per VLAN (parallel per host)
+    with prof.phase('hosts'):
+        count, elapsed = provision_hosts(net, from_model(model), workers=workers)
+    print(f'*** {count} hosts geconfigureerd in {elapsed:.3f}s ({workers} workers)')
+
+    # Readiness: edge-interfaces, IPv6 DAD op de hosts en alle switches verbonden
+    conditions = []
+    for edge in edges:
+        node = net.get(edge.router.name)
+        conditions += [IfaceReady(node, edge.router.wan_if),
+                       IfaceReady(net.get(edge.isp), f'{edge.isp}-eth0')]
+        conditions += [IfaceReady(node, ifname) for ifname in edge.router.lan_ifs()]
+    conditions += [IfaceReady(net.get(h.name), f'{h.name}-eth0') for h in model.hosts]
+    conditions.append(SwitchesConnected(len(net.switches)))
+    with prof.phase('ready'):
+        wait_ready(conditions, timeout=max(10.0, len(conditions) * 0.05))
+
+    prof.uninstall()
+    prof.write(timings, cprofile_path=profile)
+
+    # Telemetrie op de achtergrond zolang het netwerk draait
+    collector = Collector(net.switches, **telemetry).start() if telemetry else None
+    watcher = EdgeFailover(net, model).start() if failover and len(edges) > 1 else None
+
+    for edge in edges:
+        print(f'*** NAT actief: {edge.router.name} gateways per VLAN en WAN '
+              f'{edge.router.wan_v4} via {edge.router.gw_v4} ({edge.isp})')
+    if router and model.hosts:
+        first = model.hosts[0].name
+        print(f'*** Test: {first} ping 203.0.113.1  |  {first} ping 8.8.8.8  |  '
+              f'{router.name} iptables -t nat -L -v')
+
+    # Headless: policy-verificatie en/of benchmark i.p.v. de CLI
+    if check or bench:
+        code = 0
+        if check:
+            code = verify(net, load_faucet(faucet_out), endpoints_from_model(model), router,
+                          uplinks=model.uplinks(dict(watcher.holder) if watcher else None))
+        if bench:
+            code = max(code, run_and_report(net, scenarios_from_model(model), bench['output'],
+                                            meta=dict(profile_meta(model.link_profiles),
+                                                      firewall=model.firewall),
+                                            collect=EdgeLoad(net, model) if edges else None,
+                                            **bench['options']))
+        if watcher:
+            watcher.stop()
+        if collector:
+            collector.stop()
+        net.stop()
+        if group:
+            group.stop()
+        return code
+
+    if daemon:
+        live = LiveNet(net, model, faucet_out, acls_from, workers, controllers=group,
+                       failover=watcher)
+        NetDaemon(net, live, daemon, faucet_out,
+                  cli_args=(*cli_args, model_from_args) if cli_args else None,
+                  workers=workers).serve()
+    elif cli_args:
+        print('*** reconfigure [opties] past wijzigingen live toe (zie help reconfigure)')
+        live = LiveNet(net, model, faucet_out, acls_from, workers, controllers=group,
+                       failover=watcher)
+        SDNCLI(net, live, *cli_args, model_from_args)
+    else:
+        CLI(net)
+    if watcher:
+        watcher.stop()
+    if collector:
+        collector.stop()
     net.stop()
+    if group:
+        group.stop()
+    return 0
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Schaalbare multi-site SDN-topologie')
+    parser.add_argument('--sites', type=int, default=2)
+    parser.add_argument('--access', type=int, default=2, help='access-switches per site')
+    parser.add_argument('--hosts-per-vlan', type=int, default=1,
+                        help='hosts per VLAN per access-switch')
+    parser.add_argument('--vlans', default='10,20,30', help='kommagescheiden VLAN-ids')
+    parser.add_argument('--darkfiber-links', type=int, default=1,
+                        help='parallelle darkfiber-links per core-paar')
+    parser.add_argument('--darkfiber-mode', choices=DARKFIBER_MODES, default='lacp',
+                        help='lacp (verdelen over de links) of stack (redundantie)')
+    parser.add_argument('--firewall', choices=FIREWALLS, default='iptables',
+                        help='firewall-backend van de edge-router')
+    parser.add_argument('--edge-sites', type=int, default=1,
+                        help='aantal sites (vanaf A) met een eigen edge-router en ISP')
+    parser.add_argument('--controllers', type=int, default=1,
+                        help='aantal lokale Faucet-instanties (1 = de systeem-Faucet op 6653)')
+    parser.add_argument('--controller-split', choices=CONTROLLER_SPLITS, default='site',
+                        help='dps per site of op hash van dp_id over de controllers verdelen')
+    parser.add_argument('--edge-failover', action='store_true',
+                        help='gateways van een uitgevallen edge-router door de volgende laten overnemen')
+    parser.add_argument('--faucet-out', default='faucet_generated.yaml')
+    parser.add_argument('--acls-from', default='faucet.yaml')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='max. aantal hosts dat tegelijk wordt geconfigureerd')
+    parser.add_argument('--timings', default='timings.json',
+                        help='JSON-rapport met tijd per startfase')
+    parser.add_argument('--profile', nargs='?', const='startup.prof', default=None,
+                        help='schrijf ook een cProfile van de Python-kant (standaard startup.prof)')
+    parser.add_argument('--verify', action='store_true',
+                        help='controleer de bereikbaarheid tegen de gegenereerde policy')
+    parser.add_argument('--daemon', nargs='?', const=SOCKET, default=None, metavar='SOCKET',
+                        help=f'netwerk laten draaien met een API op SOCKET (standaard {SOCKET}) '
+                             'i.p.v. de CLI; zie daemon.py')
+    add_arguments(parser)
+    add_telemetry_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    try:
+        model = model_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
     setLogLevel('info')
-    run()
+    sys.exit(run(model, faucet_out=args.faucet_out, acls_from=args.acls_from,
+                 workers=args.workers, timings=args.timings, profile=args.profile,
+                 bench=bench_options(args), check=args.verify,
+                 telemetry=telemetry_options(args), cli_args=(parser, args),
+                 failover=args.edge_failover, daemon=args.daemon))
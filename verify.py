@@ -0,0 +1,305 @@
+"""Policy-verificatie: verwachte bereikbaarheid uit faucet.yaml + edge-firewall.
+
+De Faucet-config (VLANs, acl_in, interfaces) en het EdgeRouter-model worden
+omgezet in een verwachte allow/deny-matrix voor ping (v4 en v6) tussen alle
+hosts en naar het internet. Daarna wordt parallel gepingd: per bronhost één
+fping (of parallelle pings in één shell-opdracht), alle bronhosts tegelijk
+via een threadpool. Afwijkingen worden gerapporteerd.
+"""
+
+import ipaddress
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+
+Endpoint = namedtuple('Endpoint', 'name vid ip4 ip6 mac')
+Probe = namedtuple('Probe', 'src dst addr family expected')
+
+# "Internet"-adressen op de ISP-node(s), zie edge.INTERNET_V4/V6
+WAN4 = '8.8.8.8'
+WAN6 = '2001:4860:4860::8888'
+WORKERS = 32
+FPING_TIMEOUT_MS = 500
+
+FIELD_ALIASES = {
+    'dl_type': 'eth_type', 'nw_proto': 'ip_proto',
+    'nw_src': 'ipv4_src', 'nw_dst': 'ipv4_dst',
+    'dl_src': 'eth_src', 'dl_dst': 'eth_dst',
+}
+NET_FIELDS = ('ipv4_src', 'ipv4_dst', 'ipv6_src', 'ipv6_dst', 'arp_spa', 'arp_tpa')
+INT_FIELDS = ('eth_type', 'ip_proto', 'icmpv4_type', 'icmpv6_type', 'vlan_vid', 'vlan_pcp',
+              'tcp_src', 'tcp_dst', 'udp_src', 'udp_dst')
+MODELLED_FIELDS = NET_FIELDS + INT_FIELDS + ('eth_src', 'eth_dst')
+
+_warned = set()
+
+
+# -------- Faucet-config --------
+def load_faucet(path):
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def _int(value):
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+def vlan_vids(config):
+    return {name: v['vid'] for name, v in (config.get('vlans') or {}).items()}
+
+
+def vlan_acls(config):
+    """{vid: [regels]} voor VLANs met acl_in (lijst acl-namen mag ook)."""
+    acls = config.get('acls') or {}
+    result = {}
+    for name, v in (config.get('vlans') or {}).items():
+        names = v.get('acl_in') or v.get('acls_in')
+        if not names:
+            continue
+        if isinstance(names, str):
+            names = [names]
+        result[v['vid']] = [r['rule'] for n in names for r in acls.get(n, [])]
+    return result
+
+
+def host_vlans(config):
+    """{interface-beschrijving: vid} voor access-poorten (native_vlan)."""
+    vids = vlan_vids(config)
+    result = {}
+    for dp in (config.get('dps') or {}).values():
+        for port in (dp.get('interfaces') or {}).values():
+            native = port.get('native_vlan')
+            if native is None or 'description' not in port:
+                continue
+            result[port['description']] = vids.get(native, native)
+    return result
+
+
+# -------- ACL-evaluatie --------
+def _field_matches(field, want, pkt):
+    if field not in pkt:
+        return False
+    have = pkt[field]
+    if field in NET_FIELDS:
+        return ipaddress.ip_address(have) in ipaddress.ip_network(str(want), strict=False)
+    if field in INT_FIELDS:
+        return _int(want) == _int(have)
+    return str(want).lower() == str(have).lower()
+
+
+def rule_matches(rule, pkt):
+    for key, want in rule.items():
+        if key == 'actions':
+            continue
+        field = FIELD_ALIASES.get(key, key)
+        if field not in MODELLED_FIELDS:
+            if field not in _warned:
+                _warned.add(field)
+                print(f'*** verify: ACL-veld {key} niet gemodelleerd (regel telt als geen match)')
+            return False
+        if not _field_matches(field, want, pkt):
+            return False
+    return True
+
+
+def acl_allows(rules, pkt):
+    """First match zoals Faucet; geen ACL = alles toe, geen match = drop."""
+    if rules is None:
+        return True
+    for rule in rules:
+        if rule_matches(rule, pkt):
+            return bool(rule.get('actions', {}).get('allow', 0))
+    return False
+
+
+def _ping_packets(family, src, dst, next_hop):
+    """Pakketten die in één VLAN moeten passeren voor een ping src -> dst.
+
+    next_hop: het L2-doel in deze VLAN (dst zelf, of de gateway).
+    """
+    if family == 4:
+        return [
+            {'eth_type': 0x0806, 'arp_spa': src, 'arp_tpa': next_hop},
+            {'eth_type': 0x0806, 'arp_spa': next_hop, 'arp_tpa': src},
+            {'eth_type': 0x0800, 'ip_proto': 1, 'icmpv4_type': 8, 'ipv4_src': src, 'ipv4_dst': dst},
+            {'eth_type': 0x0800, 'ip_proto': 1, 'icmpv4_type': 0, 'ipv4_src': dst, 'ipv4_dst': src},
+        ]
+    hop = ipaddress.ip_address(next_hop)
+    solicited = str(ipaddress.ip_address('ff02::1:ff00:0') + (int(hop) & 0xffffff))
+    return [
+        {'eth_type': 0x86DD, 'ip_proto': 58, 'icmpv6_type': 135, 'ipv6_src': src, 'ipv6_dst': solicited},
+        {'eth_type': 0x86DD, 'ip_proto': 58, 'icmpv6_type': 136, 'ipv6_src': next_hop, 'ipv6_dst': src},
+        {'eth_type': 0x86DD, 'ip_proto': 58, 'icmpv6_type': 128, 'ipv6_src': src, 'ipv6_dst': dst},
+        {'eth_type': 0x86DD, 'ip_proto': 58, 'icmpv6_type': 129, 'ipv6_src': dst, 'ipv6_dst': src},
+    ]
+
+
+# -------- Verwachte matrix --------
+def router_gateways(router):
+    """{vid: (gw4, gw6)} zonder prefixlengte."""
+    if not router:
+        return {}
+    return {v.vid: (str(ipaddress.ip_interface(v.gw4).ip), str(ipaddress.ip_interface(v.gw6).ip))
+            for v in router.vlans}
+
+
+class PolicyModel(object):
+    """router: inter-VLAN (en standaard WAN); uplinks: {host: (eigenaar, router)}
+    voor WAN-verkeer via de edge-router van de eigen site (netmodel.NetModel.uplinks).
+    """
+
+    def __init__(self, config, router=None, uplinks=None):
+        self.acls = vlan_acls(config)
+        self.router = router
+        self.uplinks = uplinks or {}
+        self.gateways = router_gateways(router)
+        self._gateways = {}
+
+    def _router_gateways(self, router):
+        if router.name not in self._gateways:
+            self._gateways[router.name] = router_gateways(router)
+        return self._gateways[router.name]
+
+    def _vlan_ok(self, vid, packets):
+        rules = self.acls.get(vid)
+        return all(acl_allows(rules, p) for p in packets)
+
+    def _routed(self, family, in_vid, out_if, router=None):
+        router = router or self.router
+        proto = 'icmp' if family == 4 else 'ipv6-icmp'
+        in_if = router.vlan_if(in_vid)
+        return (router.forwards(family, in_if, out_if, proto) and
+                router.forwards(family, out_if, in_if, proto, state='ESTABLISHED'))
+
+    def host_to_host(self, family, a, b):
+        src, dst = (a.ip4, b.ip4) if family == 4 else (a.ip6, b.ip6)
+        if not src or not dst:
+            return None
+        if a.vid == b.vid:
+            return self._vlan_ok(a.vid, _ping_packets(family, src, dst, dst))
+        # Inter-VLAN alleen via de edge-router
+        if a.vid not in self.gateways or b.vid not in self.gateways:
+            return False
+        idx = 0 if family == 4 else 1
+        gw_a, gw_b = self.gateways[a.vid][idx], self.gateways[b.vid][idx]
+        return (self._vlan_ok(a.vid, _ping_packets(family, src, dst, gw_a)) and
+                self._routed(family, a.vid, self.router.vlan_if(b.vid)) and
+                self._vlan_ok(b.vid, _ping_packets(family, src, dst, gw_b)[2:]) and
+                self._vlan_ok(b.vid, _ping_packets(family, gw_b, dst, dst)[:2]))
+
+    def host_to_wan(self, family, a):
+        # Gateway van de eigenaar, doorgestuurd door de router die hem nu bedient
+        owner, via = self.uplinks.get(a.name, (self.router, self.router))
+        src = a.ip4 if family == 4 else a.ip6
+        if not src or not owner or not via:
+            return False
+        gateways = self._router_gateways(owner)
+        if a.vid not in gateways or a.vid not in self._router_gateways(via):
+            return False
+        dst = WAN4 if family == 4 else WAN6
+        gw = gateways[a.vid][0 if family == 4 else 1]
+        return (self._vlan_ok(a.vid, _ping_packets(family, src, dst, gw)) and
+                self._routed(family, a.vid, via.wan_if, via))
+
+    def probes(self, endpoints, families=(4, 6), wan=True):
+        result = []
+        for family in families:
+            for a in endpoints:
+                for b in endpoints:
+                    if a is b:
+                        continue
+                    expected = self.host_to_host(family, a, b)
+                    if expected is not None:
+                        addr = b.ip4 if family == 4 else b.ip6
+                        result.append(Probe(a.name, b.name, addr, family, expected))
+                if wan and (self.router or a.name in self.uplinks) and (a.ip4 if family == 4 else a.ip6):
+                    addr = WAN4 if family == 4 else WAN6
+                    result.append(Probe(a.name, 'wan', addr, family, self.host_to_wan(family, a)))
+        return result
+
+
+# -------- Endpoints --------
+def endpoints_from_net(net, config, ip6=None):
+    """Hosts uit een draaiend net, VLAN via de interfacebeschrijving in faucet.yaml."""
+    ip6 = ip6 or {}
+    result = []
+    for name, vid in host_vlans(config).items():
+        if name not in net:
+            continue
+        node = net.get(name)
+        addr6 = ip6.get(name)
+        result.append(Endpoint(name, vid, node.IP(),
+                               addr6.split('/')[0] if addr6 else None, node.MAC()))
+    return result
+
+
+def endpoints_from_model(model):
+    return [Endpoint(h.name, model.vlan(h.vlan).vid, h.ip4.split('/')[0],
+                     h.ip6.split('/')[0], h.mac) for h in model.hosts]
+
+
+# -------- Probes --------
+def _probe_command(family, addrs):
+    # fping als het er is, anders parallelle pings in één shell
+    flag = '-6' if family == 6 else '-4'
+    ping = 'ping6' if family == 6 else 'ping'
+    targets = ' '.join(addrs)
+    return (f'if command -v fping >/dev/null; then '
+            f'fping {flag} -q -C 1 -r 1 -t {FPING_TIMEOUT_MS} {targets} 2>&1; '
+            f'else for a in {targets}; do '
+            f'( {ping} -c1 -W1 $a >/dev/null 2>&1 && echo "$a : ok" || echo "$a : -" ) & '
+            f'done; wait; fi')
+
+
+def _parse_probe_output(out):
+    result = {}
+    for line in out.splitlines():
+        if ' : ' not in line:
+            continue
+        addr, value = line.split(' : ', 1)
+        result[addr.strip()] = value.strip() not in ('-', '')
+    return result
+
+
+def run_probes(net, probes, workers=WORKERS):
+    """Voer alle probes uit, per (bron, familie) één opdracht; {probe: bereikt}."""
+    groups = {}
+    for p in probes:
+        groups.setdefault((p.src, p.family), []).append(p)
+
+    def probe_group(key):
+        src, family = key
+        addrs = sorted({p.addr for p in groups[key]})
+        out = net.get(src).cmd(_probe_command(family, addrs))
+        reached = _parse_probe_output(out)
+        return [(p, reached.get(p.addr, False)) for p in groups[key]]
+
+    result = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups)))) as pool:
+        for pairs in pool.map(probe_group, list(groups)):
+            result.update(pairs)
+    return result
+
+
+def verify(net, config, endpoints, router=None, families=(4, 6), workers=WORKERS, uplinks=None):
+    """Bouw de verwachte matrix, probe parallel en rapporteer; geeft exitcode."""
+    start = time.time()
+    policy = PolicyModel(config, router, uplinks)
+    probes = policy.probes(endpoints, families)
+    results = run_probes(net, probes, workers)
+    mismatches = [p for p in probes if results[p] != p.expected]
+    elapsed = time.time() - start
+
+    allowed = sum(1 for p in probes if p.expected)
+    print(f'*** verify: {len(probes)} probes ({allowed} allow, {len(probes) - allowed} deny) '
+          f'over {len(endpoints)} hosts in {elapsed:.2f}s')
+    for p in mismatches:
+        want = 'allow' if p.expected else 'deny'
+        got = 'bereikt' if results[p] else 'niet bereikt'
+        print(f'*** MISMATCH v{p.family} {p.src} -> {p.dst} ({p.addr}): verwacht {want}, {got}')
+    if not mismatches:
+        print('*** verify: alle probes conform policy')
+    return 1 if mismatches else 0